@@ -0,0 +1 @@
+# Páginas del dashboard: cada módulo importa sus dependencias pesadas solo cuando se visita
@@ -0,0 +1,49 @@
+import pandas as pd
+import streamlit as st
+
+from paginas.recursos import explorador_umbral
+from riesgo.metricas import FIGURA_SEGUNDOS
+
+def mostrar_figura(fig, pagina):
+    """`st.pyplot` midiendo el tiempo de render de la figura."""
+    with FIGURA_SEGUNDOS.cronometrar(pagina=pagina):
+        st.pyplot(fig)
+
+@st.fragment
+def mostrar_explorador_umbral(modelo, umbral_inicial, maximo, formato):
+    """Slider de umbral; solo este fragmento se re-ejecuta al moverlo."""
+    explorador = explorador_umbral(modelo)
+    umbral = st.slider("Umbral", min_value=0.0, max_value=float(maximo), value=float(umbral_inicial),
+                       step=float(maximo) / 1000, format=formato, key=f"umbral_{modelo}")
+    m = explorador.metricas(umbral)
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Precision", f"{m['precision']:.1%}")
+    col2.metric("Recall", f"{m['recall']:.1%}")
+    col3.metric("F1-Score", f"{m['f1']:.3f}")
+    col4.metric("Capital Esperado", f"${m['capital_predicho']:,.0f}", help=f"Saldo de los {m['tp'] + m['fp']:,} clientes marcados como pagadores. De ese saldo, ${m['capital_recuperado']:,.0f} corresponde a clientes que sí pagaron.")
+
+    st.dataframe(
+        pd.DataFrame(explorador.matriz_confusion(umbral), index=['Real: No Pagó', 'Real: Pagó'], columns=['Pred: No Pagó', 'Pred: Pagó'])
+    )
+
+def mostrar_grilla(grilla, clave, tamano=25):
+    """Renderiza una página de la grilla; al navegador solo viaja la página visible."""
+    cols_filtro = st.columns(len(grilla.columnas_filtro))
+    filtros = {}
+    for col_ui, col in zip(cols_filtro, grilla.columnas_filtro):
+        seleccion = col_ui.multiselect(col, grilla.valores(col), key=f"{clave}_filtro_{col}")
+        if seleccion:
+            filtros[col] = seleccion
+
+    col1, col2, col3 = st.columns([0.4, 0.3, 0.3])
+    orden = col1.selectbox("Ordenar por", [None] + grilla.columnas_orden, key=f"{clave}_orden")
+    ascendente = col2.radio("Sentido", ["Descendente", "Ascendente"], horizontal=True, key=f"{clave}_sentido") == "Ascendente"
+
+    total = grilla.total(filtros)
+    n_paginas = max(1, -(-total // tamano))
+    numero = col3.number_input(f"Página (de {n_paginas})", min_value=1, max_value=n_paginas, value=1, key=f"{clave}_pagina")
+
+    pagina, total = grilla.pagina(numero - 1, tamano, orden=orden, ascendente=ascendente, filtros=filtros)
+    st.caption(f"Mostrando {len(pagina)} de {total:,} registros")
+    st.dataframe(pagina, use_container_width=True)
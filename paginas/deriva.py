@@ -0,0 +1,53 @@
+import streamlit as st
+
+from paginas.recursos import monitor_deriva
+from riesgo.deriva import SCORES_DERIVA, UMBRAL_ALERTA, UMBRAL_VIGILAR, VARIABLES_DERIVA
+
+
+def mostrar():
+    monitor = monitor_deriva()
+
+    st.title("📈 Monitoreo de Deriva")
+    st.markdown(f"""
+    Compara la distribución de cada variable y de los scores de los modelos entre cortes mensuales (`mes`).
+    * **PSI** (Population Stability Index): **< {UMBRAL_VIGILAR}** estable, **{UMBRAL_VIGILAR} - {UMBRAL_ALERTA}** vigilar, **> {UMBRAL_ALERTA}** alerta.
+    * **KS**: máxima distancia entre las distribuciones acumuladas.
+    """)
+
+    opciones_ref = {"Mes anterior": 'anterior', "Primer mes": 'primero'}
+    referencia = st.radio("Comparar cada mes contra:", list(opciones_ref), horizontal=True)
+    reporte = monitor.reporte(opciones_ref[referencia])
+
+    if reporte.empty:
+        st.info("Se necesitan al menos dos meses para medir deriva.")
+        return
+
+    ultimo = reporte[reporte['mes'] == reporte['mes'].max()]
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Último Corte", ultimo['mes'].iloc[0])
+    c2.metric("Variables en Alerta", int((ultimo['estado'] == 'Alerta').sum()))
+    c3.metric("Variables a Vigilar", int((ultimo['estado'] == 'Vigilar').sum()))
+
+    # --- PANEL DE ALERTAS ---
+    st.subheader("🚨 Alertas")
+    alertas = reporte[reporte['estado'] != 'Estable'].sort_values(['mes', 'psi'], ascending=[False, False])
+    if alertas.empty:
+        st.success("Sin deriva significativa en ningún corte.")
+    else:
+        st.dataframe(
+            alertas.style.format({'psi': '{:.3f}', 'ks': '{:.3f}', 'nulos': '{:.1%}'}),
+            use_container_width=True, hide_index=True
+        )
+
+    # --- EVOLUCIÓN ---
+    st.subheader("📉 PSI por Mes")
+    tab_vars, tab_scores = st.tabs(["Variables", "Scores de los Modelos"])
+    psi_mes = reporte.pivot(index='mes', columns='variable', values='psi')
+    with tab_vars:
+        st.line_chart(psi_mes[[c for c in VARIABLES_DERIVA if c in psi_mes.columns]])
+    with tab_scores:
+        st.line_chart(psi_mes[[c for c in SCORES_DERIVA if c in psi_mes.columns]])
+
+    with st.expander("Ver reporte completo"):
+        st.dataframe(reporte.style.format({'psi': '{:.3f}', 'ks': '{:.3f}', 'nulos': '{:.1%}'}),
+                     use_container_width=True, hide_index=True)
@@ -0,0 +1,464 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import seaborn as sns
+import streamlit as st
+
+from paginas.componentes import mostrar_figura
+from paginas.recursos import analisis_cohortes, cartera_caracteristicas, cartera_limpia, correlaciones, resumen_banco, version_limpia
+from riesgo.cohortes import MES_CEMENTERIO, SIN_PAGOS
+from riesgo.correlacion import FACTOR_FIELLER
+
+
+def mostrar():
+    df = cartera_limpia()
+
+    st.title("🔍 Análisis Exploratorio de Datos (EDA)")
+    st.markdown("Identificación de patrones clave que diferencian a los clientes que pagan de los que no.")
+
+    # Tabs para organizar la historia
+    tab1, tab2, tab3, tab4 = st.tabs([
+        "Correlación", 
+        "Recencia", 
+        "Financiero & Bancos", 
+        "Demográfico", 
+    ])
+
+    # --- TAB 1: CORRELACIONES ---
+    with tab1:
+        st.subheader("¿Qué variables se relacionan con el pago?")
+        st.markdown("""
+            Utilizamos la **Correlación de Spearman** porque captura relaciones no lineales y es más robusta a valores atípicos (outliers) que la de Pearson.
+            """)
+
+        # Matriz de correlación (en caché por versión de la cartera)
+        corr_matrix, n_filas_corr, corr_pago = correlaciones(version_limpia())
+
+        fig, ax = plt.subplots(figsize=(10, 4))
+        fig.patch.set_alpha(0.0)
+        ax.patch.set_alpha(0.0)
+
+        mask = np.triu(np.ones_like(corr_matrix, dtype=bool))
+
+        sns.heatmap(corr_matrix, mask=mask, annot=True, fmt=".2f", cmap='RdBu_r', vmin=-1, vmax=1,
+                    cbar_kws={"shrink": .8}, ax=ax)
+
+        ax.set_title('Matriz de Correlación (Multicolinealidad)', color='#00D448', fontsize=16, fontweight='bold')
+        ax.tick_params(axis='x', colors='white', rotation=90)
+        ax.tick_params(axis='y', colors='white')
+
+        mostrar_figura(fig, 'eda')
+        if n_filas_corr < len(df):
+            st.caption(f"Calculada sobre una muestra uniforme de {n_filas_corr:,} filas "
+                       f"(error estándar ≈ {FACTOR_FIELLER / np.sqrt(n_filas_corr - 3):.4f} por coeficiente).")
+
+        st.markdown("#### 🎯 Correlación con el Pago")
+        st.dataframe(
+            corr_pago.style.format({'n': '{:,.0f}', 'spearman': '{:.3f}', 'punto_biserial': '{:.3f}',
+                                    'spearman_ic_inf': '{:.3f}', 'spearman_ic_sup': '{:.3f}'})
+            .background_gradient(subset=['spearman'], cmap='RdBu_r', vmin=-1, vmax=1),
+            use_container_width=True
+        )
+
+
+        st.markdown("""
+            ### Análisis de lo que ves (Impacto en el Target)
+            Esta gráfica nos dice qué variables importan, midiendo la fuerza de la relación entre cada $X$ (predictor) y $Y$ (si paga o no).
+
+            *   **Los "Ganadores" (Predictibilidad Positiva):**
+                *   `pago_mes_anterior` (0.33): Confirma la regla de oro en riesgo: "El mejor predictor del comportamiento futuro es el comportamiento pasado inmediato". Es la variable estrella.
+                *   **Variables de Gestión** (~0.15): `duracion_llamadas`, `contacto_mes_anterior`, etc. Tienen una correlación positiva moderada. Esto valida la operación: gestionar sí aumenta la probabilidad de pago, pero no es determinante por sí sola.
+
+            *   **Los "Destructores" (Predictibilidad Negativa):**
+                *   `sin_pago_previo` (-0.35) y `meses_desde_ultimo_pago` (-0.32): Son correlaciones negativas fuertes. Cuanto más tiempo pasa (o si nunca ha pagado), la probabilidad de recuperar el dinero cae en picada.
+
+            *   **La Sorpresa (Irrelevancia):**
+                *   `saldo_capital` (0.02): Esto es un insight crucial. El monto de la deuda no predice la intención de pago. Un cliente puede deber $1 millón o $100 millones; su probabilidad de pagar es casi la misma. (Ojo: esto afecta el monto recuperado, pero no la probabilidad binaria).
+            """)
+
+        st.info("""
+            **Decisión Técnica (Árboles de Decisión):** Aunque los modelos de árboles (XGBoost/Random Forest) son robustos a la multicolinealidad, 
+            eliminamos variables con correlación extrema (>0.9) para evitar la dilución del **Feature Importance**.
+            """)
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.write("""
+                Se detectó una correlación casi perfecta (**0.99**) entre:
+                1. `duracion_llamadas_ultimos_6meses`
+                2. `contacto_ultimos_6meses`
+                
+                **Diagnóstico:** Ambas miden esencialmente lo mismo (intensidad de gestión histórica). 
+                Mantener ambas no aporta información nueva y confunde al modelo sobre cuál es la importante.
+                """)
+
+        with col2:
+            st.markdown("#### ✂️ Acción Tomada")
+            st.success("""
+                **Se elimina:** `contacto_ultimos_6meses`
+                
+                **Se conserva:** `duracion_llamadas_ultimos_6meses`
+                
+                **Razón:** En el análisis de Spearman previo, la *duración* mostró una correlación ligeramente 
+                superior con el target (0.16 vs 0.14). Preferimos la calidad del contacto sobre la cantidad.
+                """)
+
+        st.markdown("---")
+        st.markdown("#### ⚠️ Nota sobre Recencia (-0.93)")
+        st.warning("""
+            Existe una fuerte correlación inversa (**-0.93**) entre `meses_desde_ultimo_pago` y `pago_mes_anterior`.
+            * Esto es lógico: Si pagó el mes pasado, su recencia es baja.
+            * **Decisión:** En este caso **CONSERVAMOS AMBAS**. 
+                * `pago_mes_anterior` captura el evento inmediato (Hot Lead).
+                * `meses_desde_ultimo_pago` captura la degradación del riesgo a largo plazo. 
+                * Al ser árboles, el modelo aprovechará ambos matices.
+            """)
+
+    # --- TAB 2: RECENCIA ---
+    with tab2:
+        analisis = analisis_cohortes()
+        opcion_banco = st.selectbox("Banco", ["Todos"] + analisis.bancos, key="banco_recencia")
+        banco = None if opcion_banco == "Todos" else opcion_banco
+        kpis = analisis.kpis(banco)
+        recencia = analisis.recencia(banco)
+        con, sin = kpis['con_historial'], kpis['sin_historial']
+
+        st.markdown("---")
+        st.subheader("Impacto del Historial Crediticio")
+
+        col1, col2 = st.columns([0.6, 0.4])
+        with col1:
+            fig, ax = plt.subplots(figsize=(6, 4))
+            fig.patch.set_alpha(0.0)
+            ax.patch.set_alpha(0.0)
+
+            # Barras armadas con los conteos de la cohorte, sin recorrer la cartera
+            x = np.arange(2)
+            no_pagaron = [con['deudores'] - con['pagos'], sin['deudores'] - sin['pagos']]
+            pagaron = [con['pagos'], sin['pagos']]
+            barras_no = ax.bar(x - 0.2, no_pagaron, width=0.4, color='#555555', edgecolor='black', label='No')
+            barras_si = ax.bar(x + 0.2, pagaron, width=0.4, color='#00D448', edgecolor='black', label='Sí')
+
+            ax.set_title('Volumen de Clientes: Con vs Sin Historial', color='white')
+            ax.set_xticks(x)
+            ax.set_xticklabels(['Con Historial', 'Sin Historial'], color='white')
+            ax.set_ylabel('Cantidad', color='white')
+            ax.tick_params(colors='white')
+            ax.legend(title='Pago', labelcolor='white')
+
+            for container in [barras_no, barras_si]:
+                ax.bar_label(container, fmt='%d', padding=3, color='white')
+
+            for spine in ax.spines.values(): spine.set_visible(False)
+            mostrar_figura(fig, 'eda')
+
+        with col2:
+
+            # 1. Los Números Duros (KPIs)
+            st.markdown("##### 📊 Tasa de Conversión (Probabilidad de Éxito)")
+            col1, col2, col3 = st.columns(3)
+
+            with col1:
+                st.metric(
+                    label="Clientes CON Historial", 
+                    value=f"{con['tasa']:.1%}", 
+                    delta="Alta Probabilidad",
+                    help=f"De {con['deudores']:,} clientes, {con['pagos']:,} pagaron."
+                )
+
+            with col2:
+                st.metric(
+                    label="Clientes SIN Historial", 
+                    value=f"{sin['tasa']:.2%}", 
+                    delta="- Riesgo Extremo",
+                    delta_color="inverse",
+                    help=f"De {sin['deudores']:,} clientes, solo {sin['pagos']:,} pagaron."
+                )
+
+            with col3:
+                st.metric(
+                    label="Factor de Multiplicación", 
+                    value=f"{kpis['factor']:.0f}x", 
+                    delta="Impacto Predictivo",
+                    help=f"Un cliente con historial es {kpis['factor']:.0f} veces más probable de pagar que uno nuevo."
+                )
+
+            # 2. Análisis de Negocio (Estrategia Diferenciada)
+            st.info(f"""
+                **🧠 Diagnóstico de Negocio: Dos Mundos Diferentes**
+                Esta gráfica demuestra que mezclar clientes "vírgenes" (sin pagos) con clientes "recurrentes" en una misma lista de gestión es un error operativo grave.
+                * **La Minería de Oro (Con Historial):** Tienes un grupo pequeño (~{con['deudores']:,} personas) donde **{con['tasa']:.0%} paga**.
+                    * *Estrategia:* **Fidelización.** La gestión aquí debe ser de "Mantenimiento". No presionar, sino facilitar. Son tu flujo de caja seguro.
+                * **La Búsqueda de Agujas (Sin Historial):** Tienes un océano masivo (~{sin['deudores']:,} personas) donde el éxito es una anomalía (**{sin['tasa']:.1%}**).
+                    * *Estrategia:* **Machine Learning Puro.** No es rentable llamar a todos. El modelo debe actuar como un "radar" para encontrar a los pocos que tienen las características de los que sí pagan, y descartar al resto.
+                """)
+
+
+        st.subheader("Probabilidad de Cobro según Antigüedad del Último Pago")
+        st.markdown("Desglose de la tasa de éxito según cuántos meses han pasado desde el último pago del cliente.")
+
+        # Grid 3x3: "Sin Pagos" + los primeros meses presentes en la tabla de recencia
+        periodos_clave = [p for p in [SIN_PAGOS] + list(range(9)) if p in recencia.index][:9]
+
+        # Gráfica 3x3
+
+        _, col, _ = st.columns([0.1, 0.7, 0.1])
+
+        with col:
+
+            fig, axes = plt.subplots(3, 3, figsize=(12, 12))
+            fig.patch.set_alpha(0.0)
+            axes = axes.flatten()
+            colores = ["#333333", '#00D448'] # Gris oscuro y Verde Neón
+
+            for i, periodo in enumerate(periodos_clave):
+                ax = axes[i]
+                ax.patch.set_alpha(0.0)
+
+                fila = recencia.loc[periodo]
+                conteo = [fila['deudores'] - fila['pagos'], fila['pagos']]
+
+                if sum(conteo) > 0:
+                    wedges, texts, autotexts = ax.pie(
+                        conteo, colors=colores, autopct=lambda p: f'{p:.1f}%' if p > 0 else '',
+                        startangle=90, pctdistance=0.85,
+                        wedgeprops=dict(width=0.4, edgecolor='black'),
+                        textprops=dict(color="white", fontsize=10, fontweight='bold')
+                    )
+                    ax.text(0, 0, f"N={sum(conteo):.0f}", ha='center', va='center', color='white', fontsize=10)
+
+                titulo_grafica = "Nunca Pagó" if periodo == SIN_PAGOS else f"Hace {periodo} Meses"
+                ax.set_title(titulo_grafica, color='white', fontsize=11, fontweight='bold')
+
+            # Limpiar ejes vacíos
+            for j in range(len(periodos_clave), len(axes)):
+                axes[j].axis('off')
+
+            mostrar_figura(fig, 'eda')
+
+        st.markdown("### 📉 La Regla de Oro de la Recencia: Caducidad del Hábito")
+
+        # 1. Los KPIs del "Acantilado"
+        # Usamos columnas para mostrar la caída dramática
+        mes = kpis['mes']
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            st.metric(
+                label="🔥 La Ventana de Oro", 
+                value=f"{mes.get(1, np.nan):.1%}", 
+                delta="Mes 1 (Retención)",
+                help="Probabilidad de pago si el último pago fue hace 1 mes."
+            )
+
+        with col2:
+            caida = mes.get(3, np.nan) / mes.get(2, np.nan) - 1
+            st.metric(
+                label="⚠️ El Acantilado (Drop-off)", 
+                value=f"{mes.get(3, np.nan):.1%}", 
+                delta=f"{caida:.0%} vs Mes 2",
+                delta_color="inverse",
+                help=f"En el Mes 3 la probabilidad cambia {caida:.0%} respecto al Mes 2 ({mes.get(2, np.nan):.1%})."
+            )
+
+        with col3:
+            st.metric(
+                label="☠️ El Cementerio", 
+                value=f"{kpis['cementerio']:.1%}", 
+                delta=f"Mes {MES_CEMENTERIO} en adelante",
+                help=f"Probabilidad de recuperación desde el mes {MES_CEMENTERIO} sin pagar."
+            )
+
+        def rango(meses):
+            tasas = [mes[m] for m in meses if m in mes]
+            return f"{min(tasas):.0%} - {max(tasas):.0%}" if tasas else "-"
+
+        # 2. Estrategia Operativa (La Tabla de Acción)
+        st.info(f"""
+            **🧠 Estrategia de Gestión Basada en Datos (Data-Driven Strategy)**
+            Los datos dictan una política de segmentación estricta para maximizar el ROI de las llamadas:
+
+            | Perfil de Recencia | Antigüedad | Probabilidad | 📞 Acción Recomendada (Canal) |
+            | :--- | :--- | :--- | :--- |
+            | **HOT (Prioridad)** | 1 - 2 Meses | **{rango([1, 2])}** | **Llamada Humana Intensiva.** El hábito sigue vivo. Aquí se recupera el dinero. |
+            | **RISK (Alerta)** | 3 - 4 Meses | **{rango([3, 4])}** | **Gestión Híbrida.** WhatsApp/SMS primero. Llamada humana solo si hay respuesta o saldo muy alto. |
+            | **LOST (Castigo)** | {MES_CEMENTERIO}+ Meses | **{kpis['cementerio']:.0%}** | **Automatización Total.** No gastar tiempo de asesores. Enviar campañas masivas de Email/SMS. El costo de llamar supera el retorno esperado. |
+            """)
+
+        st.markdown("### 🍷 Cosechas (Vintages) por Días de Mora")
+        st.markdown(
+            "Los tres picos de `dias_mora` se tratan como cosechas de compra de cartera: "
+            f"se cortan en los valles del histograma ({', '.join(f'{c:,.0f}' for c in analisis.cortes_cosecha)} días)."
+        )
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.dataframe(
+                analisis.cosechas(banco).style.format({'tasa_pago': '{:.2%}', 'saldo_capital': '${:,.0f}', 'deudores': '{:,.0f}', 'pagos': '{:,.0f}'}),
+                use_container_width=True
+            )
+        with col2:
+            cruce = analisis.recencia_por_cosecha(banco).rename(index=lambda m: 'Sin Pagos' if m == SIN_PAGOS else f"Mes {m}")
+            st.dataframe(
+                cruce.style.format('{:.1%}', na_rep='-').background_gradient(cmap='Greens', axis=None),
+                use_container_width=True
+            )
+
+    # --- TAB 3: FINANCIERO & BANCOS ---
+    with tab3:
+        st.subheader("Perfil Financiero del Deudor")
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown("**Días de Mora vs Pago**")
+            fig, ax = plt.subplots(figsize=(6, 5))
+            fig.patch.set_alpha(0.0)
+            ax.patch.set_alpha(0.0)
+            sns.boxplot(data=df, x='pago', y='dias_mora', palette=['#555555', '#00D448'], ax=ax, showfliers=False)
+            ax.set_xticklabels(['No Pagó', 'Sí Pagó'], color='white')
+            ax.set_ylabel('Días de Mora', color='white')
+            ax.set_xlabel('')
+            ax.tick_params(colors='white')
+            for spine in ax.spines.values(): spine.set_visible(False)
+            mostrar_figura(fig, 'eda')
+
+        with col2:
+            st.markdown("**Saldo Capital vs Pago (Log)**")
+            fig, ax = plt.subplots(figsize=(6, 5))
+            fig.patch.set_alpha(0.0)
+            ax.patch.set_alpha(0.0)
+            sns.boxplot(data=df, x='pago', y='saldo_capital', palette=['#555555', '#00D448'], ax=ax, showfliers=False)
+            ax.set_yscale('log')
+            ax.set_xticklabels(['No Pagó', 'Sí Pagó'], color='white')
+            ax.set_ylabel('Saldo Capital ($)', color='white')
+            ax.set_xlabel('')
+            ax.tick_params(colors='white')
+            for spine in ax.spines.values(): spine.set_visible(False)
+            mostrar_figura(fig, 'eda')
+
+
+        st.markdown("### 💰 Perfil Financiero: ¿Quiénes son los que pagan?")
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown("#### Días de Mora (Factor Crítico)")
+            st.info("""
+                **Hallazgo:** Existe una clara distinción en la antigüedad.
+                * Los clientes que pagan tienen una mediana de mora de **~800 días**.
+                * Los que no pagan se sitúan sobre los **1,500 días**.
+                
+                **Estrategia:** La "frescura" de la deuda es un predictor fuerte de éxito. 
+                Las deudas de más de 4 años (>1500 días) entran en una zona de muy difícil recuperación.
+                """)
+
+        with col2:
+            st.markdown("#### Saldo Capital (Factor Neutro)")
+            st.warning("""
+                **Hallazgo:** Las distribuciones son casi idénticas.
+                * El tamaño de la deuda **NO discrimina** entre pagadores y no pagadores.
+                * Curiosamente, la mediana de los que pagan es ligeramente *superior*.
+                
+                **Estrategia:** No discriminar ni priorizar negativamente los montos altos. 
+                Un cliente con deuda alta tiene la misma voluntad de pago que uno pequeño.
+                """)
+
+        st.divider()
+
+
+        st.subheader("Calidad de Cartera por Banco")
+
+        # Gráfico apilado de bancos: agregado en el almacén leyendo solo `banco` y `pago`
+        resumen = resumen_banco('limpia').nlargest(10, 'filas')
+        tabla_pct = pd.DataFrame({0: 1 - resumen['media_pago'], 1: resumen['media_pago']}) * 100
+        orden = resumen['media_pago'].sort_values(ascending=False).index
+
+        fig, ax = plt.subplots(figsize=(12, 4))
+        fig.patch.set_alpha(0.0)
+        ax.patch.set_alpha(0.0)
+
+        tabla_pct.reindex(orden).plot(kind='bar', stacked=True, color=['#555555', '#00D448'], ax=ax, edgecolor='black', width=0.8)
+
+        ax.set_title('Tasa de Recuperación por Banco', color='white', fontsize=14)
+        ax.set_ylabel('% Recuperación', color='white')
+        ax.set_xlabel('')
+        ax.tick_params(colors='white', axis='x', rotation=45)
+        ax.tick_params(colors='white', axis='y')
+        ax.legend(title='Pago', labels=['No', 'Sí'], labelcolor='white', facecolor='black', edgecolor='white')
+
+        for spine in ax.spines.values(): spine.set_visible(False)
+        mostrar_figura(fig, 'eda')
+
+
+        st.warning("""
+            **Variable de Bajo Impacto.**
+            Al comparar las tasas de recuperación entre entidades, observamos un comportamiento **uniforme**.
+            * La probabilidad de pago es prácticamente idéntica (~1%) sin importar si la deuda proviene de Davivienda, Citibank o BBVA.
+            * **Implicación para el Modelo:** Es probable que esta variable tenga una **importancia baja (Low Feature Importance)** en el árbol de decisión, ya que no permite separar claramente a los pagadores de los deudores.
+            """)
+
+    with tab4:
+        st.subheader("Perfil de Riesgo Demográfico")
+
+        # Función auxiliar para graficar al estilo "Dark Mode"
+        def plot_stacked_dark(df, col, titulo, palette=['#444444', '#00D448']):
+            # 1. Preparar datos (Crosstab normalizado)
+            cross = pd.crosstab(df[col], df['pago'], normalize='index') * 100
+
+            # Ordenar por la tasa de pago (columna 1) para dar efecto de "ranking"
+            cross = cross.sort_values(by=1, ascending=True)
+
+            # 2. Configurar Plot
+            fig, ax = plt.subplots(figsize=(10, 6))
+            fig.patch.set_alpha(0.0) # Fondo transparente
+            ax.patch.set_alpha(0.0)
+
+            # 3. Graficar Apilado
+            cross.plot(kind='barh', stacked=True, color=palette, ax=ax, edgecolor='black', width=0.7)
+
+            # 4. Estilizado Dark
+            ax.set_title(titulo, color='#00D448', fontsize=14, fontweight='bold')
+            ax.set_xlabel('Proporción (%)', color='white')
+            ax.set_ylabel('')
+            ax.tick_params(colors='white', which='both')
+            ax.legend(labels=['No Pagó', 'Sí Pagó'], loc='upper center', bbox_to_anchor=(0.5, -0.1), 
+                    ncol=2, frameon=False, labelcolor='white')
+
+            # Quitar bordes feos
+            for spine in ax.spines.values(): spine.set_visible(False)
+
+            # 5. Etiquetas de Datos (Solo en la parte verde para no saturar)
+            for n, container in enumerate(ax.containers):
+                # Solo etiquetamos la serie 1 (Los que Pagan - Verde)
+                if n == 1: 
+                    labels = [f'{v.get_width():.1f}%' if v.get_width() > 0 else '' for v in container]
+                    ax.bar_label(container, labels=labels, label_type='center', 
+                                color='white', fontweight='bold', fontsize=10)
+
+            return fig
+
+        col1, col2 = st.columns(2)
+        # Cartera compartida con las características ya materializadas: no se le agregan columnas
+        caracteristicas = cartera_caracteristicas()
+
+        # GRÁFICA 1: EDAD
+        with col1:
+            # Categórica ordenada por etapa de vida (característica `rango_edad`); el crosstab omite las vacías
+            fig_edad = plot_stacked_dark(caracteristicas, 'rango_edad', 'Probabilidad de Pago por Edad')
+            mostrar_figura(fig_edad, 'eda')
+
+        # GRÁFICA 2: GÉNERO
+        with col2:
+            fig_gen = plot_stacked_dark(caracteristicas, 'genero_normalizado', 'Probabilidad de Pago por Género')
+            mostrar_figura(fig_gen, 'eda')
+
+        # --- INSIGHTS DE NEGOCIO ---
+        st.markdown("---")
+        st.info("""
+            **🧠 Lectura de las Gráficas (Stacked Bars):**
+            * **La Barra Verde:** Representa tu **Tasa de Recuperación Real**. Cuanto más grande sea el segmento verde, mejor es ese grupo.
+            * **Edad:** Visualmente confirmarás si la barra verde crece con la edad (tendencia típica: a mayor edad, mayor responsabilidad financiera).
+            * **Género:** Te permite ver de un vistazo qué género es más rentable, ignorando el hecho de que tengas más hombres o mujeres en total.
+            """)    
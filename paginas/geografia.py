@@ -0,0 +1,74 @@
+import streamlit as st
+
+from paginas.recursos import agregados_departamento
+
+METRICAS = {
+    'Tasa de Pago': 'tasa_pago',
+    'Deudores': 'deudores',
+    'Saldo Total': 'saldo_total',
+    'Saldo Medio': 'saldo_medio',
+    'Probabilidad Media (Árbol)': 'probabilidad_media',
+    'Anomalías': 'anomalias',
+    'Tasa de Anomalías': 'tasa_anomalias',
+}
+FORMATOS = {
+    'tasa_pago': '{:.2%}', 'deudores': '{:,.0f}', 'pagos': '{:,.0f}', 'saldo_total': '${:,.0f}', 'saldo_medio': '${:,.0f}',
+    'probabilidad_media': '{:.1%}', 'anomalias': '{:,.0f}', 'tasa_anomalias': '{:.2%}',
+}
+
+
+def mostrar():
+    agregados = agregados_departamento()
+
+    st.title("🗺️ Recuperación por Departamento")
+    st.markdown("""
+    Deudores, tasa de pago, saldo, probabilidad media del árbol y alertas del autoencoder por departamento.
+    Los filtros se combinan entre sí; las cifras salen de agregados precalculados, sin recorrer la cartera.
+    """)
+
+    col1, col2, col3 = st.columns(3)
+    bancos = col1.multiselect("Banco", agregados.bancos)
+    rangos_edad = col2.multiselect("Rango de edad", agregados.rangos_edad)
+    meses = col3.multiselect("Mes", agregados.meses)
+    filtros = {'bancos': bancos, 'rangos_edad': rangos_edad, 'meses': meses}
+
+    resumen = agregados.resumen(**filtros)
+    if resumen.empty:
+        st.info("No hay deudores con esa combinación de filtros.")
+        return
+
+    deudores = resumen['deudores'].sum()
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Deudores", f"{deudores:,}")
+    c2.metric("Tasa de Pago", f"{resumen['pagos'].sum() / deudores:.2%}")
+    c3.metric("Saldo Total", f"${resumen['saldo_total'].sum():,.0f}")
+    c4.metric("Anomalías", f"{resumen['anomalias'].sum():,}")
+
+    # --- RANKING ---
+    st.subheader("📊 Ranking de Departamentos")
+    nombre = st.selectbox("Métrica", list(METRICAS))
+    metrica = METRICAS[nombre]
+    st.bar_chart(resumen[metrica].sort_values(ascending=False), horizontal=True, height=600)
+
+    st.dataframe(
+        resumen.style.format(FORMATOS).background_gradient(cmap='Greens', subset=[metrica]),
+        use_container_width=True
+    )
+
+    # --- CRUCE CON BANCO ---
+    st.subheader("🏦 Departamento × Banco")
+    st.dataframe(
+        agregados.cruce(metrica, **filtros).style.format(FORMATOS[metrica], na_rep='-')
+        .background_gradient(cmap='Greens', axis=None),
+        use_container_width=True
+    )
+
+    # --- MAPA ---
+    st.subheader("🗺️ Datos para Mapa Coroplético")
+    st.markdown("Una fila por departamento con su **código DANE**, lista para unir a un GeoJSON de departamentos de Colombia.")
+    coropleta = agregados.coropleta(**filtros)
+    st.download_button("⬇️ Descargar CSV", coropleta.to_csv(index=False).encode('utf-8'),
+                       file_name="recuperacion_departamentos.csv", mime="text/csv")
+    sin_ubicacion = agregados.sin_ubicacion(**filtros)
+    if not sin_ubicacion.empty:
+        st.caption(f"{sin_ubicacion['deudores'].sum():,} deudores sin departamento no aparecen en el mapa.")
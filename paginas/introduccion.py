@@ -0,0 +1,722 @@
+import matplotlib.pyplot as plt
+import matplotlib.ticker as ticker
+import seaborn as sns
+import streamlit as st
+
+from paginas.componentes import mostrar_figura, mostrar_grilla
+from paginas.recursos import (calidad_cartera, cargar_datos, cartera_introduccion, categorias_introduccion, grilla_cartera,
+                              indice_deudores, resumen_banco)
+from riesgo.caracteristicas import calcular
+
+
+def mostrar():
+    df = cargar_datos()
+
+    st.title("📊 Prueba Técnica: Científico de Datos")
+    st.markdown("""
+    **Objetivo:** Evaluar la probabilidad de que un deudor realice el pago.
+    """)    
+
+    st.markdown("""
+    ### Diccionario de Datos
+
+    **A. Perfil del Deudor (Demográfico)**
+    *   **`identificacion` / `tipo_documento`**: Identificadores únicos del cliente. (C: Cédula Ciudadanía, E: Cédula Extranjería, T: Tarjeta Identidad, P: Pasaporte).
+    *   **`genero`**: Sexo del cliente.
+    *   **`rango_edad_probable`**: Grupo etario estimado.
+    *   **`departamento`**: Ubicación geográfica.
+
+    **B. Estado de la Deuda (Financiero)**
+    *   **`mes`**: Fecha de corte de la información.
+    *   **`saldo_capital`**: El monto principal que debe la persona (sin intereses de mora).
+    *   **`dias_mora`**: Cuántos días han pasado desde que debió pagar.
+    *   **`banco`**: La entidad dueña de la deuda original.
+    *   **`antiguedad_deuda`**: Fecha en que se originó la obligación.
+
+    **C. Comportamiento de Pago (Histórico)**
+    *   **`pago_mes_anterior`**: Indica si pagó algo el mes pasado (1=Sí, 0=No).
+    *   **`meses_desde_ultimo_pago`**: Recencia. Si es alto o nulo, es un cliente difícil.
+    *   **`sin_pago_previo`**: Bandera que indica si nunca ha realizado un pago.
+
+    **D. Gestión y Resultado (Operativo)**
+    *   **`contacto_mes_actual` / `anterior` / `ultimos_6meses`**: Mide la intensidad de la gestión.
+    *   **`duracion_llamadas_ultimos_6meses`**: Calidad del contacto.
+    *   **`pago`**: **Variable Objetivo (Target)**. (1 = Recuperó, 0 = No recuperó).
+    """, unsafe_allow_html=True)
+
+    # Vista preliminar de datos
+    st.header("1. Lectura y Estructura de Datos")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Total Registros", df.shape[0])
+    col2.metric("Total Columnas", df.shape[1])
+    col3.metric("Tasa Global de Pago", f"{df['pago'].mean()*100:.2f}%")
+
+    st.write("Vista previa de las primeras filas:")
+    st.dataframe(df.head())
+
+    st.subheader("🧪 Reporte de Calidad del Archivo")
+    calidad = calidad_cartera()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Filas Válidas", f"{len(calidad['validas']):,}")
+    col2.metric("Filas en Cuarentena", f"{len(calidad['cuarentena']):,}")
+    col3.metric("Reglas con Fallas", int((calidad['reporte']['filas'] > 0).sum()))
+    st.dataframe(
+        calidad['reporte'].style.format({'proporcion': '{:.1%}', 'max_proporcion': '{:.0%}'}, na_rep='-'),
+        use_container_width=True, hide_index=True
+    )
+    if not calidad['cuarentena'].empty:
+        with st.expander("Ver filas en cuarentena"):
+            st.dataframe(calidad['cuarentena'], use_container_width=True)
+
+    st.header("2. Limpieza y Distribución")
+
+    st.subheader("Análisis de Duplicados")
+    st.markdown("""
+    Es importante mencionar que, para el análisis de duplicados, **no se tuvieron en cuenta** las columnas `mes` ni `antiguedad_deuda`.
+    
+    *   **`mes`**: Se excluye debido a la incertidumbre sobre si es un mes de registro o de corte, lo que genera diferencias en filas que describen el mismo estado de deuda.
+    *   **`antiguedad_deuda`**: Se excluye por la gran cantidad de valores vacíos.
+
+    **Ejemplo (Cliente 513810):**
+    A continuación se observa cómo, para saldos y días de mora idénticos, existen valores de mes distintos y vacíos en la antigüedad.
+    """)
+
+    # Mostrar ejemplo del cliente 513810 para justificar la exclusión de variables
+    st.dataframe(indice_deudores('original').filas('513810').sort_values(by= "saldo_capital",ascending=False))
+
+    # --- B. ESTRATEGIA DE PRIORIZACIÓN (EL TRUCO) ---
+    st.markdown("""
+    **Estrategia de Limpieza:**
+    Se decidió eliminar los duplicados conservando el registro con mayor información. Para esto, se ordenaron los datos priorizando aquellos que tienen fecha en `antiguedad_deuda`, asegurando que al eliminar duplicados se mantenga el registro más completo.
+    """)
+
+    cols_modelo = [
+    'tipo_documento', 'identificacion', 'genero', 'rango_edad_probable', 
+    'departamento', 'saldo_capital', 'dias_mora', 'banco', 
+    'pago_mes_anterior', 'meses_desde_ultimo_pago', 'sin_pago_previo', 
+    'contacto_mes_actual', 'contacto_mes_anterior', 'contacto_ultimos_6meses', 
+    'duracion_llamadas_ultimos_6meses', 'pago'
+    ]
+
+    # 1. Ordenamos por 'antiguedad_deuda'. 'na_position=last' empuja los vacíos al final.
+    #    Así, las filas con fecha quedan ARRIBA del todo.
+    # 2. Borramos duplicados quedándonos con el PRIMERO (keep='first')
+    #    Como ordenamos antes, el "primero" es el que tiene fecha.
+    # La cartera resultante se calcula una vez y la comparten todas las sesiones (sin modificarla)
+    df = cartera_introduccion(tuple(cols_modelo))
+    categorias = categorias_introduccion(tuple(cols_modelo))
+
+    st.success(f"**Resultado Final:** El dataset ahora cuenta con **{df.shape[0]}** registros únicos, donde se puede encontrar un mismo cliente mas de una vez pero con deudas disntatas")
+    st.write("**Valores faltantes por columna tras la limpieza:**")
+    st.dataframe(df.isnull().sum().to_frame(name='Faltantes').T)
+
+    with st.expander("🔎 Explorar la cartera limpia completa"):
+        mostrar_grilla(grilla_cartera('limpia'), clave='grilla_limpia')
+
+    # 1. Tu lista de variables DEFINITIVA (Sin mes, sin antiguedad)
+    st.subheader("Inconsistencias y Normalización de Datos Clave")
+    col1, col2 = st.columns([0.3,0.7])
+    # --- PARLA (Explicación del negocio) ---
+    with col1:
+        st.markdown(f"""
+        ### Genero
+        presenta inconsistencias en la captura de datos. Para garantizar la calidad del análisis, se aplica la siguiente **lógica de normalización**:
+        *   **`M`** se estandariza a **`HOMBRE`**.
+        *   **`F`** se estandariza a **`MUJER`**.
+        *   Los marcados como "NO APLICA" puede llegar a ser inconsistente, si se quiere respetar la diversidad de género se podria cambiar a "OTROS", pero en este caso se opta por etiquetarlos como **`NO ESPECIFICADO`**.
+        *   Ademas los {df.genero.isnull().sum()} valores vacíos o nulos se etiquetan como **`No especificado`**.
+        """)
+
+        # Limpieza: M -> HOMBRE, F -> MUJER, vacíos y NO APLICA -> No especificado (característica `genero_normalizado`)
+
+        st.warning("""
+    **Alerta de Calidad de Datos**
+    El análisis revela una debilidad estructural en la captura de información: **El 49.2% de la cartera (13,884 clientes) carece de identificación de género.**
+    Esto representa un **'Punto Ciego Operativo'**. Al desconocer la identidad de casi la mitad de la población, cualquier segmentación tradicional por género será imprecisa.
+    """)
+
+    with col2:
+        # --- GRÁFICA ESTILIZADA ---
+        fig, ax = plt.subplots(figsize=(10, 5))
+
+        # Fondo transparente para que luzcan los efectos CSS
+        fig.patch.set_alpha(0.0)
+        ax.patch.set_alpha(0.0)
+
+        sns.countplot(data=categorias, x='genero', hue='genero', palette='viridis', order=categorias['genero'].value_counts().index, ax=ax, edgecolor='white', legend=False)
+
+        ax.set_title('Distribución de Clientes por Género', color='#00D448', fontsize=16, fontweight='bold')
+        ax.set_xlabel('Género', color='white', fontsize=12)
+
+        # Quitar Eje Y y Recuadro (Spines) para look minimalista
+        ax.set_ylabel('')
+        ax.set_yticks([])
+        for spine in ax.spines.values():
+            spine.set_visible(False)
+
+        ax.tick_params(axis='x', colors='white', labelsize=10)
+
+        # Etiquetas de datos
+        for container in ax.containers:
+            ax.bar_label(container, fmt='%d', padding=3, color='white', fontsize=12, fontweight='bold')
+
+        mostrar_figura(fig, 'introduccion') 
+
+
+    st.success("""
+    **Perfilamiento del Segmento Identificado**
+    Dentro del 51% de clientes que **sí** tienen datos, existe un claro sesgo:
+    * Por cada mujer, hay **1.7 hombres** (9,101 vs 5,218).
+    * El producto tiene una tracción histórica mucho mayor en el segmento masculino.
+    """)
+
+    st.divider()
+
+    col1, col2 = st.columns([0.3, 0.7])
+
+    with col1:
+        st.markdown("""
+        ### rango_edad_probable 
+        contenía múltiples rangos superpuestos y formatos inconsistentes. 
+        Se aplicó una **lógica de agrupación** para unificar estos valores:""")
+
+        # Mapeo de rangos superpuestos: riesgo.limpieza.MAPA_EDAD (característica `rango_edad`)
+
+        st.caption("Unificados")
+        st.write(f"""
+                    *   **18-25**: Jóvenes.
+                    *   **26-35**: Adultos Jóvenes.
+                    *   **36-45**: Adultos.
+                    *   **46-55**: Adultos Maduros.
+                    *   **56-65**: Mayores.
+                    *   **Mayor a 65**: Tercera Edad.
+                    *   **No especificado**: Los {df['rango_edad_probable'].isnull().sum()} Datos faltantes y los "NO APLICA" se marcan como no especificaods.
+                     """)
+
+    with col2:
+        # Gráfica
+        fig, ax = plt.subplots(figsize=(10, 4))
+        fig.patch.set_alpha(0.0)
+        ax.patch.set_alpha(0.0)
+
+        order_edad = ['18-25', '26-35', '36-45', '46-55', '56-65', 'Mayor a 65', 'No especificado']
+        order_edad = [x for x in order_edad if x in categorias['rango_edad_probable'].unique()]
+
+        sns.countplot(data=categorias, x='rango_edad_probable', hue='rango_edad_probable', palette='magma', order=order_edad, ax=ax, edgecolor='white', legend=False)
+
+        ax.set_title('Distribución de Clientes por Edad', color='#00D448', fontsize=16, fontweight='bold')
+        ax.set_xlabel('Rango de Edad', color='white', fontsize=12)
+
+        ax.set_ylabel('')
+        ax.set_yticks([])
+        for spine in ax.spines.values():
+            spine.set_visible(False)
+
+        ax.tick_params(axis='x', colors='white', labelsize=10)
+
+        for container in ax.containers:
+            ax.bar_label(container, fmt='%d', padding=3, color='white', fontsize=12, fontweight='bold')
+
+        mostrar_figura(fig, 'introduccion')
+
+
+    # 1. Calidad de Datos (Crucial para Skip Tracing - Localización)
+    st.warning("""
+    **Riesgo Operativo: Datos Faltantes (25%)**
+    El 25.1% de la cartera (7,071 deudores) no tiene edad registrada.
+    * **Impacto en Cobranza:** Esto dificulta la segmentación de la estrategia. No es lo mismo negociar con un joven que inicia su vida crediticia que con un pensionado. Al no tener la edad, perdemos la capacidad de personalizar el guion de cobro según la etapa de vida del deudor.
+    """)
+
+    # 2. El Grueso de la Cartera (Donde está la plata)
+    st.success("""
+    **Foco de Gestión: Población Económicamente Activa (26-45 años)**
+    El 40% de los deudores se concentra en las edades de **26 a 45 años**.
+    * **Lectura de Negocio:** Es lógico, ya que es la etapa de mayor consumo y endeudamiento (hipotecas, vehículos, tarjetas).
+    * **Oportunidad:** Este segmento suele estar laboralmente activo. La estrategia de recuperación aquí debe enfocarse en **acuerdos de pago basados en flujo de caja (salario)** o, en última instancia, medidas sobre ingresos laborales.
+    """)
+
+    # 3. La Anomalía del Riesgo (Jóvenes vs. Tercera Edad)
+    st.info("""
+    **Perfil de Riesgo Atípico:**
+    * **Riesgo en Tercera Edad (>65 años):** Hay **8 veces más deudores mayores de 65 años** que jóvenes. Esto representa un riesgo de recuperación alto:
+        1.  Ingresos fijos limitados (pensiones).
+        2.  Protecciones legales reforzadas.
+        3.  Riesgo de incobrabilidad por fallecimiento.
+    """)
+
+    st.divider()
+
+    col1, col2 = st.columns([0.3, 0.7])
+
+    with col1:
+        st.markdown("""
+        ### saldo_capital 
+        corresponde al monto principal de la obligación pendiente.
+        
+        **Importancia:**
+        Entender la distribución de los montos permite segmentar la estrategia de cobranza:
+        *   **Saldos Bajos:** Gestión masiva/digital.
+        *   **Saldos Altos:** Gestión personalizada.
+        """)
+
+        st.write("**Estadísticas Descriptivas:**")
+        st.dataframe(df['saldo_capital'].describe().to_frame().style.format("${:,.0f}"))
+
+    with col2:
+        fig, ax = plt.subplots(figsize=(10, 6))
+        fig.patch.set_alpha(0.0)
+        ax.patch.set_alpha(0.0)
+
+        sns.histplot(data=df, x='saldo_capital', kde=True, color='#00D448', ax=ax, edgecolor='#222222')
+
+        ax.set_title('Distribución del Saldo Capital', color='#00D448', fontsize=16, fontweight='bold')
+        ax.set_xlabel('Saldo Capital (COP)', color='white', fontsize=12)
+        ax.set_ylabel('Frecuencia', color='white', fontsize=12)
+
+        ax.tick_params(axis='x', colors='white', labelsize=9, rotation=15)
+        ax.tick_params(axis='y', colors='white', labelsize=10)
+
+        for spine in ax.spines.values():
+            spine.set_visible(False)
+
+        ax.xaxis.set_major_formatter(ticker.FuncFormatter(lambda x, p: f'${x:,.0f}'))
+
+        mostrar_figura(fig, 'introduccion')
+
+    # 1. El conflicto Media vs Mediana (Esencial en finanzas)
+    st.info("""
+    **La "Trampa del Promedio" (Media vs. Mediana)**
+    Esta gráfica muestra una clásica distribución de **"Cola Larga" (Long Tail)**, típica en carteras financieras.
+    * **Media Inflada 5.7M$:** El promedio es engañoso porque los grandes deudores (valores extremos) lo empujan hacia arriba.
+    * **La Realidad 2.3M\$:** El dato real de gestión es que el 50% de los clientes debe menos de \$2.3 millones.
+    * **Conclusión:** Diseñar metas o incentivos basados en el promedio (\$5.7M) sería un error, ya que la mayoría de la cartera no llega a ese monto.
+    """)
+
+    # 2. La Estrategia de Segmentación (El insight más valioso)
+    st.success("""
+    **Estrategia Sugerida por Cuartiles (Costo-Eficiencia)**
+    Los cuartiles nos dictan qué canal de cobranza usar para maximizar el retorno:
+    * **Masivo / Digital (Q1 < \$1.2M):** El 25% de la base debe menos de \$1.2M. Aquí, el costo de una llamada humana podría superar la ganancia esperada. **Recomendación:** SMS, Email, Bots.
+    * **Gestión Híbrida (Q2 - Q3):** El grueso de la población.
+    * **VIP / Especializada (Top 25% > \$6.2M):** Este grupo concentra el mayor capital en riesgo (llegando hasta \$113M). **Recomendación:** Asignar a los mejores negociadores, ya que recuperar una sola de estas cuentas equivale a recuperar 50 de las pequeñas.
+    """)
+
+    # 3. Limpieza de Datos (Anomalías)
+    st.warning("""
+    **Ruido Operativo: Micro-Saldos**
+    Se detectó un valor mínimo de **\$500 pesos**.
+    * **Diagnóstico:** Estos son probablemente "residuos de caja" (pagos mal aplicados o intereses residuales).
+    * **Acción Técnica:** Se deben filtrar y excluir del modelo predictivo y de la gestión telefónica. Llamar a cobrar \$500 pesos destruye valor y genera fricción innecesaria con el cliente.
+    """)
+
+    st.divider()
+
+    col1, col2 = st.columns([0.3, 0.7])
+
+    with col1:
+        st.markdown("""
+        ### dias_mora 
+        indica el tiempo transcurrido desde que el cliente debió realizar el pago límite.
+        
+        **Importancia (El Termómetro):**
+        Esta variable define la etapa de gestión:
+        *   **Preventiva:** Mora baja (recién vencido).
+        *   **Administrativa:** Mora media.
+        *   **Jurídica/Castigo:** Mora muy alta (difícil recuperación).
+        """)
+
+        st.write("**Estadísticas:**")
+        st.dataframe(df['dias_mora'].describe().to_frame().style.format("{:,.0f}"))
+
+    with col2:
+        fig, ax = plt.subplots(figsize=(10, 7))
+        fig.patch.set_alpha(0.0)
+        ax.patch.set_alpha(0.0)
+
+        sns.histplot(data=df, x='dias_mora', kde=True, color='#00D448', ax=ax, edgecolor='#222222', bins=30)
+
+        ax.set_title('Distribución de Días de Mora', color='#00D448', fontsize=16, fontweight='bold')
+        ax.set_xlabel('Días de Mora', color='white', fontsize=12)
+        ax.set_ylabel('Frecuencia', color='white', fontsize=12)
+
+        ax.tick_params(axis='x', colors='white', labelsize=10)
+        ax.tick_params(axis='y', colors='white', labelsize=10)
+
+        for spine in ax.spines.values():
+            spine.set_visible(False)
+
+        mostrar_figura(fig, 'introduccion')
+
+    # 1. El descubrimiento del Tipo de Negocio (El Insight más fuerte)
+    st.warning("""
+    Los datos revelan la naturaleza real de la operación:
+    * **El Hallazgo:** El primer cuartil (25% más reciente) comienza en **644 días de mora** (casi 2 años).
+    * **Conclusión:** No estamos gestionando créditos vigentes ni mora temprana. Estamos ante una **Cartera Castigada**.
+    * **Implicación:** Las estrategias de "retención" o "preventivas" no aplican. Aquí se requiere una estrategia de **negociación de quitas y condonaciones**, ya que el cliente lleva años sin pagar.
+    """)
+
+    # 2. Análisis de la Distribución (Técnico)
+    st.info("""
+    La curva no es uniforme, presenta tres picos claros (~500, ~1,500 y ~2,500 días).
+    * No estamos ante una población homogénea. Estos picos probablemente representan **"Cosechas" (Vintages)** específicas o compras de cartera masivas realizadas en años distintos.
+    * El modelo debería incluir la variable "Antigüedad de la Deuda" como un factor de segmentación, ya que la propensión de pago de un deudor de 2 años es estructuralmente diferente a la de uno de 7 años.
+    """)
+
+    # 3. Limpieza de Datos (Legal/Outliers)
+    st.error("""
+    Se detectaron registros con **27 años de mora** (máx: 10,031 días).
+    * Gran parte de esta deuda podría estar **prescrita legalmente**, lo que hace imposible su cobro jurídico.
+    * Estos registros son ruido puro para un modelo de predicción de pago (Probabilidad $\\approx 0$). Se recomienda excluirlos del entrenamiento para no ensuciar los patrones de la deuda recuperable.
+    """)
+
+    st.divider()
+
+    col1, col2 = st.columns([0.3, 0.7])
+
+    with col1:
+        st.markdown("""
+        ### Banco
+        indica la entidad financiera propietaria de la obligación. Esta variable se encuentra **totalmente limpia**: no presenta valores nulos ni categorías inconsistentes, por lo que podemos visualizar la participación de mercado directamente.
+        """)
+
+        # 1. Calidad del Dato (La buena noticia)
+        st.success("""
+        **✅ Integridad de Datos: Variable Limpia**
+        A diferencia de los retos demográficos anteriores, la variable `banco` presenta una **completitud del 100%**.
+        * Esto convierte al "Banco de Origen" en una variable pilar (Feature de alta confianza) para la segmentación y el entrenamiento del modelo.
+        """)
+
+    with col2:
+        fig, ax = plt.subplots(figsize=(10, 4))
+        fig.patch.set_alpha(0.0)
+        ax.patch.set_alpha(0.0)
+
+        # Usamos barras horizontales (y='banco') para leer mejor los nombres si son largos
+        sns.countplot(data=df, y='banco', order=df['banco'].value_counts().index, hue='banco', palette='viridis', ax=ax, edgecolor='white', legend=False)
+
+        ax.set_title('Cartera por Banco', color='#00D448', fontsize=16, fontweight='bold')
+        ax.set_xlabel('Número de Clientes', color='white', fontsize=12)
+        ax.set_ylabel('')
+
+        ax.tick_params(axis='x', colors='white', labelsize=10)
+        ax.tick_params(axis='y', colors='white', labelsize=11)
+
+        for spine in ax.spines.values():
+            spine.set_visible(False)
+
+        for container in ax.containers:
+            ax.bar_label(container, fmt='%d', padding=3, color='white', fontsize=10, fontweight='bold')
+
+        mostrar_figura(fig, 'introduccion')
+
+    # 2. El Principio de Pareto (El negocio)
+    # Conteos de la cartera limpia desde el almacén particionado (solo se lee la columna `banco`)
+    top_bancos = resumen_banco('limpia')['filas'].nlargest(2)
+    (banco_1, n_1), (banco_2, n_2) = top_bancos.items()
+    participacion = top_bancos.sum() / resumen_banco('limpia')['filas'].sum()
+    st.info(f"""
+        **📊 Ley de Pareto en Acción (Concentración de Riesgo)**
+        La cartera presenta una alta dependencia de dos originadores principales:
+        * **{banco_1.title()} ({n_1:,}) + {banco_2.title()} ({n_2:,})** agrupan a **{n_1 + n_2:,} clientes**.
+        * **Lectura de Negocio:** El **~{participacion:.0%} de la operación** depende de las políticas de crédito de estas dos entidades. Entender sus perfiles de riesgo explica el comportamiento macro de la cartera.
+        """)
+
+    st.divider()
+
+    st.markdown("""
+        ### Antiguedad de la Deuda
+""")
+
+    # 1. El Argumento Irrefutable (Calidad de Datos)
+    st.error("""
+    **Eliminación de Variable**
+    Se ha decidido excluir esta variable del analicis y del modelo predictivo por una razón crítica de integridad:
+    * **Nulidad Extrema:** Presenta **20,173 valores nulos**, lo que representa el **71.5% de los datos perdidos**.
+    * **Principio de No-Invención:** imputar más del 30-40% de una variable introduce un sesgo artificial severo. Tratar de rescatar una variable con el 70% de faltantes implicaría "fabricar" la historia crediticia de la mayoría de los clientes.
+    """)
+
+    # 3. El Veredicto Final
+    st.success("""
+    El modelo se entrenará utilizando únicamente **`dias_mora`**.
+    Esta decisión prioriza la **calidad del dato**. Estimar la antigüedad real de la deuda con tan poca información sería contraproducente y dañino para la precisión del modelo.
+    """)
+
+    st.divider()
+
+    col1, col2 = st.columns([0.3, 0.7])
+
+    with col1:
+        st.markdown("""
+        ### pago_mes_anterior 
+        es una variable binaria que indica si el cliente realizó algún abono en el mes inmediatamente anterior al corte.
+        """)
+
+        st.error("""
+        La gráfica es contundente: el **99.3% de la base no realizó pagos el mes pasado**.
+        * El Reto no se trata de administrar clientes activos, se trata de **reactivar clientes inactivos**
+        """)
+
+        st.success("""
+        Ese pequeño grupo del **0.7% (aprox. 197 clientes)** que sí pagó el mes pasado es el activo más valioso de la base.
+        * El mejor predictor del futuro es el pasado inmediato. Si un cliente pagó hace 30 días, su probabilidad de pagar hoy es exponencialmente más alta que la del resto.
+        * Estos no son deudores fríos; son clientes con **Voluntad de Pago demostrada y capacidad de caja activa**. A pesar de ser una minoría estadística, este grupo debe tener **Prioridad Absoluta** en la gestión.
+        
+        """)
+
+    with col2:
+        fig, ax = plt.subplots(figsize=(2,2))
+        fig.patch.set_alpha(0.0)
+        ax.patch.set_alpha(0.0)
+
+        # Datos
+        datos = df['pago_mes_anterior'].value_counts().reindex([1, 0], fill_value=0)
+        labels = ['Sí Pagó', 'No Pagó']
+        colors = ['#00D448', '#FF4B4B'] # Verde y Gris
+
+        # Gráfica de Dona
+        wedges, texts, autotexts = ax.pie(
+            datos, 
+            labels=None,       # <--- Esto oculta los NOMBRES en la gráfica
+            colors=colors, 
+            autopct='%1.1f%%', # <--- Esto muestra los VALORES en la gráfica
+            startangle=90, 
+            pctdistance=1.15,
+            wedgeprops=dict(width=0.4, edgecolor='#111111'),
+            textprops=dict(color="white", fontsize=12, fontweight='bold')
+        )
+
+        # 2. Configuración de la Leyenda
+        # frameon=False quita el recuadro y el fondo
+        leg = ax.legend(wedges, labels,
+                title="Categoría",
+                loc="center left",
+                bbox_to_anchor=(1, 0, 0.5, 1),
+                frameon=False,      # <--- AQUÍ se hace transparente el fondo
+                labelcolor='white'  # <--- Opcional: pone el texto de la leyenda en blanco
+        )
+
+        # Si quieres cambiar el color del título de la leyenda a blanco también:
+        plt.setp(leg.get_title(), color='white')
+
+
+        mostrar_figura(fig, 'introduccion')
+
+
+    st.divider()
+
+    col1, col2 = st.columns([0.3, 0.7])
+
+    with col1:
+        st.markdown("""
+        La variable `sin_pago_previo` nos indica si el cliente ha realizado algun pago antes o si es un caso de "cero pagos" históricos, ademas de ser de gran ayuda para el analisis ya que no tiene valores vacíos.
+        
+        **Importancia del Hábito:**
+        *   **Con Pago Previo (0):** Ya rompió la inercia. ha pagado y ha tenido voluntad antes. Es más fácil de recuperar.
+        *   **Sin Pago Previo (1):** Es el perfil más riesgoso.
+        """)
+
+
+        # 1. El Hallazgo Financiero (La diferencia del 1%)
+        st.warning("""
+        Al cruzar los datos históricos (1.7% ha pagado alguna vez) vs. los actuales (0.7% pagó el mes pasado), encontramos una brecha crítica de 272 clientes**.
+        * **¿Quiénes son?** Son **Pagadores Caídos**. Clientes que ya demostraron voluntad y capacidad de pago en el pasado, pero que recientemente se detuvieron.
+        * **Oportunidad de Negocio:** Este grupo representa la **ganancia rápida**. Convencer a alguien que ya pagó es 5 veces más barato y rápido que convencer a un deudor crónico.
+        """)
+
+    with col2:
+        fig, ax = plt.subplots(figsize=(2, 2))
+        fig.patch.set_alpha(0.0)
+        ax.patch.set_alpha(0.0)
+
+        # Datos: 1 = Sin pago previo (Malo), 0 = Con pago previo (Bueno)
+        datos = df['sin_pago_previo'].value_counts().reindex([1, 0], fill_value=0)
+        labels = ['Nunca ha\nPagado', 'Ha Pagado\nAntes']
+        colors = ['#FF4B4B', '#00D448'] # Rojo para alerta, Verde para positivo
+
+        wedges, texts, autotexts = ax.pie(
+            datos, 
+            labels=None, 
+            colors=colors, 
+            autopct='%1.1f%%',
+            startangle=90, 
+            pctdistance=1.15,
+            wedgeprops=dict(width=0.4, edgecolor='#111111'),
+            textprops=dict(color="white", fontsize=12, fontweight='bold')
+        )
+
+        # Configuración de la Leyenda (Igual a pago_mes_anterior)
+        leg = ax.legend(wedges, labels, title="Categoría", loc="center left", bbox_to_anchor=(1, 0, 0.5, 1), frameon=False, labelcolor='white')
+        plt.setp(leg.get_title(), color='white')
+
+        mostrar_figura(fig, 'introduccion')
+
+    st.markdown("Aqui algunos de los clientes que cumplen con esta condición de 'Pagadores Caídos':")
+
+    st.dataframe(df[calcular(df, ['pagador_caido'])['pagador_caido']].head(5))
+
+    st.divider()
+
+    col1, col2 = st.columns([0.3, 0.7])
+
+    with col1:
+        st.markdown("""
+        ### meses_desde_ultimo_pago 
+        """)
+
+        st.error("""
+        Observamos un fenómeno interesante en la distribución de clientes activos:
+        * **Mes 1 y 2:** Mantenemos un volumen constante de clientes (~200) cuyo último pago fue reciente. Esto indica un comportamiento de pago intermitente pero activo.
+        * El volumen de clientes cuyo último pago fue hace 3 meses cae drásticamente a solo **47 personas**.
+
+        **Interpretación de Riesgo:**
+        En cobranza, el mes 3 suele ser el punto de inflexión donde el hábito de pago se rompe.
+        Quien deja pasar 90 días sin pagar, pierde la costumbre y la prioridad de pago. La gestión debe ser **preventiva antes del Mes 3**. Tratar de reactivar a un cliente que lleva más de 90 días "frío" es exponencialmente más costoso que gestionarlo cuando solo lleva 30 o 60 días.
+        """)
+
+    with col2:
+        fig, ax = plt.subplots(figsize=(10, 5))
+        fig.patch.set_alpha(0.0)
+        ax.patch.set_alpha(0.0)
+
+        # -1 = nunca ha pagado (característica `recencia_pago`)
+        df_viz = calcular(df, ['recencia_pago']).astype(int)
+
+        sns.countplot(data=df_viz, x='recencia_pago', color='#00D448', ax=ax, edgecolor='#222222')
+
+        ax.set_title('Distribución de Recencia (Meses)', color='#00D448', fontsize=16, fontweight='bold')
+        ax.set_xlabel('Meses desde Último Pago', color='white', fontsize=12)
+        ax.set_ylabel('')
+        ax.set_yticks([])
+
+        ax.tick_params(axis='x', colors='white', labelsize=10)
+
+        # Personalizar etiquetas del eje X: Cambiamos '-1' por 'Nunca'
+        labels = [item.get_text() for item in ax.get_xticklabels()]
+        new_labels = ['Nunca' if x == '-1' else x for x in labels]
+        ax.set_xticklabels(new_labels, rotation=45)
+
+        for spine in ax.spines.values():
+            spine.set_visible(False)
+
+        for container in ax.containers:
+            ax.bar_label(container, fmt='%d', padding=3, color='white', fontsize=9)
+
+        mostrar_figura(fig, 'introduccion')
+
+    st.info("""
+        La gran barra de valores nulos no es un error de datos, es información y significa que nunca han pagado
+        * En lugar de imputar estos valores, el modelo tratará los Nulos como una categoría explícita -1. Esto por que el comportamiento de alguien que *nunca* ha pagado es estructuralmente distinto al de alguien que pagó hace 6 meses. No se deben mezclar en el análisis.
+        """)
+
+    # 2. Estrategia Operativa (Qué hacer)
+    st.success("""
+    **2. Estrategia de Intensidad Diferenciada**
+    Basado en este hallazgo, la operación debe dividirse en dos fases:
+    * **Fase de Choque (Días 1-60):** Gestión humana intensiva y negociación personalizada. Aquí es donde se recupera el dinero. Cada día cuenta antes de llegar al "abismo".
+    * **Fase de Mantenimiento (Día 61+):** Una vez cruzada la frontera del mes 3, el costo de llamar supera la probabilidad de éxito. Estos casos deben migrar a **Canales Digitales (Low Cost)** o procesos jurídicos, liberando a los asesores para atender la Fase de Choque.
+    """)
+
+    st.divider()
+
+    col1, col2 = st.columns([0.3, 0.7])
+
+    with col1:
+        st.markdown("""
+        ### **Variables de Gestión (Operativo):**
+        """)
+
+        # 1. EL PROBLEMA DE CAPACIDAD (Los Donas)
+        st.error("""
+        **1. Diagnóstico de Cobertura: El "Techo" Operativo**
+        Los datos revelan una saturación crítica en la capacidad del Call Center:
+        * **Capacidad Estática (~11%):** La consistencia casi robótica entre la gestión del Mes Actual (10.8%) y el Anterior (10.9%) indica que la operación ha tocado su techo físico. No importa cuánto crezca la mora, el equipo solo tiene manos para cubrir al 11% de la base.
+        """)
+
+
+    with col2:
+        # Definimos las variables
+        vars_contacto = ['contacto_mes_actual', 'contacto_mes_anterior', 'contacto_ultimos_6meses']
+        var_duracion = 'duracion_llamadas_ultimos_6meses'
+
+        # Unimos todas para el loop, pero las trataremos diferente
+        variables_gestion = vars_contacto + [var_duracion]
+
+        fig, axes = plt.subplots(2, 2, figsize=(10, 6))
+        fig.patch.set_alpha(0.0) # Fondo transparente
+        axes = axes.flatten()
+
+        for i, col in enumerate(variables_gestion):
+            ax = axes[i]
+            ax.patch.set_alpha(0.0)
+
+            # Estilizado del título
+            titulo = col.replace('_', ' ').replace('ultimos', 'últ.').title()
+            ax.set_title(titulo, color='#00D448', fontsize=12, fontweight='bold')
+
+            # --- Lógica A: Variable Numérica Continua (Duración) ---
+            if col == var_duracion:
+                # Filtramos solo los mayores a 0
+                data_filtrada = df[df[col] > 0][col]
+
+                if not data_filtrada.empty:
+                    sns.histplot(data_filtrada, color='#00D448', ax=ax, kde=True, bins=20, element="step", alpha=0.5)
+                    # Ajustes visuales ejes
+                    ax.set_ylabel('Frecuencia', color='white', fontsize=9)
+                    ax.set_xlabel('Segundos', color='white', fontsize=9)
+                    ax.tick_params(axis='both', colors='white', labelsize=8)
+                    for spine in ax.spines.values(): 
+                        spine.set_edgecolor('#444444') # Bordes sutiles
+                        spine.set_visible(True)
+                    ax.spines['top'].set_visible(False)
+                    ax.spines['right'].set_visible(False)
+                else:
+                    ax.text(0.5, 0.5, "Sin datos > 0", color='white', ha='center')
+
+            # --- Lógica B: Variables Binarias / Conteo (Contactos) ---
+            else:
+                # Creamos la lógica binaria: ¿Tiene gestión (>0) o no (0)?
+                con_gestion = (df[col] == 1).sum()
+                sin_gestion = (df[col] == 0).sum()
+
+                datos = [con_gestion, sin_gestion]
+                etiquetas = ['Con Gestión', 'Sin Gestión']
+                colores = ['#00D448', '#2e2e2e'] # Verde brillante vs Gris oscuro
+
+                # Gráfica de Dona
+                wedges, texts, autotexts = ax.pie(
+                    datos, 
+                    labels=etiquetas, 
+                    colors=colores, 
+                    autopct='%1.1f%%', 
+                    startangle=90, 
+                    pctdistance=0.85, 
+                    wedgeprops=dict(width=0.3, edgecolor='none') # width=0.3 hace el agujero
+                )
+
+                # Estilizar textos de la dona
+                for text in texts:
+                    text.set_color('white')
+                    text.set_fontsize(9)
+                for autotext in autotexts:
+                    autotext.set_color('white')
+                    autotext.set_fontweight('bold')
+                    autotext.set_fontsize(10)
+
+        plt.tight_layout()
+        mostrar_figura(fig, 'introduccion')
+
+    # 3. LA SOLUCIÓN REFINADA (Matriz de Valor)
+    st.success("""
+    No basta con mirar solo el Saldo (cuánto debe) ni solo el Modelo (qué tan probable es). La estrategia ganadora cruza ambas variables:
+
+    1.  **Prioridad 1: Los "Golden Geese" (Alto Saldo + Alta Probabilidad):**
+        * Son el **Foco Absoluto** de los asesores humanos. Clientes con deuda significativa (>$2M) que el modelo marca como recuperables. Aquí está el 80% del dinero real.
+
+    2.  **Prioridad 2: Gestión Digital (Bajo Saldo + Alta Probabilidad):**
+        * Clientes que seguramente pagarán, pero deben poco. No gastar tiempo humano costoso; enviar un **Link de Pago por WhatsApp/SMS**. Se recuperan solos.
+
+    3.  **Prioridad 3: Investigación (Alto Saldo + Baja Probabilidad):**
+        * Deudores grandes que el modelo ve difíciles. No quemar llamadas; pasarlos a un equipo de **Investigación de Bienes o Cobro Jurídico**.
+
+    *Conclusión:* El modelo no reemplaza la lógica de negocio, la **potencia** para evitar llamar a deudores grandes pero imposibles.
+    """)
@@ -0,0 +1,352 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import streamlit as st
+from sklearn.metrics import ConfusionMatrixDisplay, classification_report, precision_recall_curve
+
+from paginas.componentes import mostrar_explorador_umbral, mostrar_figura, mostrar_grilla
+from paginas.recursos import (cargar_modelos, cartera_limpia, cartera_puntuada, exportar_lista, exportar_matriz,
+                              exportar_plan, grilla_cartera, indice_deudores, matriz_segmentacion_cache,
+                              plan_canales_cache)
+from riesgo.asignacion import CANALES
+from riesgo.busqueda import ficha_deudor
+from riesgo.explicacion import N_RAZONES, describir_ruta, es_arbol
+from riesgo.exportacion import FORMATOS, SEGMENTOS
+from riesgo.segmentacion import N_TRAMOS_SALDO, resumen_estrategias
+
+
+def mostrar():
+    df = cartera_limpia()
+
+    st.title("🤖 Modelado & Predicción")
+    st.markdown("Predicción de probabilidad de pago y detección de anomalías utilizando los modelos entrenados.")
+
+    # 1. Cargar artefactos
+    try:
+        artifacts = cargar_modelos()
+    except FileNotFoundError:
+        st.error("⚠️ Archivo 'modelos_riesgo_v1.pkl' no encontrado. Asegúrate de haber ejecutado el notebook de entrenamiento.")
+        st.stop()
+
+    best_threshold = artifacts["umbral_autoencoder"]
+
+    # El paquete sin pickle trae el esquema de entrenamiento: se valida contra la cartera actual
+    if hasattr(artifacts, 'validar'):
+        for problema in artifacts.validar(df):
+            st.warning(f"⚠️ Esquema del modelo: {problema}")
+
+    # 2. Preparar, transformar y predecir (mismas reglas que en entrenamiento)
+    try:
+        df_pred = cartera_puntuada()
+    except Exception as e:
+        st.error(f"Error al puntuar la cartera: {e}")
+        st.stop()
+
+    probs = df_pred['probabilidad_pago_arbol'].to_numpy()
+    mse = df_pred['score_anomalia_autoencoder'].to_numpy()
+
+    # --- Dashboard de Resultados ---
+
+    # KPIs
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Clientes Evaluados", len(df_pred))
+    col2.metric("Prob. Pago Promedio", f"{probs.mean():.1%}")
+    col3.metric("Clientes 'Pagadores' (>50%)", (probs > 0.5).sum())
+    col4.metric("Anomalías Detectadas", df_pred['alerta_anomalia'].sum())
+
+    # --- SECCIÓN DETALLADA DE MODELOS ---
+    if 'pago' in df_pred.columns:
+        st.markdown("---")
+        st.header("🧠 Detalles y Evaluación de Modelos")
+
+        y_true = df_pred['pago']
+
+        st.subheader("1. Construcción del Modelo")
+        st.markdown("El modelo fue optimizado usando `GridSearchCV` para maximizar el **F1-Score** de la clase minoritaria (Pagadores).")
+        st.code("""
+param_grid = {
+    'max_depth': [3, 4, 5, 6],
+    'min_samples_leaf': [30, 50, 100],
+    'criterion': ['gini', 'entropy'],
+    'class_weight': ['balanced']  # Clave para el desbalance
+}
+grid_search = GridSearchCV(estimator=DecisionTreeClassifier(), param_grid=param_grid, scoring='f1', ...)
+                """, language='python')
+
+        st.subheader("2. Rendimiento (Matriz de Confusión)")
+        y_pred_tree = (probs > 0.5).astype(int)
+
+        col1, col2 = st.columns(2)
+        with col1:
+                fig_cm, ax = plt.subplots()
+                fig_cm.patch.set_alpha(0.0)
+                ax.patch.set_alpha(0.0)
+                ConfusionMatrixDisplay.from_predictions(y_true, y_pred_tree, ax=ax, cmap='Greens', colorbar=False)
+
+                # Estilizado
+                ax.set_title("Matriz de Confusión (Árbol)", color='white')
+                ax.tick_params(colors='white')
+                ax.xaxis.label.set_color('white')
+                ax.yaxis.label.set_color('white')
+
+                mostrar_figura(fig_cm, 'modelado')
+
+        with col2:
+                st.markdown("**Métricas Detalladas**")
+                report = classification_report(y_true, y_pred_tree, output_dict=True)
+                st.dataframe(pd.DataFrame(report).transpose().style.format("{:.2f}"))
+
+
+        st.subheader("1. Lógica del Autoencoder")
+        st.markdown("Red neuronal entrenada **solo con No Pagadores** para aprender el patrón de 'normalidad'. Los Pagadores se detectan como anomalías (alto error de reconstrucción).")
+        st.code("""
+autoencoder = MLPRegressor(
+    hidden_layer_sizes=(64, 32, 4, 32, 64), 
+    activation='relu', solver='adam', 
+    alpha=1e-7, max_iter=200
+)
+# Entrenamiento: autoencoder.fit(X_no_paga, X_no_paga)
+                """, language='python')
+
+        st.subheader("2. Curva de Umbral (Precision-Recall)")
+
+            # Cálculos para la curva
+        precision, recall, thresholds = precision_recall_curve(y_true, mse)
+        numerator = 2 * recall * precision
+        denominator = recall + precision
+        f1_scores = np.divide(numerator, denominator, out=np.zeros_like(denominator), where=denominator!=0)
+
+        fig_thresh, ax_thresh = plt.subplots(figsize=(10, 4))
+        fig_thresh.patch.set_alpha(0.0)
+        ax_thresh.patch.set_alpha(0.0)
+
+        ax_thresh.plot(thresholds, precision[:-1], 'b--', label='Precision', alpha=0.7)
+        ax_thresh.plot(thresholds, recall[:-1], 'g-', label='Recall', alpha=0.7)
+        ax_thresh.plot(thresholds, f1_scores[:-1], 'r-', label='F1 Score', linewidth=2)
+        ax_thresh.axvline(best_threshold, color='#00D448', linestyle=':', label=f'Umbral Óptimo ({best_threshold:.4f})')
+
+        ax_thresh.set_title('Optimización del Punto de Corte', color='white')
+        ax_thresh.set_xlabel('Error de Reconstrucción (MSE)', color='white')
+        ax_thresh.tick_params(colors='white')
+        ax_thresh.legend(facecolor='black', labelcolor='white')
+
+        mostrar_figura(fig_thresh, 'modelado')
+
+        st.subheader("3. Rendimiento con Umbral Óptimo")
+        y_pred_ae = (mse > best_threshold).astype(int)
+
+        # Reporte simple
+        col1, col2 = st.columns(2)
+        with col1:
+                fig_cm, ax = plt.subplots()
+                fig_cm.patch.set_alpha(0.0)
+                ax.patch.set_alpha(0.0)
+                ConfusionMatrixDisplay.from_predictions(y_true, y_pred_ae, ax=ax, cmap='Greens', colorbar=False)
+
+                # Estilizado
+                ax.set_title("Matriz de Confusión (Árbol)", color='white')
+                ax.tick_params(colors='white')
+                ax.xaxis.label.set_color('white')
+                ax.yaxis.label.set_color('white')
+
+                mostrar_figura(fig_cm, 'modelado')
+
+        with col2:
+            report_ae = classification_report(y_true, y_pred_ae, output_dict=True)
+            st.dataframe(pd.DataFrame(report_ae).transpose().style.format("{:.2f}"))
+
+            st.caption(f"Umbral aplicado: {best_threshold:.6f}")
+
+            st.markdown("---")
+
+        st.subheader("🎚️ Explorador de Umbrales (What-If)")
+        st.markdown("Mueve el punto de corte y observa al instante la matriz de confusión, las métricas y el capital de los clientes marcados como pagadores.")
+
+        tab_arbol, tab_ae = st.tabs(["Árbol de Decisión", "Autoencoder"])
+        with tab_arbol:
+            mostrar_explorador_umbral('arbol', 0.5, 1.0, "%.3f")
+        with tab_ae:
+            mostrar_explorador_umbral('autoencoder', best_threshold, np.quantile(mse, 0.999), "%.5f")
+
+    st.subheader("🔥 Top Clientes con Mayor Probabilidad de Pago")
+    st.markdown("Estos son los clientes a los que deberías llamar **YA**.")
+
+    top_clients = df_pred.sort_values('probabilidad_pago_arbol', ascending=False).head(20)
+
+    # Formateo
+    format_dict = {
+        'probabilidad_pago_arbol': '{:.1%}',
+        'score_anomalia_autoencoder': '{:.4f}',
+        'saldo_capital': '${:,.0f}',
+        'dias_mora': '{:.0f}'
+    }
+
+    cols_visual = ['identificacion', 'saldo_capital', 'dias_mora', 'probabilidad_pago_arbol', 'score_anomalia_autoencoder']
+    # Filtrar si alguna no existe
+    cols_visual = [c for c in cols_visual if c in df_pred.columns]
+
+    st.dataframe(top_clients[cols_visual].style.format(format_dict).background_gradient(subset=['probabilidad_pago_arbol'], cmap='Greens'))
+
+    st.subheader("🎯 Matriz de Segmentación")
+    st.markdown("""
+        Cada deudor se ubica por **tramo de saldo** (cuantiles), **tramo de probabilidad** y **alerta de anomalía**.
+        La recuperación esperada es **Σ probabilidad × saldo** con su intervalo de confianza del 95%; la tasa observada usa el intervalo de Wilson.
+        """)
+    n_tramos = st.slider("Tramos de saldo (cuantiles)", 2, 10, N_TRAMOS_SALDO)
+    matriz = matriz_segmentacion_cache(n_tramos)
+
+    resumen = resumen_estrategias(matriz)
+    cols_kpi = st.columns(len(resumen))
+    for col, (estrategia, fila) in zip(cols_kpi, resumen.iterrows()):
+        col.metric(estrategia, f"${fila['recuperacion_esperada'] / 1e9:,.2f} MM",
+                   f"{fila['deudores']:,.0f} deudores", delta_color="off")
+    st.caption("El árbol se entrenó con clases balanceadas: su probabilidad ordena bien a los deudores, "
+               "pero está por encima de la tasa de pago observada. Compare ambas columnas antes de presupuestar.")
+
+    money = '${:,.0f}'
+    st.dataframe(
+        matriz.style.format({
+            'saldo_total': money, 'recuperacion_esperada': money, 'recuperacion_desviacion': money,
+            'recuperacion_ic_inf': money, 'recuperacion_ic_sup': money, 'capital_recuperado_observado': money,
+            'probabilidad_media': '{:.1%}', 'tasa_pago_observada': '{:.2%}', 'tasa_pago_ic_inf': '{:.2%}', 'tasa_pago_ic_sup': '{:.2%}',
+        }),
+        use_container_width=True, hide_index=True
+    )
+    with open(exportar_matriz(n_tramos), 'rb') as archivo:
+        st.download_button(
+            "Descargar matriz de segmentación (CSV)",
+            data=archivo,
+            file_name="matriz_segmentacion.csv",
+            mime="text/csv"
+        )
+
+    st.subheader("📞 Plan de Gestión por Canal")
+    st.markdown("""
+        Asignación de cada deudor a un único canal respetando la capacidad mensual de cada uno, maximizando el capital esperado
+        (**probabilidad × saldo × efectividad del canal**) menos el costo de gestión. La capacidad es la fracción de la base que el canal puede cubrir (vacío = sin límite).
+        """)
+
+    canales_editados = st.data_editor(
+        pd.DataFrame(CANALES).T.astype(float).rename_axis('canal'),
+        column_config={
+            'capacidad': st.column_config.NumberColumn('Capacidad (% base)', min_value=0.0, max_value=1.0, format="%.2f"),
+            'costo': st.column_config.NumberColumn('Costo por gestión ($)', min_value=0, format="$%d"),
+            'efectividad': st.column_config.NumberColumn('Efectividad', min_value=0.0, max_value=1.0, format="%.2f"),
+        },
+        disabled=['canal'],
+        use_container_width=True
+    )
+    canales = {
+        nombre: {
+            'capacidad': None if pd.isna(fila['capacidad']) else float(fila['capacidad']),
+            'costo': float(fila['costo']),
+            'efectividad': float(fila['efectividad']),
+        }
+        for nombre, fila in canales_editados.iterrows()
+    }
+
+    _, resumen = plan_canales_cache(canales)
+    st.dataframe(
+        resumen.style.format({
+            'deudores': '{:,.0f}', 'capacidad': '{:,.0f}', 'saldo_total': '${:,.0f}',
+            'recuperacion_esperada': '${:,.0f}', 'costo_total': '${:,.0f}', 'ganancia_neta': '${:,.0f}'
+        }, na_rep='-'),
+        use_container_width=True
+    )
+    with open(exportar_plan(canales), 'rb') as archivo:
+        st.download_button(
+            "Descargar plan por deudor (CSV)",
+            data=archivo,
+            file_name="plan_canales.csv",
+            mime="text/csv"
+        )
+
+    st.subheader("🔍 Buscar Deudor")
+    col1, col2 = st.columns([0.7, 0.3])
+    identificacion = col1.text_input("Identificación del cliente", placeholder="Ej: 513810")
+    tipo_documento = col2.selectbox("Tipo de documento", ["Todos", "C", "E", "T", "P"])
+
+    if identificacion:
+        ficha = ficha_deudor(
+            identificacion,
+            indice_deudores('original'),
+            indice_deudores('limpia'),
+            indice_deudores('puntuada'),
+            tipo_documento=None if tipo_documento == "Todos" else tipo_documento
+        )
+
+        if ficha['historial'].empty:
+            st.warning(f"No se encontró el cliente {identificacion}.")
+        else:
+            st.markdown(f"**Deudas vigentes ({len(ficha['deudas'])}) y sus puntajes:**")
+            st.dataframe(ficha['puntajes'].style.format(format_dict), use_container_width=True)
+
+            if not ficha['puntajes'].empty:
+                mostrar_razones(ficha['puntajes'], artifacts)
+
+            st.markdown("**Historial de registros (antes de eliminar duplicados):**")
+            st.dataframe(ficha['historial'], use_container_width=True)
+
+    st.subheader("📥 Exportar Lista de Llamadas")
+    st.markdown("Descarga la lista completa ordenada por probabilidad de pago, filtrada por segmento de la matriz de valor.")
+
+    col1, col2 = st.columns(2)
+    segmento = col1.selectbox("Segmento", list(SEGMENTOS))
+    formato = col2.selectbox("Formato", list(FORMATOS))
+    extension, mime = FORMATOS[formato]
+
+    col1, col2 = st.columns(2)
+    grilla = grilla_cartera('puntuada')
+    bancos = col1.multiselect("Bancos (vacío = todos)", grilla.valores('banco'))
+    meses = col2.multiselect("Meses (vacío = todos)", sorted(df_pred['mes'].unique()))
+
+    # El archivo se genera al pedirlo; la sesión guarda solo la ruta del último, y solo mientras coincidan los filtros
+    seleccion = (segmento, formato, tuple(bancos), tuple(meses))
+    if st.button("Generar archivo"):
+        try:
+            with st.spinner("Generando archivo..."):
+                st.session_state['lista_llamadas'] = (seleccion, exportar_lista(*seleccion))
+        except ValueError as e:
+            st.session_state.pop('lista_llamadas', None)
+            st.error(str(e))
+
+    preparado = st.session_state.get('lista_llamadas')
+    if preparado is not None and preparado[0] == seleccion:
+        with open(preparado[1], 'rb') as archivo:
+            st.download_button(
+                f"Descargar {segmento} ({formato})",
+                data=archivo,
+                file_name=f"lista_llamadas.{extension}",
+                mime=mime
+            )
+    else:
+        st.session_state.pop('lista_llamadas', None)
+
+    st.subheader("🔎 Explorar la Cartera Puntuada")
+    mostrar_grilla(grilla_cartera('puntuada'), clave='grilla_puntuada')
+
+
+def mostrar_razones(puntajes, artifacts):
+    """Códigos de razón y ruta del árbol para las deudas de un deudor."""
+    st.markdown("**¿Por qué este puntaje?**")
+    # Con un clasificador que no es un árbol único no hay razones de pago ni ruta (ver riesgo.explicacion)
+    arbol = es_arbol(artifacts["arbol"])
+    for _, deuda in puntajes.iterrows():
+        pago = ", ".join(f"{deuda[f'razon_pago_{i}']} ({deuda[f'aporte_pago_{i}'] * 100:+.1f} pp)" for i in range(1, N_RAZONES + 1))
+        anomalia = ", ".join(f"{deuda[f'razon_anomalia_{i}']} ({deuda[f'aporte_anomalia_{i}'] / deuda['score_anomalia_autoencoder']:.0%})"
+                             for i in range(1, N_RAZONES + 1))
+        st.markdown(f"* Obligación en **{deuda['banco']}** — Probabilidad **{deuda['probabilidad_pago_arbol']:.1%}**"
+                    + (f": {pago}. " if arbol else ". ") + f"Error de reconstrucción: {anomalia}.")
+
+    if not arbol:
+        return
+
+    with st.expander("Ver ruta de decisión del árbol"):
+        X = artifacts["preprocessor"].transform(puntajes[artifacts["columnas_modelo"]])
+        for x, (_, deuda) in zip(X, puntajes.iterrows()):
+            base, pasos = describir_ruta(artifacts["arbol"], artifacts["preprocessor"], x)
+            st.markdown(f"**{deuda['banco']}** — tasa de pago base {base:.1%}")
+            st.dataframe(
+                pd.DataFrame(pasos).style.format({'probabilidad': '{:.1%}', 'aporte': '{:+.1%}'}),
+                use_container_width=True, hide_index=True
+            )
@@ -0,0 +1,228 @@
+import atexit
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+
+import pandas as pd
+import streamlit as st
+
+from riesgo.almacen import RUTA_ALMACEN, asegurar_tabla, combinar_versiones, huella_datos, leer_tabla, resumen_por
+from riesgo.asignacion import plan_canales
+from riesgo.busqueda import IndiceDeudores
+from riesgo.calidad import evaluar_calidad
+from riesgo.caracteristicas import calcular, con_caracteristicas
+from riesgo.cohortes import AnalisisCohortes
+from riesgo.compartido import congelar
+from riesgo.correlacion import correlacion_con_objetivo, matriz_spearman
+from riesgo.deriva import SCORES_DERIVA, VARIABLES_DERIVA, MonitorDeriva, definir_bordes
+from riesgo.exportacion import FORMATOS, exportar_por_bloques, lista_llamadas
+from riesgo.geografia import TABLA_AGREGADOS, AgregadosDepartamento, agregar
+from riesgo.grilla import GrillaPaginada
+from riesgo.limpieza import asegurar_pago, leer_cartera_cruda, limpiar_cartera
+from riesgo.metricas import CARGA_MODELOS_SEGUNDOS, PUERTO_METRICAS, iniciar_servidor, medir_cache
+from riesgo.modelos import cargar_artefactos, puntuar_cartera, version_modelos
+from riesgo.segmentacion import matriz_segmentacion
+from riesgo.umbrales import ExploradorUmbral
+
+# --- 1. FUNCIÓN DE CARGA Y LIMPIEZA (Requirement 1 & Preprocesamiento) ---
+# Las carteras son un solo objeto compartido por todas las sesiones (cache_resource), congelado para que
+# ninguna página lo modifique en sitio (ver riesgo.compartido). Cuentan hits y misses (ver riesgo.metricas)
+@medir_cache(st.cache_resource)
+def cartera_cruda():
+    # Intentamos leer el archivo
+    try:
+        return congelar(leer_cartera_cruda())
+    except FileNotFoundError:
+        return None
+
+@medir_cache(st.cache_resource)
+def cargar_datos():
+    # Lectura + 'pago' asegurado como 0/1 (ver riesgo.limpieza); comparte las demás columnas con la cruda
+    cruda = cartera_cruda()
+    return None if cruda is None else congelar(asegurar_pago(cruda))
+
+@medir_cache(st.cache_resource)
+def cargar_modelos():
+    with CARGA_MODELOS_SEGUNDOS.cronometrar():
+        return cargar_artefactos()
+
+# Reglas de calidad sobre el archivo crudo (antes de convertir 'pago'): las filas en cuarentena no llegan a la limpieza
+@medir_cache(st.cache_resource)
+def calidad_cartera():
+    calidad = evaluar_calidad(cartera_cruda())
+    calidad['validas'] = asegurar_pago(calidad['validas'])
+    for clave in ['reporte', 'validas', 'cuarentena']:
+        calidad[clave] = congelar(calidad[clave])
+    return calidad
+
+@medir_cache(st.cache_resource)
+def cartera_limpia():
+    return congelar(limpiar_cartera(calidad_cartera()['validas']))
+
+@medir_cache(st.cache_resource)
+def cartera_puntuada():
+    return congelar(puntuar_cartera(cartera_limpia(), cargar_modelos()))
+
+# Narrativa de limpieza de la introducción: la deduplicación con la llave que muestra la página se hace
+# una vez y se comparte, en lugar de ordenar y deduplicar la cartera en sitio en cada rerun
+@st.cache_resource
+def cartera_introduccion(columnas_duplicados):
+    df = cargar_datos().sort_values(by='antiguedad_deuda', na_position='last')
+    return congelar(df.drop_duplicates(subset=list(columnas_duplicados), keep='first'))
+
+@st.cache_resource
+def categorias_introduccion(columnas_duplicados):
+    tabla = calcular(cartera_introduccion(columnas_duplicados), ['genero_normalizado', 'rango_edad'])
+    return congelar(pd.DataFrame({'genero': tabla['genero_normalizado'], 'rango_edad_probable': tabla['rango_edad'].astype(object)}))
+
+# Características derivadas (recencia, pagadores caídos, ...) materializadas por versión de la cartera
+@st.cache_resource
+def cartera_caracteristicas():
+    return congelar(con_caracteristicas(cartera_limpia()))
+
+# Versión de la cartera limpia: llave de las cachés derivadas y de la tabla `limpia` del almacén
+@st.cache_resource
+def version_limpia():
+    return huella_datos(cartera_limpia())
+
+# Correlaciones de rango: una vez por versión de la cartera (muestreadas si supera `max_filas`). La
+# versión es el argumento para que la llave de la caché cambie con los datos aunque no se use en el cuerpo
+@st.cache_data
+def correlaciones(version):
+    df_num = cartera_limpia().drop(columns=["identificacion"]).select_dtypes(include="number")
+    matriz, n_filas = matriz_spearman(df_num.drop(columns=['pago'], errors='ignore'))
+    return matriz, n_filas, correlacion_con_objetivo(df_num)
+
+# Conteos por banco, recencia y cosecha: cambiar de banco no vuelve a agrupar la cartera
+@st.cache_resource
+def analisis_cohortes():
+    return AnalisisCohortes(cartera_limpia())
+
+# Almacén Parquet por mes y banco: las vistas por banco o mes leen solo las particiones que necesitan.
+# Cada tabla se reescribe solo si cambió su versión de datos. La limpia no depende de los modelos; la
+# puntuada y los agregados por departamento se piden solo desde las páginas que los usan y, si están al
+# día (misma cartera y mismos modelos), no cargan los modelos ni puntúan
+@st.cache_resource
+def almacen_limpia():
+    asegurar_tabla('limpia', version_limpia(), cartera_limpia(), RUTA_ALMACEN)
+    return RUTA_ALMACEN
+
+@st.cache_resource
+def version_puntuada():
+    # Versión de la cartera puntuada (cartera limpia + modelos), sin puntuarla
+    return combinar_versiones(version_limpia(), version_modelos())
+
+@st.cache_resource
+def almacen_puntuada():
+    version = version_puntuada()
+    asegurar_tabla('puntuada', version, cartera_puntuada, RUTA_ALMACEN)
+    asegurar_tabla(TABLA_AGREGADOS, version, lambda: agregar(cartera_puntuada()), RUTA_ALMACEN)
+    return RUTA_ALMACEN
+
+@st.cache_data
+def resumen_banco(tabla='limpia'):
+    directorio = almacen_limpia() if tabla == 'limpia' else almacen_puntuada()
+    return resumen_por(tabla, 'banco', directorio=directorio)
+
+# Agregados por departamento leídos del almacén: los filtros cruzados de la página suman celdas del cubo
+@st.cache_resource
+def agregados_departamento():
+    return AgregadosDepartamento.desde_almacen(almacen_puntuada())
+
+def _filtros_particion(bancos, meses):
+    filtros = []
+    if bancos:
+        filtros.append(('banco', 'in', list(bancos)))
+    if meses:
+        filtros.append(('mes', 'in', list(meses)))
+    return filtros
+
+# Exportaciones: los bloques del generador se escriben a un archivo temporal, uno por contenido (clave y
+# versión de la cartera) que comparten todas las sesiones; la sesión guarda solo la ruta, nunca los bytes
+@st.cache_resource
+def directorio_exportaciones():
+    directorio = tempfile.mkdtemp(prefix='exportaciones_cartera_')
+    atexit.register(shutil.rmtree, directorio, ignore_errors=True)
+    return directorio
+
+def _archivo_exportacion(nombre, clave, formato, datos):
+    llave = hashlib.sha256(repr((clave, version_puntuada())).encode('utf-8')).hexdigest()[:16]
+    ruta = os.path.join(directorio_exportaciones(), f"{nombre}_{llave}.{FORMATOS[formato][0]}")
+    if not os.path.exists(ruta):
+        # Se escribe aparte y se renombra: otra sesión nunca lee un archivo a medias
+        parcial = f"{ruta}.{threading.get_ident()}.parcial"
+        try:
+            with open(parcial, 'wb') as f:
+                for trozo in exportar_por_bloques(datos(), formato):
+                    f.write(trozo)
+            os.replace(parcial, ruta)
+        finally:
+            if os.path.exists(parcial):
+                os.remove(parcial)
+    return ruta
+
+def exportar_lista(segmento, formato, bancos=(), meses=()):
+    # Ruta del archivo de la lista; se arma solo cuando se pide la descarga. Con filtro de banco o mes se
+    # leen del almacén solo esas particiones
+    def datos():
+        filtros = _filtros_particion(bancos, meses)
+        df_pred = leer_tabla('puntuada', filtros=filtros, directorio=almacen_puntuada()) if filtros else cartera_puntuada()
+        return lista_llamadas(df_pred, segmento)
+    return _archivo_exportacion('lista_llamadas', (segmento, tuple(bancos), tuple(meses)), formato, datos)
+
+# Grillas compartidas entre sesiones: los índices de orden y filtro se calculan una vez
+COLS_ORDEN_GRILLA = ['identificacion', 'saldo_capital', 'dias_mora', 'meses_desde_ultimo_pago', 'duracion_llamadas_ultimos_6meses',
+                     'probabilidad_pago_arbol', 'score_anomalia_autoencoder']
+COLS_FILTRO_GRILLA = ['banco', 'departamento', 'tipo_documento', 'genero', 'rango_edad_probable', 'pago', 'alerta_anomalia']
+
+@st.cache_resource
+def grilla_cartera(nombre):
+    cartera = cartera_puntuada() if nombre == 'puntuada' else cartera_limpia()
+    return GrillaPaginada(cartera, COLS_ORDEN_GRILLA, COLS_FILTRO_GRILLA)
+
+# Índices de búsqueda por deudor, uno por tabla para no puntuar la cartera si solo se consulta la original
+TABLAS_DEUDORES = {'original': cargar_datos, 'limpia': cartera_limpia, 'puntuada': cartera_puntuada}
+
+@st.cache_resource
+def indice_deudores(nombre):
+    return IndiceDeudores(TABLAS_DEUDORES[nombre]())
+
+@st.cache_data
+def plan_canales_cache(canales):
+    return plan_canales(cartera_puntuada(), canales)
+
+def exportar_plan(canales):
+    return _archivo_exportacion('plan_canales', sorted(canales.items()), 'CSV', lambda: plan_canales_cache(canales)[0])
+
+# Exploradores de umbral: ordenan los scores una sola vez por versión de la cartera
+SCORES_UMBRAL = {'arbol': 'probabilidad_pago_arbol', 'autoencoder': 'score_anomalia_autoencoder'}
+
+@st.cache_resource
+def explorador_umbral(modelo):
+    df_pred = cartera_puntuada()
+    return ExploradorUmbral(df_pred[SCORES_UMBRAL[modelo]], df_pred['pago'], df_pred['saldo_capital'])
+
+# Monitor de deriva: bordes fijados con toda la cartera y un boceto por mes
+@st.cache_resource
+def monitor_deriva():
+    df_pred = cartera_puntuada()
+    columnas = VARIABLES_DERIVA + SCORES_DERIVA
+    return MonitorDeriva(definir_bordes(df_pred, columnas)).actualizar(df_pred)
+
+# Matriz de segmentación: se recalcula solo cuando cambia la cartera puntuada o los tramos
+@st.cache_data
+def matriz_segmentacion_cache(n_tramos_saldo):
+    return matriz_segmentacion(cartera_puntuada(), n_tramos_saldo)
+
+def exportar_matriz(n_tramos_saldo):
+    return _archivo_exportacion('matriz_segmentacion', n_tramos_saldo, 'CSV', lambda: matriz_segmentacion_cache(n_tramos_saldo))
+
+# Endpoint /metrics: uno por proceso (si el puerto está ocupado, p. ej. por otra instancia, no se expone)
+@st.cache_resource
+def servidor_metricas(puerto=PUERTO_METRICAS):
+    try:
+        return iniciar_servidor(puerto)
+    except OSError:
+        return None
@@ -0,0 +1,111 @@
+import streamlit as st
+
+from paginas.recursos import cartera_caracteristicas
+from riesgo.caracteristicas import DEFINICIONES
+from riesgo.metricas import SQL_ERRORES, SQL_SEGUNDOS
+
+
+def mostrar():
+    df = cartera_caracteristicas()
+
+
+    st.subheader("💻 Consultas SQL en Vivo")
+    st.markdown("Este módulo permite ejecutar sentencias **SQL estándar** directamente sobre el DataFrame de Pandas.")
+    st.caption("La tabla `df` incluye las características derivadas: "
+               + ", ".join(f"`{nombre}`" for nombre in DEFINICIONES) + ".")
+
+    # Importación necesaria (Asegúrate de tener instalada: pip install pandasql)
+    from pandasql import sqldf
+
+    env = {'df': df} 
+
+    def pysqldf(q, consulta):
+        # Latencia y errores por consulta (ver riesgo.metricas)
+        with SQL_SEGUNDOS.cronometrar(consulta=consulta):
+            try:
+                return sqldf(q, env)
+            except Exception:
+                SQL_ERRORES.inc(consulta=consulta)
+                raise
+    col1, col2 = st.columns(2)
+
+    # --- CONSULTA 1: TOP 10 ---
+    with col1:
+        st.markdown("#### 🏆 Top 10 Mayores Deudores")
+        st.info("Identificando a los clientes con mayor exposición de Saldo Capital.")
+
+        query_top10 = """
+            SELECT tipo_documento, identificacion, saldo_capital
+            FROM df
+            ORDER BY saldo_capital DESC
+            LIMIT 10;
+            """
+
+        # Mostramos el código SQL para que se vea técnico
+        st.code(query_top10, language='sql')
+
+        try:
+            resultado_top10 = pysqldf(query_top10, 'top10')
+            # Mostramos tabla formateada
+            st.dataframe(
+                resultado_top10.style.format({'saldo_capital': '${:,.0f}'}), 
+                use_container_width=True,
+                hide_index=True
+            )
+        except Exception as e:
+            st.error(f"Error en SQL: {e}")
+
+    # --- CONSULTA 2: PROMEDIO POR DEPARTAMENTO ---
+    with col2:
+        st.markdown("#### 🗺️ Efectividad por Departamento")
+        st.info("Calculando la Tasa de Pago (Promedio) agrupada geográficamente.")
+
+        query_promedio = """
+            SELECT departamento, AVG(pago) as tasa_pago
+            FROM df
+            GROUP BY departamento
+            ORDER BY tasa_pago DESC;
+            """
+
+        st.code(query_promedio, language='sql')
+        st.caption("La vista por departamento con filtros de banco y edad está en *6. Recuperación por Departamento*.")
+
+        try:
+            resultado_promedio = pysqldf(query_promedio, 'departamento')
+
+            # Multiplicamos por 100 para que se vea como porcentaje
+            resultado_promedio['tasa_pago'] = resultado_promedio['tasa_pago'] 
+
+            # Usamos un gradiente de color (Heatmap) para resaltar los mejores
+            st.dataframe(
+                resultado_promedio.style
+                .format({'tasa_pago': '{:.2%}'}) # Formato porcentaje
+                .background_gradient(cmap='Greens', subset=['tasa_pago']), # Mapa de calor verde
+                use_container_width=True,
+                hide_index=True
+            )
+        except Exception as e:
+            st.error(f"Error en SQL: {e}")
+
+    # --- CONSULTA 3: PAGADORES CAÍDOS ---
+    st.markdown("#### 📉 Pagadores Caídos por Banco")
+    st.info("Clientes que ya pagaron alguna vez pero no el mes anterior (característica `pagador_caido`).")
+
+    query_caidos = """
+        SELECT banco, SUM(pagador_caido) as pagadores_caidos, AVG(pago) as tasa_pago
+        FROM df
+        WHERE pagador_caido = 1
+        GROUP BY banco
+        ORDER BY pagadores_caidos DESC;
+        """
+
+    st.code(query_caidos, language='sql')
+
+    try:
+        st.dataframe(
+            pysqldf(query_caidos, 'pagadores_caidos').style.format({'tasa_pago': '{:.2%}'}),
+            use_container_width=True,
+            hide_index=True
+        )
+    except Exception as e:
+        st.error(f"Error en SQL: {e}")
@@ -0,0 +1 @@
+# Lógica de negocio del dashboard de riesgo (sin dependencias de Streamlit)
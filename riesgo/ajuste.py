@@ -0,0 +1,220 @@
+"""Búsqueda de hiperparámetros por successive halving para los modelos de riesgo.
+
+    python -m riesgo.ajuste --salida modelos_riesgo_v1.pkl --leaderboard leaderboard.csv
+
+- Árbol de decisión y gradient boosting (HistGradientBoosting): HalvingRandomSearchCV
+  con submuestras de la cartera como recurso; solo los mejores candidatos de cada
+  ronda pasan a la siguiente con el triple de filas.
+- Autoencoder: successive halving con épocas como recurso y F1 de los pagadores
+  (`pago=1`) en validación como criterio, con parada temprana por candidato.
+
+El ganador se guarda en el mismo formato de artefactos que carga el dashboard.
+"""
+import argparse
+import os
+import shutil
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy.stats import loguniform, randint
+from sklearn.ensemble import HistGradientBoostingClassifier
+# HalvingRandomSearchCV sigue siendo experimental: este módulo lo habilita en sklearn.model_selection y lo expone
+from sklearn.experimental.enable_halving_search_cv import HalvingRandomSearchCV
+from sklearn.metrics import f1_score
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from sklearn.neural_network import MLPRegressor
+from sklearn.tree import DecisionTreeClassifier
+
+from riesgo.entrenamiento import SEMILLA, error_reconstruccion, preparar_matrices, umbral_optimo
+from riesgo.limpieza import RUTA_DATOS, leer_cartera, limpiar_cartera
+from riesgo.modelos import RUTA_MODELOS
+from riesgo.paquete import MANIFIESTO, exportar_paquete
+
+ESPACIOS_CLASIFICADOR = {
+    'arbol': (
+        DecisionTreeClassifier(random_state=SEMILLA),
+        {
+            'max_depth': randint(2, 13),
+            'min_samples_leaf': [10, 20, 30, 50, 100, 200],
+            'criterion': ['gini', 'entropy'],
+            'class_weight': ['balanced'],
+        },
+    ),
+    'gradient_boosting': (
+        # Parada temprana interna por pérdida: en las submuestras pequeñas la fracción de
+        # validación puede no tener pagadores y el F1 no estaría definido
+        HistGradientBoostingClassifier(max_iter=500, early_stopping=True, scoring='loss',
+                                       n_iter_no_change=10, random_state=SEMILLA),
+        {
+            'learning_rate': loguniform(0.01, 0.3),
+            'max_leaf_nodes': [7, 15, 31, 63],
+            'min_samples_leaf': [20, 50, 100, 200],
+            'l2_regularization': loguniform(1e-6, 1.0),
+            'class_weight': ['balanced'],
+        },
+    ),
+}
+
+ESPACIO_AUTOENCODER = {
+    'hidden_layer_sizes': [(64, 32, 4, 32, 64), (32, 8, 32), (64, 16, 64), (128, 64, 8, 64, 128)],
+    'alpha': loguniform(1e-8, 1e-3),
+    'learning_rate_init': loguniform(1e-4, 1e-2),
+}
+
+
+def buscar_clasificador(nombre, X_train, y_train, n_candidatos=40, factor=3, n_jobs=-1):
+    """Successive halving sobre submuestras; devuelve (búsqueda, filas del leaderboard)."""
+    estimador, espacio = ESPACIOS_CLASIFICADOR[nombre]
+    busqueda = HalvingRandomSearchCV(
+        estimador, espacio, n_candidates=n_candidatos, factor=factor,
+        resource='n_samples', min_resources='exhaust', scoring='f1',
+        cv=StratifiedKFold(n_splits=5, shuffle=True, random_state=SEMILLA),
+        random_state=SEMILLA, n_jobs=n_jobs
+    )
+    busqueda.fit(X_train, y_train)
+
+    resultados = pd.DataFrame(busqueda.cv_results_)
+    filas = pd.DataFrame({
+        'modelo': nombre,
+        'ronda': resultados['iter'],
+        'recurso': resultados['n_resources'],
+        'unidad_recurso': 'filas',
+        'f1': resultados['mean_test_score'],
+        'params': resultados['params'].astype(str),
+    })
+    return busqueda, filas
+
+
+def _muestrear(espacio, rng):
+    params = {}
+    for nombre, valores in espacio.items():
+        if hasattr(valores, 'rvs'):
+            params[nombre] = float(valores.rvs(random_state=rng))
+        else:
+            params[nombre] = valores[rng.integers(len(valores))]
+    return params
+
+
+def _f1_autoencoder(autoencoder, X_val, y_val):
+    mse = error_reconstruccion(autoencoder, X_val)
+    return f1_score(y_val, mse > umbral_optimo(y_val, mse), zero_division=0)
+
+
+def buscar_autoencoder(X_normales, X_val, y_val, n_candidatos=27, factor=3, epocas_min=5, epocas_max=200, paciencia=3):
+    """Successive halving con épocas como recurso y F1 en validación como criterio.
+
+    Cada ronda continúa el entrenamiento de los sobrevivientes (`partial_fit`) hasta
+    el nuevo presupuesto; un candidato deja de entrenar si su F1 no mejora en
+    `paciencia` evaluaciones seguidas.
+    """
+    rng = np.random.default_rng(SEMILLA)
+    candidatos = []
+    for _ in range(n_candidatos):
+        params = _muestrear(ESPACIO_AUTOENCODER, rng)
+        modelo = MLPRegressor(activation='relu', solver='adam', batch_size=32, random_state=SEMILLA, **params)
+        candidatos.append({'params': params, 'modelo': modelo, 'epocas': 0, 'f1': 0.0, 'sin_mejora': 0})
+
+    filas = []
+    ronda, presupuesto = 0, epocas_min
+    while True:
+        for c in candidatos:
+            while c['epocas'] < presupuesto and c['sin_mejora'] < paciencia:
+                X_epoca = X_normales[rng.permutation(len(X_normales))]
+                c['modelo'].partial_fit(X_epoca, X_epoca)
+                c['epocas'] += 1
+                # F1 en validación cada quinta parte del presupuesto de la ronda
+                if c['epocas'] % max(1, presupuesto // 5) == 0 or c['epocas'] == presupuesto:
+                    f1 = _f1_autoencoder(c['modelo'], X_val, y_val)
+                    c['sin_mejora'] = 0 if f1 > c['f1'] else c['sin_mejora'] + 1
+                    c['f1'] = max(c['f1'], f1)
+            filas.append({'modelo': 'autoencoder', 'ronda': ronda, 'recurso': c['epocas'],
+                          'unidad_recurso': 'épocas', 'f1': c['f1'], 'params': str(c['params'])})
+
+        if len(candidatos) == 1 or presupuesto >= epocas_max:
+            break
+        candidatos = sorted(candidatos, key=lambda c: c['f1'], reverse=True)[:max(1, len(candidatos) // factor)]
+        ronda, presupuesto = ronda + 1, min(presupuesto * factor, epocas_max)
+
+    ganador = max(candidatos, key=lambda c: c['f1'])
+    return ganador['modelo'], pd.DataFrame(filas)
+
+
+def ajustar(df, n_candidatos=40, n_jobs=-1, epocas_max=200, verbose=True):
+    """Devuelve (artefactos del ganador, leaderboard)."""
+    preprocessor, columnas, X_train, X_test, y_train, y_test = preparar_matrices(df)
+    leaderboard = []
+
+    # 1. Clasificador: el mejor de cada familia se compara en el conjunto de prueba
+    finalistas = {}
+    for nombre in ESPACIOS_CLASIFICADOR:
+        inicio = time.perf_counter()
+        busqueda, filas = buscar_clasificador(nombre, X_train, y_train, n_candidatos=n_candidatos, n_jobs=n_jobs)
+        f1_test = f1_score(y_test, busqueda.best_estimator_.predict(X_test), zero_division=0)
+        finalistas[nombre] = (f1_test, busqueda.best_estimator_)
+        leaderboard.append(filas)
+        if verbose:
+            print(f"{nombre}: {busqueda.best_params_} F1-test={f1_test:.4f} ({time.perf_counter() - inicio:.1f}s)")
+
+    nombre_ganador = max(finalistas, key=lambda n: finalistas[n][0])
+
+    # 2. Autoencoder: entrenado con No Pagadores, validado con una parte del entrenamiento
+    inicio = time.perf_counter()
+    X_fit, X_val, y_fit, y_val = train_test_split(X_train, y_train, test_size=0.2, stratify=y_train, random_state=SEMILLA)
+    autoencoder, filas = buscar_autoencoder(X_fit[y_fit == 0], X_val, y_val, epocas_max=epocas_max)
+    leaderboard.append(filas)
+    umbral = umbral_optimo(y_test, error_reconstruccion(autoencoder, X_test))
+    if verbose:
+        print(f"autoencoder: {autoencoder.hidden_layer_sizes} umbral={umbral:.6f} ({time.perf_counter() - inicio:.1f}s)")
+
+    leaderboard = pd.concat(leaderboard, ignore_index=True).sort_values(['modelo', 'ronda', 'f1'], ascending=[True, False, False])
+    leaderboard['ganador'] = False
+    leaderboard.loc[leaderboard['modelo'].isin([nombre_ganador, 'autoencoder']), 'ganador'] = (
+        leaderboard.groupby('modelo')['ronda'].transform('max').eq(leaderboard['ronda'])
+        & leaderboard.groupby(['modelo', 'ronda'])['f1'].transform('max').eq(leaderboard['f1'])
+    )
+
+    artefactos = {
+        # La clave se mantiene como "arbol": el dashboard solo usa predict_proba
+        "arbol": finalistas[nombre_ganador][1],
+        "autoencoder": autoencoder,
+        "preprocessor": preprocessor,
+        "umbral_autoencoder": np.float64(umbral),
+        "columnas_modelo": columnas,
+    }
+    return artefactos, leaderboard
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ajuste de hiperparámetros por successive halving.")
+    parser.add_argument('--datos', default=RUTA_DATOS)
+    parser.add_argument('--salida', default=RUTA_MODELOS)
+    parser.add_argument('--leaderboard', default='leaderboard.csv')
+    parser.add_argument('--candidatos', type=int, default=40, help="Candidatos iniciales por familia de clasificador")
+    parser.add_argument('--epocas-max', type=int, default=200)
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    args = parser.parse_args(argv)
+
+    df = limpiar_cartera(leer_cartera(args.datos))
+    artefactos, leaderboard = ajustar(df, n_candidatos=args.candidatos, n_jobs=args.n_jobs, epocas_max=args.epocas_max)
+
+    leaderboard.to_csv(args.leaderboard, index=False)
+    joblib.dump(artefactos, args.salida)
+    print(f"Leaderboard en {args.leaderboard}; artefactos guardados en {args.salida}")
+
+    directorio = os.path.splitext(args.salida)[0]
+    try:
+        exportar_paquete(artefactos, directorio)
+        print(f"Paquete sin pickle en {directorio}/")
+    except ValueError as e:
+        # p. ej. si ganó el gradient boosting. `cargar_artefactos` prefiere el paquete cuando existe, así que el de
+        # una corrida anterior seguiría sirviendo los modelos viejos: se borra para que el dashboard use este pickle
+        print(f"No se generó el paquete sin pickle: {e}")
+        if os.path.isfile(os.path.join(directorio, MANIFIESTO)):
+            shutil.rmtree(directorio)
+            print(f"Se eliminó el paquete anterior {directorio}/; el dashboard usará {args.salida}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+"""Almacén Parquet de la cartera limpia y puntuada, particionado por `mes` y `banco`.
+
+    almacen_cartera/
+        limpia/mes=2025-01/banco=bbva/part-0.parquet
+        puntuada/mes=2025-01/banco=bbva/part-0.parquet
+        departamentos/mes=2025-01/banco=bbva/part-0.parquet    agregados (ver riesgo.geografia)
+        ...
+
+`guardar_tabla` escribe una foto completa: la tabla queda exactamente con los
+datos recibidos (se escribe en un directorio aparte y se cambia por la
+anterior). Solo `incremental=True` conserva las particiones que no vienen en
+los datos, para agregar un corte mensual sin reescribir el historial.
+
+Cada tabla guarda en `_version.json` la versión de los datos que contiene;
+`asegurar_tabla` solo la reescribe si la versión cambió (pyarrow ignora los
+archivos que empiezan por `_` al leer la tabla).
+
+Los filtros sobre `mes` o `banco` descartan directorios completos (poda de
+particiones) y los filtros sobre otras columnas se evalúan contra las
+estadísticas min/max de cada row group, así que solo se leen los archivos y
+bloques que pueden tener filas. Los filtros usan la notación de
+`pyarrow.parquet`: `[('banco', '=', 'bbva'), ('saldo_capital', '>', 2e6)]`.
+
+    python -m riesgo.almacen              # limpia y puntúa PruebaDS.xlsx y guarda ambas tablas
+"""
+import argparse
+import functools
+import hashlib
+import json
+import os
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+RUTA_ALMACEN = 'almacen_cartera'
+COLS_PARTICION = ['mes', 'banco']
+FILAS_POR_GRUPO = 64_000
+ARCHIVO_VERSION = '_version.json'
+
+_PARTICIONADO = ds.partitioning(pa.schema([('mes', pa.string()), ('banco', pa.string())]), flavor='hive')
+
+
+def _ruta(tabla, directorio):
+    return os.path.join(directorio, tabla)
+
+
+def _escribir(fuente, ruta, existentes):
+    ds.write_dataset(
+        fuente, ruta, format='parquet', partitioning=_PARTICIONADO, existing_data_behavior=existentes,
+        max_rows_per_group=FILAS_POR_GRUPO, min_rows_per_group=min(FILAS_POR_GRUPO, 10_000),
+        file_options=ds.ParquetFileFormat().make_write_options(write_statistics=True, compression='snappy'),
+    )
+
+
+def guardar_tabla(datos, tabla, directorio=RUTA_ALMACEN, incremental=False):
+    """Escribe `datos` (DataFrame o ruta a un Parquet) particionado por `mes` y `banco`.
+
+    Con una ruta, los datos se copian por lotes sin cargarlos completos (ver
+    `riesgo.fuera_de_memoria`). La tabla anterior se reemplaza completa, también
+    las particiones que ya no vienen en `datos`. Con `incremental=True` solo se
+    reemplazan las particiones presentes en `datos` y las demás se conservan.
+    La versión guardada se borra: una escritura directa (o interrumpida) deja la tabla sin versión.
+    """
+    ruta = _ruta(tabla, directorio)
+    ruta_version = os.path.join(ruta, ARCHIVO_VERSION)
+    if os.path.exists(ruta_version):
+        os.remove(ruta_version)
+
+    if isinstance(datos, str):
+        fuente = ds.dataset(datos)
+    else:
+        fuente = pa.Table.from_pandas(datos, preserve_index=False)
+        # El almacén guarda los textos como string aunque un bloque venga todo vacío
+        fuente = fuente.cast(pa.schema([
+            pa.field(c.name, pa.string()) if pa.types.is_null(c.type) else c for c in fuente.schema
+        ]))
+
+    if incremental:
+        _escribir(fuente, ruta, 'delete_matching')
+        return
+
+    # Foto completa: se escribe al lado y se cambia por la tabla anterior, que se borra entera
+    nueva = os.path.join(directorio, f'_{tabla}.nueva')
+    anterior = os.path.join(directorio, f'_{tabla}.anterior')
+    for sobrante in (nueva, anterior):
+        shutil.rmtree(sobrante, ignore_errors=True)
+    _escribir(fuente, nueva, 'error')
+    os.makedirs(nueva, exist_ok=True)
+    if os.path.isdir(ruta):
+        os.rename(ruta, anterior)
+    os.rename(nueva, ruta)
+    shutil.rmtree(anterior, ignore_errors=True)
+
+
+def huella_datos(df):
+    """Versión de un DataFrame: columnas, tipos y contenido (incluido el índice)."""
+    h = hashlib.sha256(repr([(c, str(t)) for c, t in df.dtypes.items()]).encode('utf-8'))
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()[:16]
+
+
+def combinar_versiones(*versiones):
+    """Versión de una tabla derivada (p. ej. cartera limpia + modelos para la puntuada)."""
+    return hashlib.sha256(':'.join(versiones).encode('utf-8')).hexdigest()[:16]
+
+
+def version_tabla(tabla, directorio=RUTA_ALMACEN):
+    """Versión de datos guardada con la tabla; None si no existe o se escribió sin versión."""
+    try:
+        with open(os.path.join(_ruta(tabla, directorio), ARCHIVO_VERSION), encoding='utf-8') as f:
+            return json.load(f)['version']
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def asegurar_tabla(tabla, version, datos, directorio=RUTA_ALMACEN):
+    """Escribe la tabla completa solo si su versión guardada no es `version`; devuelve True si la escribió.
+
+    Las particiones que no vienen en `datos` se borran: la versión describe toda la tabla.
+    `datos` puede ser una función: así, con la tabla al día, no se calculan (p. ej. no se puntúa la cartera).
+    """
+    if version_tabla(tabla, directorio) == version:
+        return False
+    guardar_tabla(datos() if callable(datos) else datos, tabla, directorio)
+    # La versión se escribe al final: marca la tabla como completa
+    with open(os.path.join(_ruta(tabla, directorio), ARCHIVO_VERSION), 'w', encoding='utf-8') as f:
+        json.dump({'version': version}, f)
+    return True
+
+
+def abrir(tabla, directorio=RUTA_ALMACEN):
+    return ds.dataset(_ruta(tabla, directorio), format='parquet', partitioning=_PARTICIONADO)
+
+
+def existe(tabla, directorio=RUTA_ALMACEN):
+    return os.path.isdir(_ruta(tabla, directorio))
+
+
+def _expresion(filtros):
+    return pq.filters_to_expression(filtros) if filtros else None
+
+
+def archivos(tabla, filtros=None, directorio=RUTA_ALMACEN):
+    """Archivos que sobreviven a la poda de particiones para los filtros dados."""
+    return [f.path for f in abrir(tabla, directorio).get_fragments(filter=_expresion(filtros))]
+
+
+def leer_tabla(tabla, columnas=None, filtros=None, directorio=RUTA_ALMACEN):
+    """Lee solo las particiones, row groups y columnas necesarias para los filtros."""
+    datos = abrir(tabla, directorio).to_table(columns=columnas, filter=_expresion(filtros))
+    return datos.to_pandas()
+
+
+def resumen_por(tabla, por, columnas=('pago', 'saldo_capital'), filtros=None, directorio=RUTA_ALMACEN):
+    """Filas, suma y media de `columnas` por grupo, agregando en Arrow solo las columnas requeridas."""
+    por = [por] if isinstance(por, str) else list(por)
+    columnas = list(columnas)
+    datos = abrir(tabla, directorio).to_table(columns=por + columnas, filter=_expresion(filtros))
+    agregados = datos.group_by(por).aggregate(
+        [(columnas[0], 'count', pc.CountOptions(mode='all'))]
+        + [(c, 'sum') for c in columnas] + [(c, 'mean') for c in columnas]
+    )
+    resumen = agregados.to_pandas().set_index(por)
+    return resumen.rename(columns={f'{columnas[0]}_count': 'filas', **{f'{c}_sum': f'suma_{c}' for c in columnas},
+                                   **{f'{c}_mean': f'media_{c}' for c in columnas}})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Guarda la cartera limpia y puntuada en el almacén particionado.")
+    parser.add_argument('--datos', default=None, help="Archivo de cartera (por defecto PruebaDS.xlsx)")
+    parser.add_argument('--directorio', default=RUTA_ALMACEN)
+    parser.add_argument('--modelos', default=None, help="Paquete o pickle de modelos")
+    args = parser.parse_args(argv)
+
+    from riesgo.geografia import TABLA_AGREGADOS, agregar
+    from riesgo.limpieza import RUTA_DATOS, leer_cartera, limpiar_cartera
+    from riesgo.modelos import RUTA_MODELOS, cargar_artefactos, puntuar_cartera, version_modelos
+    ruta_modelos = args.modelos or RUTA_MODELOS
+    limpia = limpiar_cartera(leer_cartera(args.datos or RUTA_DATOS))
+    version_limpia = huella_datos(limpia)
+    version_puntuada = combinar_versiones(version_limpia, version_modelos(ruta_modelos))
+
+    # La cartera solo se puntúa si alguna de las tablas puntuadas no está al día
+    @functools.cache
+    def puntuar():
+        return puntuar_cartera(limpia, cargar_artefactos(ruta_modelos))
+
+    escritas = {
+        'limpia': asegurar_tabla('limpia', version_limpia, limpia, args.directorio),
+        'puntuada': asegurar_tabla('puntuada', version_puntuada, puntuar, args.directorio),
+        TABLA_AGREGADOS: asegurar_tabla(TABLA_AGREGADOS, version_puntuada, lambda: agregar(puntuar()), args.directorio),
+    }
+    for tabla, escrita in escritas.items():
+        print(f"{tabla}: {abrir(tabla, args.directorio).count_rows():,} filas en {len(archivos(tabla, directorio=args.directorio))} archivos"
+              + ("" if escrita else " (sin cambios)"))
+
+
+if __name__ == '__main__':
+    main()
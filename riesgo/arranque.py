@@ -0,0 +1,79 @@
+"""Presupuesto de tiempo de importación del arranque del dashboard.
+
+    python -m riesgo.arranque --presupuesto 2.0
+
+Importa en un proceso nuevo (caché de módulos fría) lo que `app.py` importa a
+nivel de módulo y falla (código de salida 1) si tarda más que el presupuesto o si
+arrastra alguna dependencia pesada que solo deberían cargar las páginas.
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+RUTA_APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+
+# Dependencias que solo pueden cargarse al visitar la página que las usa
+MODULOS_PESADOS = ['matplotlib', 'seaborn', 'sklearn', 'scipy', 'tensorflow', 'keras', 'pandasql']
+
+PRESUPUESTO_SEGUNDOS = 2.0
+
+_MEDICION = """
+import json, sys, time
+inicio = time.perf_counter()
+{importaciones}
+segundos = time.perf_counter() - inicio
+print(json.dumps({{'segundos': segundos, 'modulos': sorted({{m.split('.')[0] for m in sys.modules}})}}))
+"""
+
+
+def importaciones_de_arranque(ruta=RUTA_APP):
+    """Sentencias import del nivel superior de `ruta` (no las que están dentro de las páginas)."""
+    with open(ruta, encoding='utf-8') as f:
+        arbol = ast.parse(f.read())
+    return [ast.unparse(nodo) for nodo in arbol.body if isinstance(nodo, (ast.Import, ast.ImportFrom))]
+
+
+def medir_arranque(ruta=RUTA_APP, repeticiones=3):
+    """Mejor tiempo de importación en frío y módulos de primer nivel cargados."""
+    codigo = _MEDICION.format(importaciones='\n'.join(importaciones_de_arranque(ruta)))
+    directorio = os.path.dirname(os.path.abspath(ruta))
+    mediciones = []
+    for _ in range(repeticiones):
+        salida = subprocess.run([sys.executable, '-c', codigo], cwd=directorio, capture_output=True, text=True, check=True)
+        mediciones.append(json.loads(salida.stdout.strip().splitlines()[-1]))
+    mejor = min(mediciones, key=lambda m: m['segundos'])
+    return mejor['segundos'], mejor['modulos']
+
+
+def verificar_arranque(presupuesto=PRESUPUESTO_SEGUNDOS, ruta=RUTA_APP, repeticiones=3):
+    """Lista de violaciones del presupuesto (vacía si el arranque cumple)."""
+    segundos, modulos = medir_arranque(ruta, repeticiones)
+    problemas = []
+    if segundos > presupuesto:
+        problemas.append(f"El arranque importa en {segundos:.2f}s (presupuesto {presupuesto:.2f}s)")
+    pesados = sorted(set(MODULOS_PESADOS) & set(modulos))
+    if pesados:
+        problemas.append(f"El arranque carga dependencias de páginas: {', '.join(pesados)}")
+    return segundos, problemas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verifica el presupuesto de importación del arranque del dashboard.")
+    parser.add_argument('--presupuesto', type=float, default=PRESUPUESTO_SEGUNDOS, help="Segundos máximos de importación en frío")
+    parser.add_argument('--app', default=RUTA_APP)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    segundos, problemas = verificar_arranque(args.presupuesto, args.app, args.repeticiones)
+    for problema in problemas:
+        print(f"FALLA: {problema}")
+    if problemas:
+        sys.exit(1)
+    print(f"OK: arranque en {segundos:.2f}s (presupuesto {args.presupuesto:.2f}s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+import numpy as np
+
+# Supuestos operativos por canal (editables en el dashboard):
+#   capacidad: fracción de la base que el canal puede gestionar en el mes (None = sin límite)
+#   costo: costo por gestión en COP
+#   efectividad: fracción de la probabilidad del árbol que se logra por ese canal; el modelo
+#                se entrenó sobre la gestión actual (llamadas), por eso la llamada vale 1.0
+CANALES = {
+    'Llamada Humana': {'capacidad': 0.11, 'costo': 5000, 'efectividad': 1.0},
+    'WhatsApp/SMS': {'capacidad': 0.30, 'costo': 200, 'efectividad': 0.6},
+    'Email': {'capacidad': None, 'costo': 20, 'efectividad': 0.25},
+}
+
+SIN_CANAL = 'Sin Gestión'
+
+
+def resolver_asignacion(valor, efectividad, costo, capacidades):
+    """Asigna a lo sumo un canal por deudor maximizando sum(efectividad * valor - costo).
+
+    Con ganancias de esta forma el óptimo asigna a los deudores de mayor `valor`, en
+    bloques contiguos y con los canales ordenados de mayor a menor efectividad. Solo hay
+    que elegir el tamaño de cada bloque: la ganancia total se separa en funciones
+    cóncavas del límite de cada bloque y una programación dinámica vectorizada sobre
+    los n + 1 límites posibles da el óptimo exacto en O(n log n).
+    Devuelve el índice de canal por deudor (-1 = sin gestión).
+    """
+    n = len(valor)
+    efectividad = np.asarray(efectividad, dtype=np.float64)
+    costo = np.asarray(costo, dtype=np.float64)
+    capacidades = np.array([n if c is None else min(int(c), n) for c in capacidades])
+
+    orden_canales = np.argsort(-efectividad, kind='stable')
+    orden = np.argsort(-valor, kind='stable')
+    acumulado = np.concatenate([[0.0], np.cumsum(valor[orden])])
+    limites = np.arange(n + 1)
+
+    # Ganancia marginal de mover el límite del bloque c: diferencias con el canal siguiente
+    e = np.append(efectividad[orden_canales], 0.0)
+    k = np.append(costo[orden_canales], 0.0)
+
+    mejor = np.full(n + 1, -np.inf)
+    mejor[:capacidades[orden_canales[0]] + 1] = 0.0
+    previos = []
+    maximo_previo = 0
+    for i, c in enumerate(orden_canales):
+        if i > 0:
+            # El límite anterior debe quedar en [limite - capacidad, limite]; al ser cóncava,
+            # el mejor valor en esa ventana está en el argmax recortado a la ventana
+            desde = limites - capacidades[c]
+            previo = np.clip(np.argmax(mejor), desde, np.minimum(limites, maximo_previo))
+            factible = desde <= maximo_previo
+            mejor = np.where(factible, mejor[np.minimum(previo, n)], -np.inf)
+            previos.append(previo)
+            maximo_previo = min(maximo_previo + capacidades[c], n)
+        else:
+            maximo_previo = capacidades[c]
+        mejor = mejor + (e[i] - e[i + 1]) * acumulado - (k[i] - k[i + 1]) * limites
+
+    # Reconstrucción de los límites de cada bloque
+    limite = int(np.argmax(mejor))
+    bloques = [limite]
+    for previo in reversed(previos):
+        limite = int(previo[limite])
+        bloques.append(limite)
+    bloques = [0] + bloques[::-1]
+
+    canal = np.full(n, -1)
+    for i, c in enumerate(orden_canales):
+        canal[orden[bloques[i]:bloques[i + 1]]] = c
+    return canal
+
+
+def plan_canales(df_pred, canales=CANALES):
+    """Plan de gestión por deudor y resumen por canal a partir de la cartera puntuada."""
+    nombres = list(canales)
+    n = len(df_pred)
+    costo = np.array([canales[c]['costo'] for c in nombres], dtype=np.float64)
+    efectividad = np.array([canales[c]['efectividad'] for c in nombres], dtype=np.float64)
+    capacidades = [None if canales[c]['capacidad'] is None else round(canales[c]['capacidad'] * n) for c in nombres]
+
+    valor = df_pred['probabilidad_pago_arbol'].to_numpy() * df_pred['saldo_capital'].to_numpy()
+    canal = resolver_asignacion(valor, efectividad, costo, capacidades)
+    asignado = canal >= 0
+    canal_seguro = np.where(asignado, canal, 0)
+
+    plan = df_pred[['identificacion', 'saldo_capital', 'probabilidad_pago_arbol']].copy()
+    # El índice -1 cae en SIN_CANAL, el último de la lista
+    plan['canal'] = np.array(nombres + [SIN_CANAL], dtype=object)[canal]
+    plan['recuperacion_esperada'] = np.where(asignado, valor * efectividad[canal_seguro], 0.0)
+    plan['costo'] = np.where(asignado, costo[canal_seguro], 0.0)
+    plan['ganancia_neta'] = plan['recuperacion_esperada'] - plan['costo']
+    plan = plan.sort_values('ganancia_neta', ascending=False, kind='stable')
+
+    resumen = plan.groupby('canal', sort=False).agg(
+        deudores=('identificacion', 'size'),
+        saldo_total=('saldo_capital', 'sum'),
+        recuperacion_esperada=('recuperacion_esperada', 'sum'),
+        costo_total=('costo', 'sum'),
+        ganancia_neta=('ganancia_neta', 'sum'),
+    ).reindex(nombres + [SIN_CANAL], fill_value=0)
+    resumen['capacidad'] = [n if c is None else c for c in capacidades] + [np.nan]
+
+    return plan, resumen
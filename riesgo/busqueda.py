@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+_SIN_FILAS = np.empty(0, dtype=np.int64)
+
+
+class IndiceDeudores:
+    """Índice de `identificacion` (y `tipo_documento`) a posiciones de fila de una tabla.
+
+    Se construye con un solo group-by; cada búsqueda es un acceso a diccionario.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self._id_entero = pd.api.types.is_integer_dtype(df['identificacion'])
+        self._por_id = df.groupby('identificacion', sort=False).indices
+        self._por_documento = {}
+        if 'tipo_documento' in df.columns:
+            self._por_documento = df.groupby(['tipo_documento', 'identificacion'], sort=False).indices
+
+    def _normalizar(self, identificacion):
+        # El texto del buscador se convierte al tipo de la columna, no al revés
+        texto = str(identificacion).strip()
+        if not self._id_entero:
+            return texto
+        try:
+            return int(texto)
+        except ValueError:
+            return None
+
+    def posiciones(self, identificacion, tipo_documento=None):
+        clave = self._normalizar(identificacion)
+        if clave is None:
+            return _SIN_FILAS
+        if tipo_documento is None:
+            return self._por_id.get(clave, _SIN_FILAS)
+        return self._por_documento.get((tipo_documento, clave), _SIN_FILAS)
+
+    def filas(self, identificacion, tipo_documento=None):
+        return self.df.iloc[self.posiciones(identificacion, tipo_documento)]
+
+
+def ficha_deudor(identificacion, original, limpia, puntuada=None, tipo_documento=None):
+    """Todas las deudas de un cliente en la cartera original, limpia y puntuada.
+
+    `historial` trae las filas originales con la columna `conservado`, que indica
+    qué registro sobrevivió a la eliminación de duplicados.
+    """
+    historial = original.filas(identificacion, tipo_documento).copy()
+    deudas = limpia.filas(identificacion, tipo_documento)
+    # La limpieza conserva el índice original, así se cruza el historial sin buscar por valor
+    historial['conservado'] = historial.index.isin(deudas.index)
+
+    return {
+        'historial': historial,
+        'deudas': deudas,
+        'puntajes': puntuada.filas(identificacion, tipo_documento) if puntuada is not None else None,
+    }
@@ -0,0 +1,206 @@
+"""Reglas de calidad de datos evaluadas al ingresar cada archivo de cartera.
+
+Las reglas son declarativas (`REGLAS`) y se evalúan en una sola pasada
+vectorizada: cada regla produce una máscara booleana de filas que la incumplen
+y el reporte resume su proporción en el lote. Severidades:
+
+* `cuarentena`: la fila se aparta (con el motivo) y no llega a la limpieza ni al modelo.
+* `advertencia`: la fila se conserva y la regla solo se reporta.
+
+Las reglas se evalúan sobre el archivo crudo (`leer_cartera_cruda`), antes de
+`asegurar_pago`: de otro modo un `pago` no binario ya llegaría convertido a 0/1.
+
+El lote se rechaza si alguna regla supera su `max_proporcion` o si la
+cuarentena supera `MAX_CUARENTENA`; así un archivo mensual defectuoso se
+detiene antes de la deduplicación y la puntuación.
+
+    python -m riesgo.calidad --datos PruebaDS.xlsx --cuarentena cuarentena/
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from riesgo.limpieza import COLS_DUPLICADOS, MAPA_EDAD, MAPA_GENERO
+from riesgo.modelos import MAX_DIAS_MORA, MIN_SALDO_CAPITAL
+
+MAX_CUARENTENA = 0.05
+
+COLUMNAS_REQUERIDAS = [
+    'mes', 'tipo_documento', 'identificacion', 'genero', 'rango_edad_probable', 'departamento',
+    'saldo_capital', 'dias_mora', 'banco', 'antiguedad_deuda', 'pago_mes_anterior',
+    'meses_desde_ultimo_pago', 'sin_pago_previo', 'contacto_mes_actual', 'contacto_mes_anterior',
+    'contacto_ultimos_6meses', 'duracion_llamadas_ultimos_6meses', 'pago',
+]
+
+# Valores crudos aceptados: los que la limpieza sabe normalizar y los ya normalizados
+GENEROS_VALIDOS = set(MAPA_GENERO) | set(MAPA_GENERO.values())
+EDADES_VALIDAS = set(MAPA_EDAD) | set(MAPA_EDAD.values()) | {'NO APLICA', 'No especificado'}
+
+REGLAS = [
+    # Nulos
+    {'nombre': 'identificacion_nula', 'tipo': 'nulos', 'columna': 'identificacion', 'severidad': 'cuarentena'},
+    {'nombre': 'saldo_nulo', 'tipo': 'nulos', 'columna': 'saldo_capital', 'severidad': 'cuarentena'},
+    {'nombre': 'mora_nula', 'tipo': 'nulos', 'columna': 'dias_mora', 'severidad': 'cuarentena'},
+    {'nombre': 'mes_nulo', 'tipo': 'nulos', 'columna': 'mes', 'severidad': 'cuarentena'},
+    {'nombre': 'genero_faltante', 'tipo': 'nulos', 'columna': 'genero', 'severidad': 'advertencia', 'max_proporcion': 0.60},
+    {'nombre': 'edad_faltante', 'tipo': 'nulos', 'columna': 'rango_edad_probable', 'severidad': 'advertencia', 'max_proporcion': 0.60},
+    {'nombre': 'departamento_faltante', 'tipo': 'nulos', 'columna': 'departamento', 'severidad': 'advertencia', 'max_proporcion': 0.60},
+    {'nombre': 'antiguedad_faltante', 'tipo': 'nulos', 'columna': 'antiguedad_deuda', 'severidad': 'advertencia', 'max_proporcion': 0.90},
+
+    # Rangos
+    {'nombre': 'saldo_negativo', 'tipo': 'rango', 'columna': 'saldo_capital', 'min': 0, 'severidad': 'cuarentena'},
+    {'nombre': 'mora_negativa', 'tipo': 'rango', 'columna': 'dias_mora', 'min': 0, 'severidad': 'cuarentena'},
+    {'nombre': 'micro_saldo', 'tipo': 'rango', 'columna': 'saldo_capital', 'min': MIN_SALDO_CAPITAL, 'severidad': 'advertencia'},
+    {'nombre': 'mora_extrema', 'tipo': 'rango', 'columna': 'dias_mora', 'max': MAX_DIAS_MORA, 'severidad': 'advertencia'},
+    {'nombre': 'recencia_fuera_de_rango', 'tipo': 'rango', 'columna': 'meses_desde_ultimo_pago', 'min': 0, 'max': 120, 'severidad': 'cuarentena'},
+    {'nombre': 'contactos_negativos', 'tipo': 'rango', 'columna': 'duracion_llamadas_ultimos_6meses', 'min': 0, 'severidad': 'cuarentena'},
+
+    # Categorías permitidas (los nulos se controlan con las reglas de nulos)
+    {'nombre': 'pago_no_binario', 'tipo': 'categorias', 'columna': 'pago', 'valores': {0, 1}, 'severidad': 'cuarentena'},
+    {'nombre': 'genero_desconocido', 'tipo': 'categorias', 'columna': 'genero', 'valores': GENEROS_VALIDOS, 'severidad': 'cuarentena'},
+    {'nombre': 'edad_desconocida', 'tipo': 'categorias', 'columna': 'rango_edad_probable', 'valores': EDADES_VALIDAS, 'severidad': 'cuarentena'},
+    {'nombre': 'tipo_documento_desconocido', 'tipo': 'categorias', 'columna': 'tipo_documento', 'valores': {'C', 'E', 'T', 'P'}, 'severidad': 'cuarentena'},
+    {'nombre': 'mes_mal_formado', 'tipo': 'patron', 'columna': 'mes', 'patron': r'^\d{4}-\d{2}$', 'severidad': 'cuarentena'},
+
+    # Duplicados por llave (la limpieza conserva uno; aquí solo se vigila su proporción)
+    {'nombre': 'deuda_duplicada', 'tipo': 'duplicados', 'columnas': COLS_DUPLICADOS, 'severidad': 'advertencia', 'max_proporcion': 0.20},
+]
+
+
+class LoteRechazado(ValueError):
+    """El archivo no pasó las reglas de calidad; `reporte` trae el detalle."""
+
+    def __init__(self, mensaje, reporte):
+        super().__init__(mensaje)
+        self.reporte = reporte
+
+
+def _mascara(df, regla):
+    """Filas que incumplen la regla (vacía si falta la columna: eso lo reporta `columnas_faltantes`)."""
+    tipo = regla['tipo']
+    if tipo == 'duplicados':
+        columnas = [c for c in regla['columnas'] if c in df.columns]
+        return df.duplicated(subset=columnas, keep='first').to_numpy()
+
+    col = regla['columna']
+    if col not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    serie = df[col]
+
+    if tipo == 'nulos':
+        return serie.isna().to_numpy()
+    if tipo == 'rango':
+        valores = pd.to_numeric(serie, errors='coerce').to_numpy(dtype=np.float64)
+        falla = np.zeros(len(df), dtype=bool)
+        if 'min' in regla:
+            falla |= valores < regla['min']
+        if 'max' in regla:
+            falla |= valores > regla['max']
+        return falla
+    if tipo == 'categorias':
+        return (serie.notna() & ~serie.isin(regla['valores'])).to_numpy()
+    if tipo == 'patron':
+        return (serie.notna() & ~serie.astype(str).str.match(regla['patron'])).to_numpy()
+    raise ValueError(f"Tipo de regla desconocido: {tipo}")
+
+
+def evaluar_calidad(df, reglas=REGLAS, max_cuarentena=MAX_CUARENTENA):
+    """Evalúa las reglas sobre el lote.
+
+    Devuelve un diccionario con `reporte` (una fila por regla), `validas`,
+    `cuarentena` (filas apartadas con la columna `motivo`) y `aprobado`.
+    """
+    faltantes = [c for c in COLUMNAS_REQUERIDAS if c not in df.columns]
+    fallas = np.column_stack([_mascara(df, regla) for regla in reglas]) if len(reglas) else np.zeros((len(df), 0), dtype=bool)
+
+    n = max(len(df), 1)
+    reporte = pd.DataFrame({
+        'regla': [r['nombre'] for r in reglas],
+        'tipo': [r['tipo'] for r in reglas],
+        'columna': [r.get('columna', ', '.join(r.get('columnas', []))) for r in reglas],
+        'severidad': [r['severidad'] for r in reglas],
+        'filas': fallas.sum(axis=0),
+        'proporcion': fallas.sum(axis=0) / n,
+        'max_proporcion': [r.get('max_proporcion', np.nan) for r in reglas],
+    })
+    reporte['estado'] = np.where(reporte['proporcion'] > reporte['max_proporcion'], 'Rechaza lote',
+                                 np.where(reporte['filas'] > 0, 'Con fallas', 'OK'))
+
+    en_cuarentena = reporte['severidad'].to_numpy() == 'cuarentena'
+    fallas_cuarentena = fallas[:, en_cuarentena]
+    apartar = fallas_cuarentena.any(axis=1)
+
+    cuarentena = df[apartar].copy()
+    nombres = reporte.loc[en_cuarentena, 'regla'].to_numpy()
+    # Motivo: reglas incumplidas separadas por coma (solo se arma para las filas apartadas)
+    cuarentena['motivo'] = [', '.join(nombres[fila]) for fila in fallas_cuarentena[apartar]]
+
+    proporcion_cuarentena = apartar.sum() / n
+    aprobado = not faltantes and not (reporte['estado'] == 'Rechaza lote').any() and proporcion_cuarentena <= max_cuarentena
+
+    return {
+        'reporte': reporte,
+        'validas': df[~apartar],
+        'cuarentena': cuarentena,
+        'columnas_faltantes': faltantes,
+        'proporcion_cuarentena': proporcion_cuarentena,
+        'aprobado': aprobado,
+    }
+
+
+def motivo_rechazo(calidad, max_cuarentena=MAX_CUARENTENA):
+    if calidad['columnas_faltantes']:
+        return f"Faltan columnas: {calidad['columnas_faltantes']}"
+    rechazo = calidad['reporte'].loc[calidad['reporte']['estado'] == 'Rechaza lote', 'regla'].tolist()
+    if rechazo:
+        return f"Reglas sobre su límite: {rechazo}"
+    return f"{calidad['proporcion_cuarentena']:.1%} de filas en cuarentena (máximo {max_cuarentena:.0%})"
+
+
+def guardar_cuarentena(calidad, directorio):
+    if calidad['cuarentena'].empty:
+        return None
+    os.makedirs(directorio, exist_ok=True)
+    ruta = os.path.join(directorio, 'cuarentena.csv')
+    calidad['cuarentena'].to_csv(ruta, index=False)
+    return ruta
+
+
+def validar_lote(df, reglas=REGLAS, directorio_cuarentena=None):
+    """Filas válidas del lote; lanza `LoteRechazado` si el archivo no pasa la calidad."""
+    calidad = evaluar_calidad(df, reglas)
+    if directorio_cuarentena is not None:
+        guardar_cuarentena(calidad, directorio_cuarentena)
+    if not calidad['aprobado']:
+        raise LoteRechazado(f"Lote rechazado. {motivo_rechazo(calidad)}", calidad['reporte'])
+    return calidad['validas']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evalúa las reglas de calidad sobre un archivo de cartera.")
+    parser.add_argument('--datos', default=None, help="Archivo de cartera (por defecto PruebaDS.xlsx)")
+    parser.add_argument('--cuarentena', default=None, help="Directorio donde escribir las filas apartadas")
+    parser.add_argument('--reporte', default=None, help="CSV de salida con el reporte por regla")
+    args = parser.parse_args(argv)
+
+    from riesgo.limpieza import RUTA_DATOS, leer_cartera_cruda
+    df = leer_cartera_cruda(args.datos or RUTA_DATOS)
+    calidad = evaluar_calidad(df)
+
+    if args.cuarentena:
+        guardar_cuarentena(calidad, args.cuarentena)
+    if args.reporte:
+        calidad['reporte'].to_csv(args.reporte, index=False)
+
+    print(calidad['reporte'].to_string(index=False))
+    print(f"\n{len(calidad['validas']):,} filas válidas, {len(calidad['cuarentena']):,} en cuarentena.")
+    if not calidad['aprobado']:
+        print(f"LOTE RECHAZADO: {motivo_rechazo(calidad)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""Almacén de características derivadas del deudor, definidas una sola vez.
+
+Cada característica de `DEFINICIONES` declara sus columnas de entrada, una
+versión y la función que la calcula. El mismo cálculo alimenta al modelo
+(entrenamiento y puntuación vía `preparar_entrada`), a las páginas de EDA y a
+la consulta SQL, así que entrenamiento y servicio ven exactamente los mismos valores.
+
+`materializar` guarda todas las características como tabla columnar
+(Parquet) por versión de datos, junto con su linaje:
+
+    almacen_cartera/caracteristicas/<version_datos>/
+        caracteristicas.parquet     una columna por característica, índice = fila de la cartera
+        linaje.json                 versión de datos y de definiciones, entradas y tipo de cada una
+
+    python -m riesgo.caracteristicas        # materializa las de la cartera limpia de PruebaDS.xlsx
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from riesgo.almacen import RUTA_ALMACEN
+from riesgo.limpieza import ORDEN_EDAD, normalizar_edad, normalizar_genero
+
+RUTA_CARACTERISTICAS = os.path.join(RUTA_ALMACEN, 'caracteristicas')
+ARCHIVO_TABLA = 'caracteristicas.parquet'
+ARCHIVO_LINAJE = 'linaje.json'
+
+# Valor de `recencia_pago` para quien nunca ha pagado (`meses_desde_ultimo_pago` vacío)
+SIN_PAGOS = -1
+
+
+def _recencia_pago(df):
+    return df['meses_desde_ultimo_pago'].fillna(SIN_PAGOS)
+
+
+def _pagador_caido(df):
+    # Pagó alguna vez, pero no el mes anterior
+    return (df['pago_mes_anterior'] == 0) & (df['sin_pago_previo'] == 0)
+
+
+def _genero_normalizado(df):
+    return normalizar_genero(df['genero'])
+
+
+def _rango_edad(df):
+    return pd.Categorical(normalizar_edad(df['rango_edad_probable']), categories=ORDEN_EDAD, ordered=True)
+
+
+DEFINICIONES = {
+    'recencia_pago': {
+        'entradas': ['meses_desde_ultimo_pago'], 'version': 1, 'calcular': _recencia_pago,
+        'descripcion': "Meses desde el último pago; -1 si nunca ha pagado (entrada del modelo)",
+    },
+    'pagador_caido': {
+        'entradas': ['pago_mes_anterior', 'sin_pago_previo'], 'version': 1, 'calcular': _pagador_caido,
+        'descripcion': "Pagó alguna vez pero no el mes anterior",
+    },
+    'genero_normalizado': {
+        'entradas': ['genero'], 'version': 1, 'calcular': _genero_normalizado,
+        'descripcion': "HOMBRE / MUJER / No especificado",
+    },
+    'rango_edad': {
+        'entradas': ['rango_edad_probable'], 'version': 1, 'calcular': _rango_edad,
+        'descripcion': "Rango de edad agrupado, categórico ordenado por etapa de vida",
+    },
+}
+
+
+def calcular(df, nombres=None):
+    """Características `nombres` (todas por defecto) de `df`, con el mismo índice."""
+    nombres = list(DEFINICIONES) if nombres is None else list(nombres)
+    return pd.DataFrame({nombre: DEFINICIONES[nombre]['calcular'](df) for nombre in nombres}, index=df.index)
+
+
+def entradas(nombres=None):
+    nombres = list(DEFINICIONES) if nombres is None else list(nombres)
+    return list(dict.fromkeys(col for nombre in nombres for col in DEFINICIONES[nombre]['entradas']))
+
+
+def version_definiciones():
+    descripcion = {nombre: [d['entradas'], d['version']] for nombre, d in DEFINICIONES.items()}
+    return hashlib.sha256(json.dumps(descripcion, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def version_datos(df):
+    """Huella de las columnas de entrada (y del índice) de la cartera más la versión de las definiciones."""
+    h = hashlib.sha256(version_definiciones().encode('utf-8'))
+    h.update(pd.util.hash_pandas_object(df[entradas()], index=True).to_numpy().tobytes())
+    return h.hexdigest()[:16]
+
+
+def linaje(df, tabla):
+    return {
+        'version_datos': version_datos(df),
+        'version_definiciones': version_definiciones(),
+        'filas': len(tabla),
+        'creado': datetime.datetime.now().isoformat(timespec='seconds'),
+        'caracteristicas': {
+            nombre: {'entradas': d['entradas'], 'version': d['version'], 'descripcion': d['descripcion'],
+                     'tipo': str(tabla[nombre].dtype)}
+            for nombre, d in DEFINICIONES.items()
+        },
+    }
+
+
+def materializar(df, directorio=RUTA_CARACTERISTICAS):
+    """Versión de datos de `df`; calcula y guarda sus características solo si esa versión no existe."""
+    version = version_datos(df)
+    ruta = os.path.join(directorio, version)
+    if not os.path.exists(os.path.join(ruta, ARCHIVO_LINAJE)):
+        tabla = calcular(df)
+        os.makedirs(ruta, exist_ok=True)
+        tabla.to_parquet(os.path.join(ruta, ARCHIVO_TABLA), index=True)
+        # El linaje se escribe al final: marca la versión como completa
+        with open(os.path.join(ruta, ARCHIVO_LINAJE), 'w', encoding='utf-8') as f:
+            json.dump(linaje(df, tabla), f, indent=2, ensure_ascii=False)
+    return version
+
+
+def leer(version, columnas=None, directorio=RUTA_CARACTERISTICAS):
+    return pd.read_parquet(os.path.join(directorio, version, ARCHIVO_TABLA), columns=columnas)
+
+
+def leer_linaje(version, directorio=RUTA_CARACTERISTICAS):
+    with open(os.path.join(directorio, version, ARCHIVO_LINAJE), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def con_caracteristicas(df, directorio=RUTA_CARACTERISTICAS):
+    """`df` con todas las características agregadas, leídas de la versión materializada."""
+    tabla = leer(materializar(df, directorio), directorio=directorio)
+    return df.join(tabla[[c for c in tabla.columns if c not in df.columns]])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Materializa las características derivadas de la cartera limpia.")
+    parser.add_argument('--datos', default=None, help="Archivo de cartera (por defecto PruebaDS.xlsx)")
+    parser.add_argument('--directorio', default=RUTA_CARACTERISTICAS)
+    args = parser.parse_args(argv)
+
+    from riesgo.limpieza import RUTA_DATOS, leer_cartera, limpiar_cartera
+    version = materializar(limpiar_cartera(leer_cartera(args.datos or RUTA_DATOS)), args.directorio)
+    registro = leer_linaje(version, args.directorio)
+    print(f"Versión {version}: {registro['filas']:,} filas")
+    for nombre, d in registro['caracteristicas'].items():
+        print(f"  {nombre:<20} {d['tipo']:<10} <- {', '.join(d['entradas'])}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""Cohortes de recencia y cosechas (vintages) inferidas de `dias_mora`.
+
+`AnalisisCohortes` agrupa la cartera una sola vez por (banco, recencia,
+cosecha) y guarda solo conteos de deudores y pagos; las tablas, los KPIs y el
+filtro por banco se calculan sobre esos conteos, sin volver a recorrer filas.
+
+Las cosechas se infieren de los picos del histograma suavizado de `dias_mora`
+(las compras de cartera en años distintos dejan una joroba cada una): se toman
+los picos más altos separados al menos `separacion` días y se corta en el
+valle de menor densidad entre picos consecutivos.
+"""
+import numpy as np
+import pandas as pd
+
+from riesgo.caracteristicas import SIN_PAGOS, calcular
+
+N_COSECHAS = 3
+ANCHO_INTERVALO = 50
+SEPARACION_MINIMA = 500
+# A partir de este mes sin pagar la recuperación es prácticamente nula
+MES_CEMENTERIO = 5
+
+
+def inferir_cortes_cosecha(dias_mora, n_cosechas=N_COSECHAS, ancho=ANCHO_INTERVALO, separacion=SEPARACION_MINIMA):
+    """Cortes en días de mora que separan las `n_cosechas` jorobas principales."""
+    dias = np.asarray(dias_mora, dtype=np.float64)
+    dias = dias[~np.isnan(dias)]
+    bordes = np.arange(0, dias.max() + 2 * ancho, ancho)
+    conteos, _ = np.histogram(dias, bins=bordes)
+    suave = np.convolve(conteos, np.ones(7) / 7, mode='same')
+
+    candidatos = np.flatnonzero((suave[1:-1] > suave[:-2]) & (suave[1:-1] >= suave[2:])) + 1
+    picos = []
+    for i in candidatos[np.argsort(-suave[candidatos], kind='stable')]:
+        if all(abs(i - j) * ancho >= separacion for j in picos):
+            picos.append(i)
+        if len(picos) == n_cosechas:
+            break
+    picos.sort()
+
+    valles = [a + np.argmin(suave[a:b + 1]) for a, b in zip(picos[:-1], picos[1:])]
+    return [float(bordes[v] + ancho / 2) for v in valles]
+
+
+def _etiquetas_cosecha(cortes):
+    limites = [0.0] + list(cortes) + [np.inf]
+    return [
+        f"Cosecha {i + 1} ({limites[i]:,.0f}-{limites[i + 1]:,.0f} días)" if np.isfinite(limites[i + 1])
+        else f"Cosecha {i + 1} (>{limites[i]:,.0f} días)"
+        for i in range(len(limites) - 1)
+    ]
+
+
+def _tasas(conteos):
+    tabla = conteos.copy()
+    tabla['tasa_pago'] = tabla['pagos'] / tabla['deudores']
+    return tabla
+
+
+class AnalisisCohortes:
+    """Conteos de deudores y pagos por banco, recencia y cosecha."""
+
+    def __init__(self, df, cortes_cosecha=None):
+        self.cortes_cosecha = list(cortes_cosecha) if cortes_cosecha is not None else inferir_cortes_cosecha(df['dias_mora'])
+        self.etiquetas_cosecha = _etiquetas_cosecha(self.cortes_cosecha)
+
+        recencia = calcular(df, ['recencia_pago'])['recencia_pago'].astype(np.int64)
+        cosecha = np.searchsorted(self.cortes_cosecha, df['dias_mora'].to_numpy(), side='right')
+        self.conteos = (
+            pd.DataFrame({'banco': df['banco'].to_numpy(), 'recencia': recencia.to_numpy(),
+                          'cosecha': cosecha, 'pago': df['pago'].to_numpy(), 'saldo_capital': df['saldo_capital'].to_numpy()})
+            .groupby(['banco', 'recencia', 'cosecha'], sort=True)
+            .agg(deudores=('pago', 'size'), pagos=('pago', 'sum'), saldo_capital=('saldo_capital', 'sum'))
+        )
+
+    @property
+    def bancos(self):
+        return self.conteos.index.get_level_values('banco').unique().tolist()
+
+    def _filtrar(self, banco=None):
+        return self.conteos if banco is None else self.conteos.xs(banco, level='banco', drop_level=False)
+
+    def recencia(self, banco=None):
+        """Tasa de pago por meses desde el último pago (`SIN_PAGOS` = nunca pagó)."""
+        return _tasas(self._filtrar(banco).groupby(level='recencia')[['deudores', 'pagos']].sum())
+
+    def cosechas(self, banco=None):
+        """Tasa de pago y saldo por cosecha inferida."""
+        tabla = _tasas(self._filtrar(banco).groupby(level='cosecha')[['deudores', 'pagos', 'saldo_capital']].sum())
+        return tabla.rename(index=dict(enumerate(self.etiquetas_cosecha)))
+
+    def recencia_por_cosecha(self, banco=None):
+        """Tasa de pago cruzada recencia × cosecha (NaN donde no hay deudores)."""
+        tabla = _tasas(self._filtrar(banco).groupby(level=['recencia', 'cosecha'])[['deudores', 'pagos']].sum())
+        return tabla['tasa_pago'].unstack('cosecha').rename(columns=dict(enumerate(self.etiquetas_cosecha)))
+
+    def kpis(self, banco=None):
+        """Indicadores de la pestaña de recencia, calculados con los datos vigentes."""
+        rec = self.recencia(banco)
+        con_pagos = rec[rec.index != SIN_PAGOS]
+
+        def tasa(filas):
+            deudores = filas['deudores'].sum()
+            return filas['pagos'].sum() / deudores if deudores else np.nan
+
+        kpis = {
+            'con_historial': {'deudores': int(con_pagos['deudores'].sum()), 'pagos': int(con_pagos['pagos'].sum()), 'tasa': tasa(con_pagos)},
+            'sin_historial': {'deudores': int(rec.loc[rec.index == SIN_PAGOS, 'deudores'].sum()),
+                              'pagos': int(rec.loc[rec.index == SIN_PAGOS, 'pagos'].sum()),
+                              'tasa': tasa(rec[rec.index == SIN_PAGOS])},
+            'mes': {int(m): tasa(rec.loc[[m]]) for m in con_pagos.index},
+            'cementerio': tasa(rec[rec.index >= MES_CEMENTERIO]),
+        }
+        sin = kpis['sin_historial']['tasa']
+        kpis['factor'] = kpis['con_historial']['tasa'] / sin if sin else np.nan
+        return kpis
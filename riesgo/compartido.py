@@ -0,0 +1,249 @@
+"""Carteras compartidas entre sesiones: un solo objeto en memoria, de solo lectura.
+
+`st.cache_data` entrega a cada rerun una copia deserializada del DataFrame, así
+que la memoria y el tiempo por sesión crecen con el tamaño de la cartera. Las
+carteras grandes se guardan con `st.cache_resource` (todas las sesiones reciben
+la misma referencia) después de `congelar`, que devuelve una `CarteraCompartida`:
+todos sus arreglos (también los de texto) quedan de solo lectura, y asignar o
+borrar columnas, las operaciones `inplace=True`, cambiar índice o columnas y
+agregar filas lanzan `ValueError` en lugar de modificar los datos de las demás
+sesiones.
+
+Las páginas leen, filtran (lo que crea frames nuevos y pequeños, que son
+DataFrames normales) o agregan columnas sobre una `vista`, que comparte las
+columnas existentes sin copiarlas.
+
+    python -m riesgo.compartido --sesiones 64 --reruns 5      # prueba de estrés
+"""
+import argparse
+import operator
+import pickle
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+SOLO_LECTURA = "La cartera compartida es de solo lectura: use vista(df) para agregar columnas"
+
+
+def _arreglos(df):
+    """Arreglos numpy que guardan las columnas de `df`."""
+    # `_mgr.arrays` son los bloques reales: marcar la vista de `df[col].to_numpy()` no protegería la base.
+    # Fechas y categóricas envuelven un arreglo numpy (`_ndarray`, `_codes`)
+    for bloque in df._mgr.arrays:
+        for arreglo in [bloque, getattr(bloque, '_ndarray', None), getattr(bloque, '_codes', None)]:
+            if isinstance(arreglo, np.ndarray):
+                yield arreglo
+
+
+def _solo_lectura(self, *args, **kwargs):
+    raise ValueError(SOLO_LECTURA)
+
+
+class CarteraCompartida(pd.DataFrame):
+    """DataFrame de solo lectura que comparten todas las sesiones (ver `congelar`).
+
+    Las operaciones que devuelven un frame nuevo (filtros, agregados, `vista`)
+    entregan un DataFrame normal; las que cambiarían este objeto lanzan `ValueError`.
+    """
+
+    @property
+    def _constructor(self):
+        return pd.DataFrame
+
+    __setitem__ = __delitem__ = insert = isetitem = _solo_lectura
+    # Caminos internos de pandas: reemplazo de columnas (`.loc`, `.at`) y operaciones `inplace=True`
+    _iset_item_mgr = _update_inplace = _maybe_cache_changed = _solo_lectura
+
+    def __setattr__(self, nombre, valor):
+        # `_mgr` se reasigna al agregar filas con `.loc`; los nombres públicos son índice, columnas, `attrs`...
+        if nombre == '_mgr' or not nombre.startswith('_'):
+            raise ValueError(SOLO_LECTURA)
+        super().__setattr__(nombre, valor)
+
+    def _get_item_cache(self, columna):
+        # Cada lectura de columna es una Serie nueva: sin caché compartido entre hilos, y un cambio en
+        # sitio sobre la Serie (`df['x'].fillna(0, inplace=True)`) no puede llegar a las demás sesiones
+        return self._ixs(self.columns.get_loc(columna), axis=1)
+
+    def _consolidate_inplace(self):
+        # pandas une bloques en sitio antes de algunas lecturas; el frame compartido se lee sin consolidar
+        pass
+
+    def memory_usage(self, index=True, deep=False):
+        # pandas no mide objetos en arreglos de solo lectura: se suman aquí como en `deep=True`
+        uso = super().memory_usage(index=index, deep=False)
+        if deep:
+            for columna, tipo in self.dtypes.items():
+                if tipo == object:
+                    uso[columna] += sum(map(sys.getsizeof, self[columna].to_numpy()))
+            if index and self.index.dtype == object:
+                uso['Index'] = self.index.memory_usage(deep=True)
+        return uso
+
+    def __reduce__(self):
+        # Una copia serializada ya no es compartida: se deserializa como DataFrame normal
+        return pd.DataFrame(self).__reduce__()
+
+
+def congelar(df):
+    """Cartera compartida de solo lectura con las columnas de `df` (sin copiarlas).
+
+    Los arreglos de `df` quedan de solo lectura: `df` tampoco acepta escrituras en sitio.
+    """
+    compartida = CarteraCompartida(df)
+    for arreglo in _arreglos(compartida):
+        arreglo.flags.writeable = False
+    return compartida
+
+
+def esta_congelado(df):
+    return isinstance(df, CarteraCompartida) and not any(arreglo.flags.writeable for arreglo in _arreglos(df))
+
+
+def vista(df):
+    """Frame propio de la sesión que comparte las columnas de `df`; agregarle columnas no toca el original."""
+    return df.copy(deep=False)
+
+
+def huella(df):
+    return int(pd.util.hash_pandas_object(df, index=True).to_numpy().sum(dtype=np.uint64))
+
+
+def escrituras(df, numerica='saldo_capital', texto='banco'):
+    """Escrituras que ninguna página debe poder hacer sobre la cartera compartida, por nombre."""
+    fila = df.index[0]
+    return {
+        'valor numérico': lambda: operator.setitem(df[numerica].to_numpy(), 0, -1),
+        'valor de texto': lambda: operator.setitem(df[texto].to_numpy(), 0, '?'),
+        'celda con .loc': lambda: operator.setitem(df.loc, (fila, numerica), -1),
+        'celda con .at': lambda: operator.setitem(df.at, (fila, texto), '?'),
+        'fila nueva con .loc': lambda: operator.setitem(df.loc, '__nueva__', df.loc[fila]),
+        'columna nueva': lambda: operator.setitem(df, '__nueva__', 0),
+        'columna existente': lambda: operator.setitem(df, numerica, 0),
+        'borrar columna': lambda: operator.delitem(df, texto),
+        'drop inplace': lambda: df.drop(columns=[texto], inplace=True),
+        'sort_values inplace': lambda: df.sort_values(numerica, inplace=True),
+        'fillna inplace': lambda: df.fillna(0, inplace=True),
+        'fillna inplace en una columna': lambda: df[numerica].fillna(0, inplace=True),
+        'rename inplace': lambda: df.rename(columns={texto: '__otro__'}, inplace=True),
+        'cambiar índice': lambda: setattr(df, 'index', pd.RangeIndex(len(df))),
+    }
+
+
+def escrituras_aceptadas(df, **columnas):
+    """Nombres de las `escrituras` que no lanzaron `ValueError` (vacío si la cartera las rechaza todas)."""
+    aceptadas = []
+    for nombre, escribir in escrituras(df, **columnas).items():
+        try:
+            escribir()
+            aceptadas.append(nombre)
+        except ValueError:
+            pass
+    return aceptadas
+
+
+# --- Prueba de estrés ---
+
+def _rerun(df, rng):
+    """Lecturas típicas de una página: filtro por banco, agregados, top de saldos y una columna derivada."""
+    banco = rng.choice(df['banco'].unique())
+    por_banco = df[df['banco'] == banco]
+    v = vista(df)
+    v['saldo_millones'] = df['saldo_capital'] / 1e6
+    return {
+        'banco': banco,
+        'deudores': len(por_banco),
+        'tasa_pago': float(por_banco['pago'].mean()),
+        'por_departamento': df.groupby('departamento')['pago'].mean().head(5),
+        'top_saldos': df.nlargest(10, 'saldo_capital')[['identificacion', 'saldo_capital']],
+        'saldo_total_millones': float(v['saldo_millones'].sum()),
+    }
+
+
+def estres(df, sesiones=32, reruns=5, compartido=True, semilla=0):
+    """Simula `sesiones` sesiones concurrentes con `reruns` ejecuciones cada una sobre la misma cartera.
+
+    Con `compartido=False` cada rerun recibe una copia deserializada, como con
+    `st.cache_data`. Devuelve tiempos, memoria pico y retenida por sesión, y
+    verifica que la cartera compartida no cambió y que rechaza escrituras.
+    """
+    if compartido:
+        df = congelar(df)
+    antes = huella(df)
+    serializado = None if compartido else pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)
+    errores = []
+    barrera = threading.Barrier(sesiones)
+
+    def sesion(i):
+        rng = np.random.default_rng(semilla + i)
+        estado = []
+        barrera.wait()
+        try:
+            for _ in range(reruns):
+                datos = df if compartido else pickle.loads(serializado)
+                estado.append(_rerun(datos, rng))
+        except Exception as e:
+            errores.append(repr(e))
+        return estado
+
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sesiones) as ejecutor:
+        estados = list(ejecutor.map(sesion, range(sesiones)))
+    segundos = time.perf_counter() - inicio
+    retenida, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    aceptadas = escrituras_aceptadas(df) if compartido else None
+
+    return {
+        'modo': 'compartido' if compartido else 'copia por rerun',
+        'sesiones': sesiones,
+        'reruns': reruns,
+        'errores': errores,
+        'segundos': segundos,
+        'reruns_por_segundo': sesiones * reruns / segundos,
+        'memoria_cartera': int(df.memory_usage(deep=True).sum()),
+        'pico_por_sesion': (pico - base) / sesiones,
+        'retenida_por_sesion': (retenida - base) / sesiones,
+        'sin_cambios': huella(df) == antes and len(estados) == sesiones,
+        'escrituras_aceptadas': aceptadas,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de estrés de sesiones concurrentes sobre la cartera compartida.")
+    parser.add_argument('--datos', default=None, help="Archivo de cartera (por defecto PruebaDS.xlsx)")
+    parser.add_argument('--sesiones', type=int, default=32)
+    parser.add_argument('--reruns', type=int, default=5)
+    parser.add_argument('--comparar', action='store_true', help="Mide también el modo con copia por rerun (st.cache_data)")
+    args = parser.parse_args(argv)
+
+    from riesgo.limpieza import RUTA_DATOS, leer_cartera, limpiar_cartera
+    df = limpiar_cartera(leer_cartera(args.datos or RUTA_DATOS))
+
+    modos = [False, True] if args.comparar else [True]
+    fallo = False
+    for compartido in modos:
+        r = estres(df, args.sesiones, args.reruns, compartido=compartido)
+        print(f"{r['modo']}: {r['sesiones']} sesiones x {r['reruns']} reruns en {r['segundos']:.2f}s "
+              f"({r['reruns_por_segundo']:.0f} reruns/s); cartera {r['memoria_cartera'] / 2**20:.1f} MiB, "
+              f"por sesión pico {r['pico_por_sesion'] / 2**20:.2f} MiB y retenida {r['retenida_por_sesion'] / 2**10:.1f} KiB")
+        if r['errores']:
+            print(f"  ERRORES: {r['errores'][:3]}")
+        if not r['sin_cambios'] or r['escrituras_aceptadas']:
+            print(f"  ERROR: la cartera compartida fue modificada o aceptó escrituras: {r['escrituras_aceptadas']}")
+        fallo = fallo or bool(r['errores']) or not r['sin_cambios'] or bool(r['escrituras_aceptadas'])
+    if fallo:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
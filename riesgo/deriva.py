@@ -0,0 +1,182 @@
+"""Monitoreo de deriva de variables y scores entre cortes mensuales (`mes`).
+
+Cada mes se resume en un boceto: conteos por intervalo sobre bordes fijos por
+variable, más una casilla de nulos. PSI y KS se calculan entre bocetos, así que
+un mes nuevo solo requiere contar sus propias filas; el historial no se relee.
+
+    python -m riesgo.deriva --estado deriva.json --datos PruebaDS.xlsx
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+VARIABLES_DERIVA = [
+    'dias_mora', 'saldo_capital', 'meses_desde_ultimo_pago',
+    'contacto_mes_actual', 'contacto_mes_anterior', 'contacto_ultimos_6meses',
+    'duracion_llamadas_ultimos_6meses',
+]
+SCORES_DERIVA = ['probabilidad_pago_arbol', 'score_anomalia_autoencoder']
+
+# Convención usual de PSI: < 0.1 estable, 0.1-0.25 vigilar, > 0.25 deriva significativa
+UMBRAL_VIGILAR = 0.10
+UMBRAL_ALERTA = 0.25
+
+_EPS = 1e-4
+
+
+def definir_bordes(df, columnas, n_intervalos=10):
+    """Bordes por cuantiles de una muestra de referencia (se fijan una vez y se reutilizan)."""
+    bordes = {}
+    for col in columnas:
+        valores = df[col].to_numpy(dtype=np.float64)
+        valores = valores[~np.isnan(valores)]
+        if len(valores) == 0:
+            bordes[col] = []
+            continue
+        cuantiles = np.quantile(valores, np.linspace(0, 1, n_intervalos + 1)[1:-1])
+        bordes[col] = np.unique(np.concatenate([[valores.min()], cuantiles])).tolist()
+    return bordes
+
+
+def psi(referencia, actual):
+    """Population Stability Index entre dos vectores de conteos sobre los mismos intervalos."""
+    p = np.asarray(referencia, dtype=np.float64)
+    q = np.asarray(actual, dtype=np.float64)
+    if p.sum() == 0 or q.sum() == 0:
+        return np.nan
+    p = np.clip(p / p.sum(), _EPS, None)
+    q = np.clip(q / q.sum(), _EPS, None)
+    return float(np.sum((q - p) * np.log(q / p)))
+
+
+def ks(referencia, actual):
+    """KS entre las distribuciones no nulas, evaluado en los bordes (cota inferior del KS exacto)."""
+    p = np.asarray(referencia[:-1], dtype=np.float64)
+    q = np.asarray(actual[:-1], dtype=np.float64)
+    if p.sum() == 0 or q.sum() == 0:
+        return np.nan
+    return float(np.max(np.abs(np.cumsum(p) / p.sum() - np.cumsum(q) / q.sum())))
+
+
+class MonitorDeriva:
+    """Bocetos mensuales por variable y comparación entre meses.
+
+    `bocetos[mes][col]` tiene len(bordes[col]) + 2 conteos: un intervalo por
+    tramo entre bordes (con los extremos abiertos) y al final los nulos.
+    """
+
+    def __init__(self, bordes, bocetos=None):
+        self.bordes = {col: np.asarray(b, dtype=np.float64) for col, b in bordes.items()}
+        self.bocetos = bocetos or {}
+
+    def actualizar(self, df, col_mes='mes'):
+        """Suma los conteos de `df` a los bocetos de sus meses (un bincount por variable)."""
+        codigos, meses = pd.factorize(df[col_mes].astype(str), sort=True)
+        for col, bordes in self.bordes.items():
+            if col not in df.columns:
+                continue
+            valores = df[col].to_numpy(dtype=np.float64)
+            n_casillas = len(bordes) + 2
+            casilla = np.searchsorted(bordes, valores, side='right')
+            casilla[np.isnan(valores)] = n_casillas - 1
+            conteos = np.bincount(codigos * n_casillas + casilla, minlength=len(meses) * n_casillas).reshape(len(meses), n_casillas)
+            for i, mes in enumerate(meses):
+                actual = self.bocetos.setdefault(mes, {}).get(col)
+                self.bocetos[mes][col] = conteos[i] if actual is None else np.asarray(actual) + conteos[i]
+        return self
+
+    @property
+    def meses(self):
+        return sorted(self.bocetos)
+
+    def comparar(self, mes_referencia, mes_actual):
+        filas = []
+        for col in self.bordes:
+            ref = self.bocetos.get(mes_referencia, {}).get(col)
+            act = self.bocetos.get(mes_actual, {}).get(col)
+            if ref is None or act is None:
+                continue
+            filas.append({
+                'mes_referencia': mes_referencia, 'mes': mes_actual, 'variable': col,
+                'n': int(np.sum(act)), 'nulos': float(act[-1] / max(np.sum(act), 1)),
+                'psi': psi(ref, act), 'ks': ks(ref, act),
+            })
+        return filas
+
+    def reporte(self, referencia='anterior'):
+        """PSI/KS de cada mes contra el mes anterior (`'anterior'`), el primero (`'primero'`) o un mes dado."""
+        meses = self.meses
+        filas = []
+        for i, mes in enumerate(meses[1:], start=1):
+            if referencia == 'anterior':
+                mes_ref = meses[i - 1]
+            elif referencia == 'primero':
+                mes_ref = meses[0]
+            else:
+                mes_ref = referencia
+            if mes_ref != mes:
+                filas.extend(self.comparar(mes_ref, mes))
+
+        reporte = pd.DataFrame(filas, columns=['mes_referencia', 'mes', 'variable', 'n', 'nulos', 'psi', 'ks'])
+        reporte['estado'] = np.select(
+            [reporte['psi'] >= UMBRAL_ALERTA, reporte['psi'] >= UMBRAL_VIGILAR],
+            ['Alerta', 'Vigilar'], default='Estable'
+        )
+        return reporte
+
+    def a_dict(self):
+        return {
+            'bordes': {col: b.tolist() for col, b in self.bordes.items()},
+            'bocetos': {mes: {col: np.asarray(c).tolist() for col, c in cols.items()} for mes, cols in self.bocetos.items()},
+        }
+
+    @classmethod
+    def desde_dict(cls, datos):
+        bocetos = {mes: {col: np.asarray(c, dtype=np.int64) for col, c in cols.items()} for mes, cols in datos['bocetos'].items()}
+        return cls(datos['bordes'], bocetos)
+
+    def guardar(self, ruta):
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump(self.a_dict(), f)
+
+    @classmethod
+    def cargar(cls, ruta):
+        with open(ruta, encoding='utf-8') as f:
+            return cls.desde_dict(json.load(f))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Actualiza los bocetos de deriva con un archivo de cartera y reporta PSI/KS.")
+    parser.add_argument('--datos', default=None, help="Archivo de cartera (por defecto PruebaDS.xlsx)")
+    parser.add_argument('--estado', default='deriva.json', help="Bocetos acumulados de meses anteriores")
+    parser.add_argument('--scores', action='store_true', help="Puntuar la cartera e incluir la deriva de los scores")
+    args = parser.parse_args(argv)
+
+    from riesgo.limpieza import RUTA_DATOS, leer_cartera, limpiar_cartera
+    df = limpiar_cartera(leer_cartera(args.datos or RUTA_DATOS))
+    columnas = VARIABLES_DERIVA
+    if args.scores:
+        from riesgo.modelos import cargar_artefactos, puntuar_cartera
+        df = puntuar_cartera(df, cargar_artefactos())
+        columnas = VARIABLES_DERIVA + SCORES_DERIVA
+
+    if os.path.exists(args.estado):
+        monitor = MonitorDeriva.cargar(args.estado)
+        # Los meses ya resumidos no se vuelven a sumar
+        df = df[~df['mes'].astype(str).isin(monitor.bocetos)]
+    else:
+        monitor = MonitorDeriva(definir_bordes(df, columnas))
+
+    monitor.actualizar(df)
+    monitor.guardar(args.estado)
+
+    reporte = monitor.reporte()
+    print(reporte[reporte['estado'] != 'Estable'].to_string(index=False) if (reporte['estado'] != 'Estable').any()
+          else "Sin deriva significativa entre meses consecutivos.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,283 @@
+"""Entrenamiento offline de los artefactos de `modelos_riesgo_v1.pkl`.
+
+    python -m riesgo.entrenamiento --datos PruebaDS.xlsx --salida modelos_riesgo_v1.pkl
+    python -m riesgo.entrenamiento --datos salida/cartera_limpia.parquet
+
+Reconstruye `arbol`, `autoencoder`, `preprocessor`, `umbral_autoencoder` y
+`columnas_modelo` a partir de la cartera limpia.
+
+Con una cartera limpia en Parquet (la de `riesgo.fuera_de_memoria`) solo se
+cargan las columnas del modelo para el split, el preprocesador y el árbol; el
+autoencoder y su umbral leen el archivo por bloques de `tamano_bloque` filas
+en cada época, así que en esa etapa no hay más de un bloque transformado en
+memoria (más una máscara de un byte por fila para el split).
+"""
+import argparse
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from sklearn.compose import ColumnTransformer
+from sklearn.metrics import precision_recall_curve
+from sklearn.model_selection import GridSearchCV, StratifiedKFold, train_test_split
+from sklearn.neural_network import MLPRegressor
+from sklearn.preprocessing import MinMaxScaler, OneHotEncoder
+from sklearn.tree import DecisionTreeClassifier
+
+from riesgo.limpieza import RUTA_DATOS, leer_cartera, limpiar_cartera
+from riesgo.modelos import COLS_CATEGORICAS, COLS_NUMERICAS, RUTA_MODELOS, preparar_entrada
+from riesgo.paquete import exportar_paquete
+
+SEMILLA = 42
+
+PARAM_GRID = {
+    'max_depth': [3, 4, 5, 6],
+    'min_samples_leaf': [30, 50, 100],
+    'criterion': ['gini', 'entropy'],
+    'class_weight': ['balanced']  # Clave para el desbalance
+}
+
+CAPAS_AUTOENCODER = (64, 32, 4, 32, 64)
+COLUMNAS_ENTRENAMIENTO = COLS_NUMERICAS + COLS_CATEGORICAS + ['pago']
+
+
+def crear_preprocesador():
+    return ColumnTransformer(transformers=[
+        ('num', MinMaxScaler(), COLS_NUMERICAS),
+        ('cat', OneHotEncoder(handle_unknown='ignore'), COLS_CATEGORICAS),
+    ])
+
+
+def crear_autoencoder():
+    return MLPRegressor(
+        hidden_layer_sizes=CAPAS_AUTOENCODER,
+        activation='relu', solver='adam',
+        alpha=1e-7, batch_size=32, tol=1e-9,
+        n_iter_no_change=50, random_state=SEMILLA
+    )
+
+
+def preparar_matrices(df, test_size=0.2):
+    """Split estratificado y matrices preprocesadas, calculadas una sola vez."""
+    df_modelo = preparar_entrada(df)
+    columnas = COLS_NUMERICAS + COLS_CATEGORICAS
+    X_train, X_test, y_train, y_test = train_test_split(
+        df_modelo[columnas], df_modelo['pago'].to_numpy(),
+        test_size=test_size, stratify=df_modelo['pago'], random_state=SEMILLA
+    )
+
+    preprocessor = crear_preprocesador().fit(X_train)
+    X_train = np.ascontiguousarray(preprocessor.transform(X_train), dtype=np.float64)
+    X_test = np.ascontiguousarray(preprocessor.transform(X_test), dtype=np.float64)
+
+    return preprocessor, columnas, X_train, X_test, y_train, y_test
+
+
+def entrenar_arbol(X_train, y_train, n_jobs=-1, n_splits=5, param_grid=PARAM_GRID):
+    # El escalado MinMax no cambia los cortes de un árbol, así que preprocesar antes del CV
+    # no filtra información: todos los puntos de la grilla comparten la misma matriz y los
+    # mismos folds (joblib la pasa a los workers como memmap en vez de copiarla)
+    folds = list(StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=SEMILLA).split(X_train, y_train))
+
+    grid_search = GridSearchCV(
+        estimator=DecisionTreeClassifier(random_state=SEMILLA),
+        param_grid=param_grid, scoring='f1', cv=folds, n_jobs=n_jobs
+    )
+    grid_search.fit(X_train, y_train)
+    return grid_search.best_estimator_, grid_search
+
+
+def bloques_en_memoria(X, tamano_bloque=50_000):
+    """Bloques de una matriz ya cargada, en orden aleatorio (ver `entrenar_autoencoder`)."""
+    inicios = np.arange(0, len(X), tamano_bloque)
+
+    def bloques(rng):
+        for inicio in inicios[rng.permutation(len(inicios))]:
+            yield X[inicio:inicio + tamano_bloque]
+    return bloques
+
+
+def _leer_filas(archivo, filas, tamano_bloque, grupos):
+    """Bloques de las columnas del modelo con los filtros de `preparar_entrada`, solo de las `filas` marcadas.
+
+    `filas` es una máscara por posición en el archivo; el índice de cada bloque es esa posición.
+    """
+    inicios = np.cumsum([0] + [archivo.metadata.row_group(g).num_rows for g in range(archivo.num_row_groups)])
+    for grupo in grupos:
+        inicio = inicios[grupo]
+        for lote in archivo.iter_batches(batch_size=tamano_bloque, row_groups=[grupo], columns=COLUMNAS_ENTRENAMIENTO):
+            df = lote.to_pandas()
+            df.index = pd.RangeIndex(inicio, inicio + len(df))
+            inicio += len(df)
+            df = preparar_entrada(df)
+            df = df[filas[df.index.to_numpy()]]
+            if len(df):
+                yield df
+
+
+def bloques_parquet(ruta, preprocessor, filas, tamano_bloque=50_000):
+    """Bloques transformados de los No Pagadores de `filas`, leídos del Parquet en cada época.
+
+    Los row groups se recorren en orden aleatorio y cada uno en lotes de a lo
+    sumo `tamano_bloque` filas: en memoria hay un lote a la vez.
+    """
+    archivo = pq.ParquetFile(ruta)
+    columnas = COLS_NUMERICAS + COLS_CATEGORICAS
+
+    def bloques(rng):
+        for df in _leer_filas(archivo, filas, tamano_bloque, rng.permutation(archivo.num_row_groups)):
+            normales = df[df['pago'] == 0]
+            if len(normales):
+                yield np.ascontiguousarray(preprocessor.transform(normales[columnas]), dtype=np.float64)
+    return bloques
+
+
+def entrenar_autoencoder(bloques, epocas=200, verbose=True):
+    """Entrena el autoencoder por mini-lotes con `partial_fit` sobre los bloques de `bloques(rng)`.
+
+    `bloques` es una función que, en cada época, entrega los bloques de No
+    Pagadores en orden aleatorio (`bloques_en_memoria` o `bloques_parquet`).
+    Las filas de cada bloque se barajan; dentro de un bloque Adam usa
+    mini-lotes de `batch_size`. Se detiene si la pérdida no mejora en
+    `n_iter_no_change` épocas.
+    """
+    autoencoder = crear_autoencoder()
+    rng = np.random.default_rng(SEMILLA)
+
+    mejor_perdida, sin_mejora = np.inf, 0
+    for epoca in range(epocas):
+        suma, filas = 0.0, 0
+        for bloque in bloques(rng):
+            bloque = bloque[rng.permutation(len(bloque))]
+            autoencoder.partial_fit(bloque, bloque)
+            suma += autoencoder.loss_ * len(bloque)
+            filas += len(bloque)
+
+        perdida = suma / filas
+        if verbose:
+            print(f"Época {epoca + 1}: pérdida {perdida:.8f}")
+
+        if perdida < mejor_perdida - autoencoder.tol:
+            mejor_perdida, sin_mejora = perdida, 0
+        else:
+            sin_mejora += 1
+            if sin_mejora >= autoencoder.n_iter_no_change:
+                break
+
+    return autoencoder
+
+
+def error_reconstruccion(autoencoder, X):
+    return np.mean(np.power(X - autoencoder.predict(X), 2), axis=1)
+
+
+def umbral_optimo(y_true, mse):
+    """Punto de corte del error de reconstrucción que maximiza el F1 de los pagadores."""
+    precision, recall, thresholds = precision_recall_curve(y_true, mse)
+    numerator = 2 * recall * precision
+    denominator = recall + precision
+    f1_scores = np.divide(numerator, denominator, out=np.zeros_like(denominator), where=denominator != 0)
+    return float(thresholds[np.argmax(f1_scores[:-1])])
+
+
+def entrenar(df, n_jobs=-1, epocas=200, tamano_bloque=50_000, verbose=True):
+    """Entrena los cinco artefactos a partir de la cartera limpia."""
+    preprocessor, columnas, X_train, X_test, y_train, y_test = preparar_matrices(df)
+
+    inicio = time.perf_counter()
+    arbol, grid_search = entrenar_arbol(X_train, y_train, n_jobs=n_jobs)
+    if verbose:
+        print(f"Árbol: {grid_search.best_params_} F1-CV={grid_search.best_score_:.4f} ({time.perf_counter() - inicio:.1f}s)")
+
+    # El autoencoder aprende la "normalidad" solo con No Pagadores
+    inicio = time.perf_counter()
+    autoencoder = entrenar_autoencoder(bloques_en_memoria(X_train[y_train == 0], tamano_bloque), epocas=epocas,
+                                       verbose=verbose)
+    umbral = umbral_optimo(y_test, error_reconstruccion(autoencoder, X_test))
+    if verbose:
+        print(f"Autoencoder: umbral={umbral:.6f} ({time.perf_counter() - inicio:.1f}s)")
+
+    return {
+        "arbol": arbol,
+        "autoencoder": autoencoder,
+        "preprocessor": preprocessor,
+        "umbral_autoencoder": np.float64(umbral),
+        "columnas_modelo": columnas,
+    }
+
+
+def entrenar_desde_parquet(ruta, n_jobs=-1, epocas=200, tamano_bloque=50_000, test_size=0.2, verbose=True):
+    """Como `entrenar`, con la cartera limpia en Parquet y el autoencoder entrenado por bloques desde disco.
+
+    El split estratificado, el preprocesador y el árbol usan solo las columnas
+    del modelo; la matriz del árbol se libera antes del autoencoder, que con
+    el umbral lee el archivo bloque a bloque.
+    """
+    archivo = pq.ParquetFile(ruta)
+    df_modelo = preparar_entrada(archivo.read(columns=COLUMNAS_ENTRENAMIENTO).to_pandas().reset_index(drop=True))
+    columnas = COLS_NUMERICAS + COLS_CATEGORICAS
+    X_train, X_test, y_train, _ = train_test_split(
+        df_modelo[columnas], df_modelo['pago'].to_numpy(),
+        test_size=test_size, stratify=df_modelo['pago'], random_state=SEMILLA
+    )
+    entrenamiento = np.zeros(archivo.metadata.num_rows, dtype=bool)
+    entrenamiento[X_train.index.to_numpy()] = True
+    prueba = np.zeros(archivo.metadata.num_rows, dtype=bool)
+    prueba[X_test.index.to_numpy()] = True
+
+    preprocessor = crear_preprocesador().fit(X_train)
+    X_train = np.ascontiguousarray(preprocessor.transform(X_train), dtype=np.float64)
+    del df_modelo, X_test
+
+    inicio = time.perf_counter()
+    arbol, grid_search = entrenar_arbol(X_train, y_train, n_jobs=n_jobs)
+    if verbose:
+        print(f"Árbol: {grid_search.best_params_} F1-CV={grid_search.best_score_:.4f} ({time.perf_counter() - inicio:.1f}s)")
+    del X_train, y_train
+
+    inicio = time.perf_counter()
+    autoencoder = entrenar_autoencoder(bloques_parquet(ruta, preprocessor, entrenamiento, tamano_bloque),
+                                       epocas=epocas, verbose=verbose)
+    errores, etiquetas = [], []
+    for df in _leer_filas(archivo, prueba, tamano_bloque, range(archivo.num_row_groups)):
+        errores.append(error_reconstruccion(autoencoder, preprocessor.transform(df[columnas])))
+        etiquetas.append(df['pago'].to_numpy())
+    umbral = umbral_optimo(np.concatenate(etiquetas), np.concatenate(errores))
+    if verbose:
+        print(f"Autoencoder: umbral={umbral:.6f} ({time.perf_counter() - inicio:.1f}s)")
+
+    return {
+        "arbol": arbol,
+        "autoencoder": autoencoder,
+        "preprocessor": preprocessor,
+        "umbral_autoencoder": np.float64(umbral),
+        "columnas_modelo": columnas,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reentrena los modelos de riesgo a partir de la cartera.")
+    parser.add_argument('--datos', default=RUTA_DATOS, help="Cartera cruda (xlsx) o cartera limpia en Parquet")
+    parser.add_argument('--salida', default=RUTA_MODELOS)
+    parser.add_argument('--n-jobs', type=int, default=-1, help="Núcleos para el GridSearchCV (-1 = todos)")
+    parser.add_argument('--epocas', type=int, default=200)
+    parser.add_argument('--tamano-bloque', type=int, default=50_000, help="Filas por bloque de partial_fit del autoencoder")
+    args = parser.parse_args(argv)
+
+    if args.datos.endswith('.parquet'):
+        artefactos = entrenar_desde_parquet(args.datos, n_jobs=args.n_jobs, epocas=args.epocas,
+                                            tamano_bloque=args.tamano_bloque)
+    else:
+        df = limpiar_cartera(leer_cartera(args.datos))
+        artefactos = entrenar(df, n_jobs=args.n_jobs, epocas=args.epocas,
+                              tamano_bloque=args.tamano_bloque)
+    joblib.dump(artefactos, args.salida)
+    exportar_paquete(artefactos, os.path.splitext(args.salida)[0])
+    print(f"Artefactos guardados en {args.salida} y en el paquete {os.path.splitext(args.salida)[0]}/")
+
+
+if __name__ == '__main__':
+    main()
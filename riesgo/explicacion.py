@@ -0,0 +1,170 @@
+"""Códigos de razón por deudor, calculados en lote para toda la cartera.
+
+* Árbol: la ruta de cada fila se recorre nivel por nivel sobre los arreglos
+  compilados del árbol (igual que `Arbol.apply`). Cada nodo atribuye a su
+  variable el cambio de probabilidad de pago entre el nodo padre y el hijo,
+  así que `probabilidad_raiz + suma(aportes) == probabilidad_pago_arbol`.
+* Autoencoder: el MSE es el promedio de los errores al cuadrado por columna
+  transformada; el aporte de cada variable es su parte de ese promedio y la
+  suma de aportes es exactamente `score_anomalia_autoencoder`.
+
+Las columnas one-hot se agrupan en su variable de origen (`genero`, `rango_edad_probable`).
+Si el clasificador no es un árbol único (p. ej. el gradient boosting que puede
+elegir `riesgo.ajuste`), solo se calculan las razones de anomalía.
+"""
+import numpy as np
+
+from riesgo.paquete import MatrizOneHot, diferencia
+
+N_RAZONES = 3
+
+
+def columnas_transformadas(preprocessor):
+    """(variable de origen, etiqueta) de cada columna de la matriz transformada."""
+    if hasattr(preprocessor, 'numericas'):
+        # Preprocesador del paquete
+        bloques = [(None, preprocessor.numericas)] + [(col, cats) for col, cats in preprocessor.categoricas.items()]
+    else:
+        # ColumnTransformer de scikit-learn
+        bloques = []
+        for nombre, transformador, cols in preprocessor.transformers_:
+            if nombre == 'remainder':
+                continue
+            if hasattr(transformador, 'categories_'):
+                bloques.extend(zip(cols, transformador.categories_))
+            else:
+                bloques.append((None, cols))
+
+    columnas = []
+    for col, valores in bloques:
+        columnas.extend((v, v) if col is None else (col, str(v)) for v in valores)
+    return columnas
+
+
+def variables_origen(preprocessor):
+    """Variable original de cada columna de la matriz transformada."""
+    return [origen for origen, _ in columnas_transformadas(preprocessor)]
+
+
+def escala_numericas(preprocessor):
+    if hasattr(preprocessor, 'numericas'):
+        return preprocessor.min_, preprocessor.scale_
+    scaler = preprocessor.named_transformers_['num']
+    return scaler.min_, scaler.scale_
+
+
+def _agrupar(aportes, origen):
+    """Suma las columnas transformadas por variable de origen: (n, n_transformadas) -> (n, n_variables)."""
+    variables = list(dict.fromkeys(origen))
+    pertenencia = np.array([[v == variable for variable in variables] for v in origen], dtype=np.float64)
+    return variables, aportes @ pertenencia
+
+
+def _estructura_arbol(arbol):
+    """Arreglos del árbol (`tree_` de scikit-learn o el `Arbol` del paquete); None si `arbol` no es un árbol único."""
+    tree = getattr(arbol, 'tree_', arbol)
+    return tree if hasattr(tree, 'children_left') else None
+
+
+def es_arbol(arbol):
+    return _estructura_arbol(arbol) is not None
+
+
+def _probabilidad_nodos(arbol):
+    valor = np.asarray(arbol.value[:, 0, :], dtype=np.float64)
+    return valor[:, 1] / valor.sum(axis=1)
+
+
+def rutas_arbol(arbol, X):
+    """Nodos visitados por cada fila (n, profundidad + 1) y aportes por columna transformada.
+
+    `arbol` puede ser un `DecisionTreeClassifier` o el `Arbol` del paquete y `X`
+    densa o `MatrizOneHot`; las filas que llegan antes a una hoja repiten la hoja
+    en los niveles restantes.
+    """
+    tree = _estructura_arbol(arbol)
+    if tree is None:
+        raise TypeError(f"Las rutas requieren un árbol de decisión, no {type(arbol).__name__}")
+    comprimida = isinstance(X, MatrizOneHot)
+    if not comprimida:
+        X = np.asarray(X, dtype=np.float32)
+    p_nodo = _probabilidad_nodos(tree)
+    filas = np.arange(len(X))
+
+    nodos = np.zeros((len(X), tree.max_depth + 1), dtype=np.intp)
+    aportes = np.zeros(X.shape, dtype=np.float64)
+    nodo = nodos[:, 0]
+    for nivel in range(1, tree.max_depth + 1):
+        izquierdo = tree.children_left[nodo]
+        interno = izquierdo != -1
+        variable = np.where(interno, tree.feature[nodo], 0)
+        valor = X.valores(filas, variable, np.float32) if comprimida else X[filas, variable]
+        va_izquierda = valor <= tree.threshold[nodo]
+        hijo = np.where(interno, np.where(va_izquierda, izquierdo, tree.children_right[nodo]), nodo)
+        # Cada fila suma en una sola columna por nivel: el índice (fila, variable) no se repite
+        aportes[filas, variable] += np.where(interno, p_nodo[hijo] - p_nodo[nodo], 0.0)
+        nodos[:, nivel] = hijo
+        nodo = hijo
+    return nodos, aportes
+
+
+def aportes_autoencoder(X, reconstruccion):
+    """Parte del MSE atribuible a cada columna transformada."""
+    return np.power(diferencia(X, reconstruccion), 2) / X.shape[1]
+
+
+def _top(variables, aportes, k, por_magnitud):
+    clave = np.abs(aportes) if por_magnitud else aportes
+    orden = np.argsort(-clave, axis=1, kind='stable')[:, :k]
+    return np.asarray(variables, dtype=object)[orden], np.take_along_axis(aportes, orden, axis=1)
+
+
+def razones(X, reconstruccion, artefactos, k=N_RAZONES):
+    """Columnas `razon_pago_i`/`aporte_pago_i` y `razon_anomalia_i`/`aporte_anomalia_i` (i = 1..k).
+
+    Las razones de pago se ordenan por magnitud del aporte (positivo sube la
+    probabilidad, negativo la baja); las de anomalía por aporte al MSE. Sin un
+    árbol único no hay ruta que descomponer y se omiten las columnas de pago.
+    """
+    origen = variables_origen(artefactos["preprocessor"])
+    variables, anomalia = _agrupar(aportes_autoencoder(X, reconstruccion), origen)
+    modelos = [('anomalia', anomalia, False)]
+    if es_arbol(artefactos["arbol"]):
+        _, aportes_arbol = rutas_arbol(artefactos["arbol"], X)
+        modelos.insert(0, ('pago', _agrupar(aportes_arbol, origen)[1], True))
+
+    columnas = {}
+    for prefijo, aportes, por_magnitud in modelos:
+        nombres, valores = _top(variables, aportes, k, por_magnitud)
+        for i in range(min(k, len(variables))):
+            columnas[f'razon_{prefijo}_{i + 1}'] = nombres[:, i]
+            columnas[f'aporte_{prefijo}_{i + 1}'] = valores[:, i]
+    return columnas
+
+
+def describir_ruta(arbol, preprocessor, x):
+    """Condiciones de la ruta de una fila transformada, en unidades originales (para la ficha del deudor)."""
+    tree = _estructura_arbol(arbol)
+    if tree is None:
+        raise TypeError(f"Las rutas requieren un árbol de decisión, no {type(arbol).__name__}")
+    origen, etiquetas = zip(*columnas_transformadas(preprocessor))
+    min_, scale_ = escala_numericas(preprocessor)
+    n_numericas = len(min_)
+    p_nodo = _probabilidad_nodos(tree)
+
+    nodos, _ = rutas_arbol(arbol, np.asarray(x).reshape(1, -1))
+    pasos = []
+    for padre, hijo in zip(nodos[0, :-1], nodos[0, 1:]):
+        if padre == hijo:
+            break
+        j = tree.feature[padre]
+        izquierda = hijo == tree.children_left[padre]
+        if j < n_numericas:
+            corte = (tree.threshold[padre] - min_[j]) / scale_[j]
+            condicion = f"{origen[j]} {'≤' if izquierda else '>'} {corte:,.2f}"
+        else:
+            # One-hot: a la izquierda la categoría no aplica (valor 0)
+            condicion = f"{origen[j]} {'≠' if izquierda else '='} {etiquetas[j]}"
+        pasos.append({'condicion': condicion, 'probabilidad': p_nodo[hijo], 'aporte': p_nodo[hijo] - p_nodo[padre]})
+    return p_nodo[0], pasos
+
@@ -0,0 +1,126 @@
+import io
+
+import numpy as np
+
+# Columnas de la lista de llamadas ("Top Clientes" del dashboard)
+COLS_LLAMADAS = ['identificacion', 'saldo_capital', 'dias_mora', 'probabilidad_pago_arbol', 'score_anomalia_autoencoder']
+
+# Cortes de la matriz de valor: saldo significativo (>$2M) y el corte 0.5 del árbol
+UMBRAL_SALDO_ALTO = 2_000_000
+UMBRAL_PROBABILIDAD = 0.5
+
+TAMANO_BLOQUE = 50_000
+
+# Excel no admite más filas por hoja (incluye el encabezado)
+MAX_FILAS_XLSX = 1_048_576
+
+
+def _saldo_alto(df):
+    return df['saldo_capital'].to_numpy() > UMBRAL_SALDO_ALTO
+
+
+def _prob_alta(df):
+    return df['probabilidad_pago_arbol'].to_numpy() > UMBRAL_PROBABILIDAD
+
+
+SEGMENTOS = {
+    'Toda la cartera': lambda df: np.ones(len(df), dtype=bool),
+    'Golden Geese (Alto Saldo + Alta Probabilidad)': lambda df: _saldo_alto(df) & _prob_alta(df),
+    'Gestión Digital (Bajo Saldo + Alta Probabilidad)': lambda df: ~_saldo_alto(df) & _prob_alta(df),
+    'Investigación (Alto Saldo + Baja Probabilidad)': lambda df: _saldo_alto(df) & ~_prob_alta(df),
+    'Baja Prioridad (Bajo Saldo + Baja Probabilidad)': lambda df: ~_saldo_alto(df) & ~_prob_alta(df),
+}
+
+# formato -> (extensión, mime)
+FORMATOS = {
+    'CSV': ('csv', 'text/csv'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'Excel (xlsx)': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+
+def lista_llamadas(df_pred, segmento='Toda la cartera'):
+    """Filtra el segmento y ordena por probabilidad de pago (mayor primero)."""
+    if segmento not in SEGMENTOS:
+        raise ValueError(f"Segmento desconocido: {segmento}")
+
+    cols = [c for c in COLS_LLAMADAS if c in df_pred.columns]
+    lista = df_pred.loc[SEGMENTOS[segmento](df_pred), cols]
+    return lista.sort_values('probabilidad_pago_arbol', ascending=False, kind='stable')
+
+
+def _bloques(df, tamano_bloque):
+    for inicio in range(0, len(df), tamano_bloque):
+        yield df.iloc[inicio:inicio + tamano_bloque]
+
+
+def _vaciar(buffer):
+    # Entrega lo escrito hasta ahora y libera el buffer
+    datos = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return datos
+
+
+def _exportar_csv(df, tamano_bloque):
+    if df.empty:
+        yield df.to_csv(index=False).encode('utf-8')
+        return
+
+    for i, bloque in enumerate(_bloques(df, tamano_bloque)):
+        yield bloque.to_csv(index=False, header=(i == 0)).encode('utf-8')
+
+
+def _exportar_parquet(df, tamano_bloque):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    buffer = io.BytesIO()
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+
+    # Un row group por bloque: el archivo se puede leer por partes del otro lado
+    with pq.ParquetWriter(buffer, schema) as writer:
+        for bloque in _bloques(df, tamano_bloque):
+            writer.write_table(pa.Table.from_pandas(bloque, schema=schema, preserve_index=False))
+            yield _vaciar(buffer)
+
+    yield _vaciar(buffer)
+
+
+def _exportar_xlsx(df, tamano_bloque):
+    from openpyxl import Workbook
+
+    if len(df) + 1 > MAX_FILAS_XLSX:
+        raise ValueError(f"Excel admite máximo {MAX_FILAS_XLSX - 1:,} filas; use CSV o Parquet.")
+
+    # write_only escribe las filas a disco a medida que llegan, sin estilos ni celdas en memoria
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('llamadas')
+    ws.append(list(df.columns))
+    for bloque in _bloques(df, tamano_bloque):
+        for fila in bloque.itertuples(index=False, name=None):
+            ws.append(fila)
+
+    # El xlsx es un zip: solo se puede entregar una vez cerrado
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    buffer.seek(0)
+    while True:
+        datos = buffer.read(1024 * 1024)
+        if not datos:
+            break
+        yield datos
+
+
+_EXPORTADORES = {
+    'CSV': _exportar_csv,
+    'Parquet': _exportar_parquet,
+    'Excel (xlsx)': _exportar_xlsx,
+}
+
+
+def exportar_por_bloques(df, formato, tamano_bloque=TAMANO_BLOQUE):
+    """Generador de bytes del archivo exportado, escrito por bloques de filas."""
+    if formato not in _EXPORTADORES:
+        raise ValueError(f"Formato no soportado: {formato}")
+    return _EXPORTADORES[formato](df, tamano_bloque)
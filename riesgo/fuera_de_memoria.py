@@ -0,0 +1,291 @@
+"""Modo fuera de memoria: limpieza, deduplicación, agregados y puntuación sobre Parquet por bloques.
+
+La cartera nunca se carga completa; en memoria hay a lo sumo un bloque de
+`tamano_bloque` filas o una partición de la deduplicación.
+
+* Deduplicación: cada fila se envía a una de `n_particiones` particiones según
+  el hash de `COLS_DUPLICADOS` (filas duplicadas caen siempre en la misma). El
+  hash depende del dtype y un entero con nulos llega como float64 solo en los
+  bloques que tienen un nulo, así que la llave se convierte antes a un tipo fijo
+  por columna: float64 las numéricas del esquema Arrow y texto las demás.
+  Las particiones se escriben a disco y se deduplican una por una con la misma
+  regla de `limpiar_cartera`: gana la fecha de `antiguedad_deuda` más antigua
+  y, entre empates, la primera fila del archivo (`_fila`).
+* Normalización y puntuación son fila a fila y se aplican bloque por bloque.
+* Los agregados se calculan por bloque y se combinan sumando conteos y sumas.
+
+Los resultados son los mismos que los del camino en memoria salvo el orden de
+las filas; `verificar_equivalencia` lo comprueba comparando por índice original.
+
+    python -m riesgo.fuera_de_memoria cartera.parquet salida/ --tamano-bloque 100000
+    python -m riesgo.fuera_de_memoria --verificar
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from riesgo.limpieza import COLS_DUPLICADOS, asegurar_pago, normalizar_categorias
+
+TAMANO_BLOQUE = 100_000
+N_PARTICIONES = 16
+COL_FILA = '_fila'
+
+
+def leer_bloques(ruta, tamano_bloque=TAMANO_BLOQUE, columnas=None):
+    """Itera la cartera Parquet en DataFrames de a lo sumo `tamano_bloque` filas."""
+    archivo = pq.ParquetFile(ruta)
+    for lote in archivo.iter_batches(batch_size=tamano_bloque, columns=columnas):
+        yield lote.to_pandas()
+
+
+def guardar_parquet(df, ruta, tamano_bloque=TAMANO_BLOQUE, metadatos_pandas=True):
+    """Escribe un DataFrame en Parquet con un row group por bloque (para preparar la entrada).
+
+    Sin `metadatos_pandas` el archivo queda como lo escribiría otra herramienta:
+    un entero con nulos se lee como float64 en los bloques que tienen un nulo.
+    """
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    if not metadatos_pandas:
+        tabla = tabla.replace_schema_metadata(None)
+    pq.write_table(tabla, ruta, row_group_size=tamano_bloque)
+
+
+class EscritorParquet:
+    """ParquetWriter que fija el esquema con el primer bloque y convierte los siguientes a ese esquema."""
+
+    def __init__(self, ruta, esquema=None):
+        self.ruta = ruta
+        self.esquema = esquema
+        self._escritor = None
+        self.filas = 0
+
+    def escribir(self, df):
+        if self._escritor is None:
+            self.esquema = _esquema(df, self.esquema)
+            self._escritor = pq.ParquetWriter(self.ruta, self.esquema)
+        self._escritor.write_table(pa.Table.from_pandas(df, schema=self.esquema, preserve_index=False))
+        self.filas += len(df)
+
+    def cerrar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+
+
+def _esquema(df, base=None):
+    """Esquema del bloque, tomando de `base` los tipos de las columnas que ya conoce.
+
+    Una columna que en el primer bloque viene toda vacía se infiere como `null`;
+    se guarda como texto para que los bloques siguientes puedan traer valores.
+    """
+    inferido = pa.Schema.from_pandas(df, preserve_index=False)
+    campos = []
+    for campo in inferido:
+        if base is not None and campo.name in base.names:
+            campo = base.field(campo.name)
+        elif pa.types.is_null(campo.type):
+            campo = pa.field(campo.name, pa.string())
+        campos.append(campo)
+    return pa.schema(campos)
+
+
+def _es_numerico(tipo):
+    return pa.types.is_integer(tipo) or pa.types.is_floating(tipo) or pa.types.is_boolean(tipo) or pa.types.is_decimal(tipo)
+
+
+def llave_particion(bloque, cols, esquema):
+    """Columnas de la llave con el mismo dtype en todos los bloques (5 y 5.0 deben dar el mismo hash)."""
+    llave = {}
+    for col in cols:
+        if _es_numerico(esquema.field(col).type):
+            llave[col] = pd.to_numeric(bloque[col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            llave[col] = bloque[col].astype(object).to_numpy()
+    return pd.DataFrame(llave)
+
+
+def particionar(ruta, directorio, n_particiones=N_PARTICIONES, tamano_bloque=TAMANO_BLOQUE):
+    """Reparte las filas en particiones por hash de la llave de duplicados; devuelve las rutas no vacías."""
+    esquema = pq.ParquetFile(ruta).schema_arrow
+    base = esquema.append(pa.field(COL_FILA, pa.int64()))
+    escritores = [EscritorParquet(os.path.join(directorio, f'particion_{i:03d}.parquet'), base) for i in range(n_particiones)]
+    inicio = 0
+    try:
+        for bloque in leer_bloques(ruta, tamano_bloque):
+            bloque = asegurar_pago(bloque)
+            bloque[COL_FILA] = np.arange(inicio, inicio + len(bloque), dtype=np.int64)
+            inicio += len(bloque)
+
+            cols = [c for c in COLS_DUPLICADOS if c in bloque.columns]
+            particion = pd.util.hash_pandas_object(llave_particion(bloque, cols, esquema), index=False).to_numpy() % n_particiones
+            for i in np.unique(particion):
+                escritores[i].escribir(bloque[particion == i])
+    finally:
+        for escritor in escritores:
+            escritor.cerrar()
+    return [e.ruta for e in escritores if e.filas]
+
+
+def deduplicar_particion(df):
+    """Misma regla que `limpiar_cartera` dentro de una partición (orden estable por fecha y fila original)."""
+    df = df.sort_values(by=['antiguedad_deuda', COL_FILA], na_position='last', kind='stable')
+    cols = [c for c in COLS_DUPLICADOS if c in df.columns]
+    return df.drop_duplicates(subset=cols, keep='first')
+
+
+def limpiar_por_bloques(ruta, salida, n_particiones=N_PARTICIONES, tamano_bloque=TAMANO_BLOQUE, directorio_temporal=None):
+    """Cartera limpia en `salida` (Parquet). Conserva `_fila`, la posición en el archivo original."""
+    temporal = tempfile.mkdtemp(prefix='dedup_', dir=directorio_temporal)
+    escritor = EscritorParquet(salida)
+    try:
+        for ruta_particion in particionar(ruta, temporal, n_particiones, tamano_bloque):
+            escritor.escribir(normalizar_categorias(deduplicar_particion(pd.read_parquet(ruta_particion))))
+            # La partición ya no hace falta: se libera el disco a medida que avanza
+            os.remove(ruta_particion)
+    finally:
+        escritor.cerrar()
+        shutil.rmtree(temporal, ignore_errors=True)
+    return escritor.filas
+
+
+def puntuar_por_bloques(ruta, salida, artefactos, tamano_bloque=TAMANO_BLOQUE, con_razones=True):
+    """Aplica `puntuar_cartera` bloque por bloque y escribe la cartera puntuada."""
+    from riesgo.modelos import puntuar_cartera
+
+    escritor = EscritorParquet(salida)
+    try:
+        for bloque in leer_bloques(ruta, tamano_bloque):
+            puntuado = puntuar_cartera(bloque, artefactos, con_razones=con_razones)
+            if len(puntuado):
+                escritor.escribir(puntuado)
+    finally:
+        escritor.cerrar()
+    return escritor.filas
+
+
+def agregar_por_bloques(ruta, por, columnas, tamano_bloque=TAMANO_BLOQUE):
+    """Conteo, suma y media de `columnas` por grupo, combinando agregados parciales de cada bloque."""
+    por = [por] if isinstance(por, str) else list(por)
+    parciales = []
+    for bloque in leer_bloques(ruta, tamano_bloque, columnas=por + list(columnas)):
+        grupos = bloque.groupby(por, dropna=False)
+        parcial = grupos[list(columnas)].agg(['sum', 'count'])
+        parcial[('filas', 'n')] = grupos.size()
+        parciales.append(parcial)
+
+    total = pd.concat(parciales).groupby(level=list(range(len(por))), dropna=False).sum()
+    resultado = pd.DataFrame({'filas': total[('filas', 'n')]})
+    for col in columnas:
+        resultado[f'suma_{col}'] = total[(col, 'sum')]
+        resultado[f'media_{col}'] = total[(col, 'sum')] / total[(col, 'count')]
+    resultado.index.names = por
+    return resultado
+
+
+def procesar(ruta, directorio, artefactos=None, tamano_bloque=TAMANO_BLOQUE, n_particiones=N_PARTICIONES):
+    """Limpia y puntúa una cartera Parquet; devuelve las rutas de salida."""
+    os.makedirs(directorio, exist_ok=True)
+    limpia = os.path.join(directorio, 'cartera_limpia.parquet')
+    puntuada = os.path.join(directorio, 'cartera_puntuada.parquet')
+
+    limpiar_por_bloques(ruta, limpia, n_particiones, tamano_bloque, directorio_temporal=directorio)
+    if artefactos is None:
+        from riesgo.modelos import cargar_artefactos
+        artefactos = cargar_artefactos()
+    puntuar_por_bloques(limpia, puntuada, artefactos, tamano_bloque)
+    return {'limpia': limpia, 'puntuada': puntuada}
+
+
+def _por_fila(df):
+    """Ordena por la fila original; los nulos de texto que Parquet devuelve como None se comparan como NaN."""
+    df = df.set_index(COL_FILA).sort_index().rename_axis(None)
+    texto = df.select_dtypes(include='object').columns
+    df[texto] = df[texto].where(df[texto].notna(), np.nan)
+    return df
+
+
+# Caso de `verificar_equivalencia`: columna de la llave de duplicados convertida a entero nulable
+COL_ENTERO_NULABLE = 'contacto_mes_anterior'
+
+
+def verificar_equivalencia(df, tamano_bloque=5_000, n_particiones=7, artefactos=None):
+    """Compara el camino en memoria con el modo por bloques sobre `df`; lanza AssertionError si difieren.
+
+    Los bloques y particiones por defecto son pequeños a propósito, para que
+    la cartera de prueba se reparta en muchos bloques. Además del archivo tal
+    cual, prueba `COL_ENTERO_NULABLE` como entero con un nulo cada dos bloques,
+    escrito sin metadatos de pandas: unos bloques la leen como float64 y otros
+    como int64, y los duplicados deben caer igual en la misma partición.
+    """
+    from riesgo.modelos import cargar_artefactos
+
+    artefactos = artefactos if artefactos is not None else cargar_artefactos()
+    df = df.reset_index(drop=True)
+    resultado = _comparar(df, tamano_bloque, n_particiones, artefactos)
+
+    if COL_ENTERO_NULABLE in df.columns:
+        caso = df.copy()
+        caso[COL_ENTERO_NULABLE] = caso[COL_ENTERO_NULABLE].astype('Int64')
+        caso.loc[caso.index[::2 * tamano_bloque], COL_ENTERO_NULABLE] = pd.NA
+        resultado['limpia_entero_nulable'] = _comparar(caso, tamano_bloque, n_particiones, artefactos,
+                                                       metadatos_pandas=False)['limpia']
+    return resultado
+
+
+def _comparar(df, tamano_bloque, n_particiones, artefactos, metadatos_pandas=True):
+    from riesgo.limpieza import limpiar_cartera
+    from riesgo.modelos import puntuar_cartera
+
+    with tempfile.TemporaryDirectory() as directorio:
+        entrada = os.path.join(directorio, 'cartera.parquet')
+        guardar_parquet(df, entrada, tamano_bloque, metadatos_pandas)
+        rutas = procesar(entrada, directorio, artefactos, tamano_bloque, n_particiones)
+
+        esperado_limpia = limpiar_cartera(asegurar_pago(df)).sort_index()
+        obtenido_limpia = _por_fila(pd.read_parquet(rutas['limpia']))
+        pd.testing.assert_frame_equal(obtenido_limpia, esperado_limpia, check_dtype=False)
+
+        esperado_puntuada = puntuar_cartera(esperado_limpia, artefactos).sort_index()
+        obtenido_puntuada = _por_fila(pd.read_parquet(rutas['puntuada']))
+        pd.testing.assert_frame_equal(obtenido_puntuada, esperado_puntuada, check_dtype=False)
+
+        esperado_banco = esperado_limpia.groupby('banco')[['pago', 'saldo_capital']].agg(['sum', 'mean'])
+        obtenido_banco = agregar_por_bloques(rutas['limpia'], 'banco', ['pago', 'saldo_capital'], tamano_bloque)
+        for col in ['pago', 'saldo_capital']:
+            np.testing.assert_allclose(obtenido_banco[f'suma_{col}'], esperado_banco[(col, 'sum')])
+            np.testing.assert_allclose(obtenido_banco[f'media_{col}'], esperado_banco[(col, 'mean')])
+
+    return {'filas': len(df), 'limpia': len(esperado_limpia), 'puntuada': len(esperado_puntuada)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Limpia y puntúa una cartera Parquet por bloques, sin cargarla completa.")
+    parser.add_argument('entrada', nargs='?', help="Cartera en Parquet")
+    parser.add_argument('salida', nargs='?', help="Directorio de salida")
+    parser.add_argument('--tamano-bloque', type=int, default=TAMANO_BLOQUE)
+    parser.add_argument('--particiones', type=int, default=N_PARTICIONES)
+    parser.add_argument('--verificar', action='store_true',
+                        help="Compara el modo por bloques con el camino en memoria sobre PruebaDS.xlsx")
+    args = parser.parse_args(argv)
+
+    if args.verificar:
+        from riesgo.limpieza import leer_cartera
+        resultado = verificar_equivalencia(leer_cartera())
+        print(f"OK: {resultado['filas']:,} filas -> {resultado['limpia']:,} limpias -> {resultado['puntuada']:,} puntuadas, "
+              f"iguales al camino en memoria (también con {COL_ENTERO_NULABLE} como entero nulable: "
+              f"{resultado['limpia_entero_nulable']:,} limpias).")
+        return
+
+    if not args.entrada or not args.salida:
+        parser.error("Se requieren 'entrada' y 'salida' (o --verificar)")
+    rutas = procesar(args.entrada, args.salida, tamano_bloque=args.tamano_bloque, n_particiones=args.particiones)
+    print(f"Cartera limpia: {rutas['limpia']}\nCartera puntuada: {rutas['puntuada']}")
+
+
+if __name__ == '__main__':
+    main()
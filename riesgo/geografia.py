@@ -0,0 +1,229 @@
+"""Recuperación por departamento: agregados precalculados con filtros cruzados.
+
+`agregar` reduce la cartera puntuada a sumas aditivas por (mes, banco,
+departamento, rango de edad): deudores, pagos, saldo, suma de la probabilidad
+del árbol y alertas del autoencoder. La tabla (unas miles de filas) se guarda
+en el almacén particionado por `mes` y `banco` como `departamentos`.
+
+`AgregadosDepartamento` la carga en un cubo numpy (métrica × departamento ×
+banco × rango de edad × mes); cada consulta con filtros de banco, edad o mes
+suma celdas del cubo, sin volver a recorrer deudores. Las tasas y medias se
+calculan al final a partir de las sumas.
+
+`coropleta` entrega una fila por departamento con su código DANE (todos los
+departamentos, aunque no tengan deudores) y `a_geojson` copia esas métricas
+a las propiedades de un GeoJSON de departamentos de Colombia:
+
+    python -m riesgo.geografia --banco bbva --salida coropleta.csv
+    python -m riesgo.geografia --geojson colombia.geo.json --salida departamentos.geo.json
+"""
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+
+from riesgo.almacen import RUTA_ALMACEN, existe, guardar_tabla, leer_tabla
+
+TABLA_AGREGADOS = 'departamentos'
+SIN_DEPARTAMENTO = 'No especificado'
+LLAVES = ['departamento', 'banco', 'rango_edad_probable', 'mes']
+SUMAS = ['deudores', 'pagos', 'saldo_total', 'suma_probabilidad', 'anomalias']
+
+# Códigos DANE de los departamentos, con los nombres que usa la cartera
+CODIGOS_DANE = {
+    'ANTIOQUIA': '05', 'ATLANTICO': '08', 'BOGOTA DC': '11', 'BOLIVAR': '13', 'BOYACA': '15', 'CALDAS': '17',
+    'CAQUETA': '18', 'CAUCA': '19', 'CESAR': '20', 'CORDOBA': '23', 'CUNDINAMARCA': '25', 'CHOCO': '27',
+    'HUILA': '41', 'LA GUAJIRA': '44', 'MAGDALENA': '47', 'META': '50', 'NARINO': '52', 'NORTE DE SANTANDER': '54',
+    'QUINDIO': '63', 'RISARALDA': '66', 'SANTANDER': '68', 'SUCRE': '70', 'TOLIMA': '73', 'VALLE DEL CAUCA': '76',
+    'ARAUCA': '81', 'CASANARE': '85', 'PUTUMAYO': '86', 'SAN ANDRES': '88', 'AMAZONAS': '91', 'GUAINIA': '94',
+    'GUAVIARE': '95', 'VAUPES': '97', 'VICHADA': '99',
+}
+
+
+def agregar(df_pred):
+    """Sumas aditivas por (departamento, banco, rango de edad, mes) de la cartera puntuada."""
+    llaves = pd.DataFrame({
+        'departamento': df_pred['departamento'].fillna(SIN_DEPARTAMENTO).to_numpy(),
+        'banco': df_pred['banco'].to_numpy(),
+        'rango_edad_probable': df_pred['rango_edad_probable'].fillna('No especificado').to_numpy(),
+        'mes': df_pred['mes'].to_numpy(),
+    })
+    valores = pd.DataFrame({
+        'pagos': df_pred['pago'].to_numpy(dtype=np.int64),
+        'saldo_total': df_pred['saldo_capital'].to_numpy(dtype=np.float64),
+        'suma_probabilidad': df_pred['probabilidad_pago_arbol'].to_numpy(dtype=np.float64),
+        'anomalias': df_pred['alerta_anomalia'].to_numpy(dtype=np.int64),
+    })
+    agregados = (
+        pd.concat([llaves, valores], axis=1)
+        .groupby(LLAVES, sort=True)
+        .agg(deudores=('pagos', 'size'), pagos=('pagos', 'sum'), saldo_total=('saldo_total', 'sum'),
+             suma_probabilidad=('suma_probabilidad', 'sum'), anomalias=('anomalias', 'sum'))
+    )
+    return agregados.reset_index()
+
+
+def guardar_agregados(df_pred, directorio=RUTA_ALMACEN):
+    """Reemplaza la tabla de agregados completa: los meses o bancos que ya no están en `df_pred` no quedan sumados."""
+    guardar_tabla(agregar(df_pred), TABLA_AGREGADOS, directorio)
+
+
+def _metricas(sumas, indice):
+    """Tasas y medias a partir de las sumas (NaN donde no hay deudores)."""
+    deudores, pagos, saldo, probabilidad, anomalias = sumas
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return pd.DataFrame({
+            'deudores': deudores.astype(np.int64),
+            'pagos': pagos.astype(np.int64),
+            'tasa_pago': pagos / deudores,
+            'saldo_total': saldo,
+            'saldo_medio': saldo / deudores,
+            'probabilidad_media': probabilidad / deudores,
+            'anomalias': anomalias.astype(np.int64),
+            'tasa_anomalias': anomalias / deudores,
+        }, index=indice)
+
+
+class AgregadosDepartamento:
+    """Cubo de sumas por departamento, banco, rango de edad y mes."""
+
+    def __init__(self, agregados):
+        self.ejes = {}
+        codigos = []
+        for llave in LLAVES:
+            codigo, valores = pd.factorize(agregados[llave], sort=True)
+            self.ejes[llave] = list(valores)
+            codigos.append(codigo)
+        forma = tuple(len(self.ejes[llave]) for llave in LLAVES)
+        celda = np.ravel_multi_index(codigos, forma) if len(agregados) else np.zeros(0, dtype=np.int64)
+        self.cubo = np.stack([
+            np.bincount(celda, weights=agregados[suma].to_numpy(dtype=np.float64), minlength=int(np.prod(forma))).reshape(forma)
+            for suma in SUMAS
+        ])
+
+    @classmethod
+    def desde_cartera(cls, df_pred):
+        return cls(agregar(df_pred))
+
+    @classmethod
+    def desde_almacen(cls, directorio=RUTA_ALMACEN):
+        return cls(leer_tabla(TABLA_AGREGADOS, directorio=directorio))
+
+    @property
+    def departamentos(self):
+        return self.ejes['departamento']
+
+    @property
+    def bancos(self):
+        return self.ejes['banco']
+
+    @property
+    def rangos_edad(self):
+        return self.ejes['rango_edad_probable']
+
+    @property
+    def meses(self):
+        return self.ejes['mes']
+
+    def _posiciones(self, llave, seleccion):
+        if not seleccion:
+            return np.arange(len(self.ejes[llave]))
+        seleccion = set(seleccion)
+        return np.array([i for i, valor in enumerate(self.ejes[llave]) if valor in seleccion], dtype=np.int64)
+
+    def _filtrar(self, bancos=None, rangos_edad=None, meses=None):
+        """Sumas × departamento × banco con los filtros de edad y mes aplicados (vacío = todos)."""
+        cubo = self.cubo[:, :, self._posiciones('banco', bancos)]
+        cubo = cubo[:, :, :, self._posiciones('rango_edad_probable', rangos_edad)]
+        cubo = cubo[:, :, :, :, self._posiciones('mes', meses)]
+        return cubo.sum(axis=(3, 4))
+
+    def resumen(self, bancos=None, rangos_edad=None, meses=None):
+        """Una fila por departamento con deudores, tasa de pago, saldo, probabilidad media y anomalías."""
+        sumas = self._filtrar(bancos, rangos_edad, meses).sum(axis=2)
+        tabla = _metricas(sumas, pd.Index(self.departamentos, name='departamento'))
+        return tabla[tabla['deudores'] > 0].sort_values('deudores', ascending=False, kind='stable')
+
+    def cruce(self, metrica='tasa_pago', bancos=None, rangos_edad=None, meses=None):
+        """Departamento × banco para una métrica de `resumen` (NaN donde no hay deudores)."""
+        posiciones = self._posiciones('banco', bancos)
+        sumas = self._filtrar(bancos, rangos_edad, meses)
+        tabla = pd.DataFrame(
+            {self.bancos[p]: _metricas(sumas[:, :, j], self.departamentos)[metrica] for j, p in enumerate(posiciones)}
+        )
+        tabla.index.name = 'departamento'
+        tabla.columns.name = 'banco'
+        deudores = sumas[0].sum(axis=1)
+        return tabla[deudores > 0]
+
+    def coropleta(self, bancos=None, rangos_edad=None, meses=None):
+        """Una fila por departamento DANE (con o sin deudores) lista para unir a un mapa por `codigo_dane`."""
+        resumen = self.resumen(bancos, rangos_edad, meses)
+        tabla = resumen.reindex(list(CODIGOS_DANE))
+        tabla[['deudores', 'pagos', 'anomalias']] = tabla[['deudores', 'pagos', 'anomalias']].fillna(0).astype(np.int64)
+        tabla['saldo_total'] = tabla['saldo_total'].fillna(0.0)
+        tabla.insert(0, 'codigo_dane', [CODIGOS_DANE[d] for d in tabla.index])
+        tabla.index.name = 'departamento'
+        return tabla.reset_index().sort_values('codigo_dane', kind='stable').reset_index(drop=True)
+
+    def sin_ubicacion(self, bancos=None, rangos_edad=None, meses=None):
+        """Deudores que no entran al mapa: sin departamento o con un nombre que no está en `CODIGOS_DANE`."""
+        resumen = self.resumen(bancos, rangos_edad, meses)
+        return resumen[~resumen.index.isin(list(CODIGOS_DANE))]
+
+
+def a_geojson(geojson, coropleta, propiedad='DPTO'):
+    """Copia de `geojson` con las métricas de `coropleta` en las propiedades de cada departamento.
+
+    `propiedad` es la propiedad del GeoJSON que guarda el código DANE
+    (`DPTO` en el mapa de departamentos más usado; `DPTO_CCDGO` en el del DANE).
+    """
+    # to_json deja los NaN (departamentos sin deudores) como null
+    por_codigo = {fila['codigo_dane']: fila for fila in json.loads(coropleta.to_json(orient='records'))}
+    salida = dict(geojson)
+    salida['features'] = []
+    for feature in geojson['features']:
+        codigo = str(feature['properties'].get(propiedad, '')).zfill(2)
+        propiedades = dict(feature['properties'])
+        propiedades.update(por_codigo.get(codigo, {}))
+        salida['features'].append({**feature, 'properties': propiedades})
+    return salida
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recuperación por departamento desde el almacén de agregados.")
+    parser.add_argument('--directorio', default=RUTA_ALMACEN)
+    parser.add_argument('--banco', action='append', default=[], help="Filtra por banco (repetible)")
+    parser.add_argument('--rango-edad', action='append', default=[], help="Filtra por rango de edad (repetible)")
+    parser.add_argument('--mes', action='append', default=[], help="Filtra por mes AAAA-MM (repetible)")
+    parser.add_argument('--geojson', default=None, help="GeoJSON de departamentos al que se le agregan las métricas")
+    parser.add_argument('--propiedad', default='DPTO', help="Propiedad del GeoJSON con el código DANE")
+    parser.add_argument('--salida', default=None, help="CSV de la coropleta, o GeoJSON si se pasa --geojson")
+    parser.add_argument('--reconstruir', action='store_true', help="Recalcula los agregados desde la tabla puntuada")
+    args = parser.parse_args(argv)
+
+    if args.reconstruir or not existe(TABLA_AGREGADOS, args.directorio):
+        if not existe('puntuada', args.directorio):
+            raise SystemExit(f"No hay cartera puntuada en {args.directorio}: ejecute antes python -m riesgo.almacen")
+        guardar_agregados(leer_tabla('puntuada', columnas=['mes', 'banco', 'departamento', 'rango_edad_probable', 'pago',
+                                                           'saldo_capital', 'probabilidad_pago_arbol', 'alerta_anomalia'],
+                                     directorio=args.directorio), args.directorio)
+
+    agregados = AgregadosDepartamento.desde_almacen(args.directorio)
+    filtros = {'bancos': args.banco, 'rangos_edad': args.rango_edad, 'meses': args.mes}
+    coropleta = agregados.coropleta(**filtros)
+    print(agregados.resumen(**filtros).to_string())
+
+    if args.geojson:
+        with open(args.geojson, encoding='utf-8') as f:
+            salida = a_geojson(json.load(f), coropleta, args.propiedad)
+        if args.salida:
+            with open(args.salida, 'w', encoding='utf-8') as f:
+                json.dump(salida, f, ensure_ascii=False)
+    elif args.salida:
+        coropleta.to_csv(args.salida, index=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+import numpy as np
+
+
+class GrillaPaginada:
+    """Vista paginada de un DataFrame con orden y filtros resueltos en el servidor.
+
+    Los índices se calculan una sola vez al construir la grilla; cada página
+    solo toca las filas filtradas y entrega `tamano` filas.
+    """
+
+    def __init__(self, df, columnas_orden=(), columnas_filtro=()):
+        self.df = df
+        self.columnas_orden = [c for c in columnas_orden if c in df.columns]
+        self.columnas_filtro = [c for c in columnas_filtro if c in df.columns]
+
+        # orden: posiciones de las filas ordenadas (nulos al final); rango: posición de cada fila en ese orden
+        self._orden = {}
+        self._rango = {}
+        self._nulos = {}
+        for col in self.columnas_orden:
+            rango = df[col].rank(method='first', na_option='bottom').to_numpy(dtype=np.int64) - 1
+            orden = np.empty_like(rango)
+            orden[rango] = np.arange(len(rango))
+            self._orden[col] = orden
+            self._rango[col] = rango
+            self._nulos[col] = int(df[col].isna().sum())
+
+        # valor -> posiciones (ordenadas) de las filas con ese valor
+        self._grupos = {col: df.groupby(col, sort=True, observed=True).indices for col in self.columnas_filtro}
+
+    def __len__(self):
+        return len(self.df)
+
+    def valores(self, col):
+        return list(self._grupos[col])
+
+    def _orden_columna(self, col, ascendente):
+        orden = self._orden[col]
+        if ascendente:
+            return orden
+        # Descendente conservando los nulos al final
+        n_validos = len(orden) - self._nulos[col]
+        return np.concatenate([orden[:n_validos][::-1], orden[n_validos:]])
+
+    def _seleccion(self, filtros):
+        """Posiciones (ordenadas) que cumplen todos los filtros, o None si no hay filtros."""
+        seleccion = None
+        for col, valor in (filtros or {}).items():
+            if col in self._grupos:
+                valores = valor if isinstance(valor, (list, tuple, set)) else [valor]
+                partes = [self._grupos[col][v] for v in valores if v in self._grupos[col]]
+                posiciones = np.unique(np.concatenate(partes)) if partes else np.empty(0, dtype=np.int64)
+            elif col in self._orden:
+                # Rango [minimo, maximo] sobre una columna ordenable
+                minimo, maximo = valor
+                orden = self._orden[col]
+                ordenados = self.df[col].to_numpy()[orden[:len(orden) - self._nulos[col]]]
+                inicio = np.searchsorted(ordenados, minimo, side='left') if minimo is not None else 0
+                fin = np.searchsorted(ordenados, maximo, side='right') if maximo is not None else len(ordenados)
+                posiciones = np.sort(orden[inicio:fin])
+            else:
+                raise ValueError(f"La columna '{col}' no está indexada para filtrar")
+
+            seleccion = posiciones if seleccion is None else np.intersect1d(seleccion, posiciones, assume_unique=True)
+        return seleccion
+
+    def total(self, filtros=None):
+        seleccion = self._seleccion(filtros)
+        return len(self.df) if seleccion is None else len(seleccion)
+
+    def pagina(self, numero, tamano=50, orden=None, ascendente=True, filtros=None):
+        """Devuelve (filas de la página `numero` (desde 0), total de filas filtradas)."""
+        if orden is not None and orden not in self._orden:
+            raise ValueError(f"La columna '{orden}' no está indexada para ordenar")
+
+        seleccion = self._seleccion(filtros)
+        inicio = numero * tamano
+
+        if seleccion is None:
+            total = len(self.df)
+            if orden is None:
+                posiciones = np.arange(inicio, min(inicio + tamano, total))
+            else:
+                posiciones = self._orden_columna(orden, ascendente)[inicio:inicio + tamano]
+        else:
+            total = len(seleccion)
+            if orden is not None:
+                rango = self._rango[orden][seleccion]
+                if not ascendente:
+                    # Invertir solo los valores no nulos, que ocupan los primeros rangos
+                    n_validos = len(self.df) - self._nulos[orden]
+                    rango = np.where(rango < n_validos, n_validos - 1 - rango, rango)
+                seleccion = seleccion[np.argsort(rango, kind='stable')]
+            posiciones = seleccion[inicio:inicio + tamano]
+
+        return self.df.iloc[posiciones], total
@@ -0,0 +1,77 @@
+import pandas as pd
+
+# Columnas que identifican una misma deuda (sin `mes` ni `antiguedad_deuda`)
+COLS_DUPLICADOS = [
+    'tipo_documento', 'genero', 'rango_edad_probable',
+    'departamento', 'saldo_capital', 'dias_mora',
+    'pago_mes_anterior', 'meses_desde_ultimo_pago', 'sin_pago_previo',
+    'contacto_mes_actual', 'contacto_mes_anterior', 'contacto_ultimos_6meses',
+    'duracion_llamadas_ultimos_6meses', 'pago'
+]
+
+MAPA_GENERO = {'M': 'HOMBRE', 'F': 'MUJER', ' ': 'No especificado', 'NO APLICA': 'No especificado'}
+
+MAPA_EDAD = {
+    '18-21': '18-25', '18-25': '18-25', '22-25': '18-25',
+    '25-30': '26-35', '26-29': '26-35', '30-33': '26-35', '31-35': '26-35', '34-37': '26-35',
+    '36-40': '36-45', '38-41': '36-45', '41-45': '36-45', '42-45': '36-45',
+    '46-49': '46-55', '46-50': '46-55', '50-53': '46-55', '51-55': '46-55',
+    '54-57': '56-65', '56-60': '56-65', '58-61': '56-65', '61-65': '56-65', '62-65': '56-65',
+    '66+': 'Mayor a 65', '66-70': 'Mayor a 65', '71-75': 'Mayor a 65', 'Mas de 75': 'Mayor a 65'
+}
+
+ORDEN_EDAD = ['18-25', '26-35', '36-45', '46-55', '56-65', 'Mayor a 65', 'No especificado']
+
+RUTA_DATOS = 'PruebaDS.xlsx'
+
+
+def asegurar_pago(df):
+    # Asegurar que 'pago' es 0 o 1 (Entero). Copia superficial: el frame recibido no cambia
+    df = df.copy(deep=False)
+    df['pago'] = pd.to_numeric(df['pago'], errors='coerce').fillna(0).astype(int)
+    return df
+
+
+def leer_cartera_cruda(ruta=RUTA_DATOS):
+    """El archivo tal cual, sin convertir `pago`: es lo que evalúan las reglas de calidad."""
+    return pd.read_excel(ruta)
+
+
+def leer_cartera(ruta=RUTA_DATOS):
+    return asegurar_pago(leer_cartera_cruda(ruta))
+
+
+def normalizar_genero(genero):
+    return genero.replace(MAPA_GENERO).fillna('No especificado')
+
+
+def normalizar_edad(rango_edad):
+    """Agrupa los rangos superpuestos del archivo en los de `ORDEN_EDAD`."""
+    return rango_edad.replace(MAPA_EDAD).replace({'NO APLICA': 'No especificado'}).fillna('No especificado')
+
+
+def normalizar_categorias(df):
+    """Normaliza `genero` y `rango_edad_probable` (fila a fila, se puede aplicar por bloques).
+
+    Devuelve un frame nuevo que comparte las demás columnas con `df`; `df` no se modifica.
+    """
+    df = df.copy(deep=False)
+    df['genero'] = normalizar_genero(df['genero'])
+    df['rango_edad_probable'] = normalizar_edad(df['rango_edad_probable'])
+
+    return df
+
+
+def limpiar_cartera(df):
+    """Deduplica la cartera y normaliza `genero` y `rango_edad_probable`.
+
+    Devuelve un DataFrame nuevo; el recibido no se modifica.
+    """
+    # Las filas con `antiguedad_deuda` quedan arriba, así el duplicado que se conserva es el más completo.
+    # Orden estable: entre fechas iguales gana la primera fila del archivo (lo mismo que hace el modo por bloques)
+    df = df.sort_values(by='antiguedad_deuda', na_position='last', kind='stable')
+
+    cols_existentes = [c for c in COLS_DUPLICADOS if c in df.columns]
+    df = df.drop_duplicates(subset=cols_existentes, keep='first')
+
+    return normalizar_categorias(df)
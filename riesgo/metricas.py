@@ -0,0 +1,300 @@
+"""Métricas de operación (contadores, medidores e histogramas) en formato de exposición de Prometheus.
+
+Las métricas viven en un registro del proceso y se exponen en
+`http://<host>:PUERTO_METRICAS/metrics` con un servidor HTTP en un hilo aparte,
+para que Prometheus las recoja sin leer los logs de Streamlit:
+
+    riesgo_reruns_total{pagina="eda"} 12
+    riesgo_cache_total{funcion="cargar_datos",resultado="hit"} 11
+    riesgo_puntuacion_segundos_bucket{le="0.5"} 3
+
+Sin dependencias: solo biblioteca estándar. `ClienteMetricas` lee el endpoint y
+devuelve los valores, para pruebas locales y para revisar una instancia:
+
+    python -m riesgo.metricas --url http://localhost:9464/metrics --filtro riesgo_sql
+"""
+import argparse
+import bisect
+import functools
+import math
+import os
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PUERTO_METRICAS = int(os.environ.get('RIESGO_PUERTO_METRICAS', 9464))
+TIPO_CONTENIDO = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Segundos: de operaciones en memoria (ms) a cargas y puntuaciones completas
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _formato_valor(valor):
+    if math.isinf(valor):
+        return '+Inf' if valor > 0 else '-Inf'
+    return repr(float(valor)) if not float(valor).is_integer() else str(int(valor))
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _etiquetas(nombres, valores, extra=()):
+    pares = list(zip(nombres, valores)) + list(extra)
+    if not pares:
+        return ''
+    return '{' + ','.join(f'{n}="{_escapar(v)}"' for n, v in pares) + '}'
+
+
+class _Metrica:
+    tipo = None
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def _clave(self, etiquetas):
+        if set(etiquetas) != set(self.etiquetas):
+            raise ValueError(f"{self.nombre} requiere las etiquetas {self.etiquetas}, no {tuple(etiquetas)}")
+        return tuple(str(etiquetas[n]) for n in self.etiquetas)
+
+    def exponer(self):
+        lineas = [f'# HELP {self.nombre} {self.ayuda}', f'# TYPE {self.nombre} {self.tipo}']
+        with self._lock:
+            series = sorted(self._series.items())
+            lineas.extend(self._lineas(clave, valor) for clave, valor in series)
+        return '\n'.join(lineas)
+
+    def _lineas(self, clave, valor):
+        return f'{self.nombre}{_etiquetas(self.etiquetas, clave)} {_formato_valor(valor)}'
+
+
+class Contador(_Metrica):
+    """Valor que solo crece (reruns, filas puntuadas, errores)."""
+    tipo = 'counter'
+
+    def inc(self, cantidad=1, **etiquetas):
+        if cantidad < 0:
+            raise ValueError("Un contador no puede disminuir")
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._series[clave] = self._series.get(clave, 0) + cantidad
+
+    def valor(self, **etiquetas):
+        return self._series.get(self._clave(etiquetas), 0)
+
+
+class Medidor(Contador):
+    """Último valor observado (por ejemplo, filas por segundo de la última puntuación)."""
+    tipo = 'gauge'
+
+    def fijar(self, valor, **etiquetas):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._series[clave] = valor
+
+
+class Histograma(_Metrica):
+    """Distribución de duraciones en buckets acumulados, con suma y conteo."""
+    tipo = 'histogram'
+
+    def __init__(self, nombre, ayuda, etiquetas=(), buckets=BUCKETS_SEGUNDOS):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.buckets = tuple(sorted(buckets))
+
+    def observar(self, valor, **etiquetas):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            serie = self._series.setdefault(clave, {'conteos': [0] * (len(self.buckets) + 1), 'suma': 0.0, 'n': 0})
+            serie['conteos'][bisect.bisect_left(self.buckets, valor)] += 1
+            serie['suma'] += valor
+            serie['n'] += 1
+
+    @contextmanager
+    def cronometrar(self, **etiquetas):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(time.perf_counter() - inicio, **etiquetas)
+
+    def conteo(self, **etiquetas):
+        serie = self._series.get(self._clave(etiquetas))
+        return serie['n'] if serie else 0
+
+    def _lineas(self, clave, serie):
+        lineas = []
+        acumulado = 0
+        for limite, conteo in zip(self.buckets + (math.inf,), serie['conteos']):
+            acumulado += conteo
+            lineas.append(f"{self.nombre}_bucket{_etiquetas(self.etiquetas, clave, [('le', _formato_valor(limite))])} {acumulado}")
+        lineas.append(f"{self.nombre}_sum{_etiquetas(self.etiquetas, clave)} {_formato_valor(serie['suma'])}")
+        lineas.append(f"{self.nombre}_count{_etiquetas(self.etiquetas, clave)} {serie['n']}")
+        return '\n'.join(lineas)
+
+
+class Registro:
+    def __init__(self):
+        self.metricas = {}
+
+    def registrar(self, metrica):
+        if metrica.nombre in self.metricas:
+            raise ValueError(f"Métrica duplicada: {metrica.nombre}")
+        self.metricas[metrica.nombre] = metrica
+        return metrica
+
+    def exponer(self):
+        return '\n'.join(m.exponer() for m in self.metricas.values()) + '\n'
+
+
+REGISTRO = Registro()
+
+RERUNS = REGISTRO.registrar(Contador('riesgo_reruns_total', "Ejecuciones del script de Streamlit por página", ['pagina']))
+PAGINA_SEGUNDOS = REGISTRO.registrar(Histograma('riesgo_pagina_segundos', "Duración de cada ejecución de página", ['pagina']))
+CACHE = REGISTRO.registrar(Contador('riesgo_cache_total', "Llamadas a funciones en caché por resultado (hit/miss)",
+                                    ['funcion', 'resultado']))
+CACHE_SEGUNDOS = REGISTRO.registrar(Histograma('riesgo_cache_calculo_segundos', "Duración del cálculo en un fallo de caché",
+                                               ['funcion']))
+CARGA_MODELOS_SEGUNDOS = REGISTRO.registrar(Histograma('riesgo_carga_modelos_segundos', "Duración de la carga de los artefactos"))
+FILAS_PUNTUADAS = REGISTRO.registrar(Contador('riesgo_puntuacion_filas_total', "Filas puntuadas por los modelos"))
+PUNTUACION_SEGUNDOS = REGISTRO.registrar(Histograma('riesgo_puntuacion_segundos', "Duración de cada llamada a puntuar_cartera"))
+FILAS_POR_SEGUNDO = REGISTRO.registrar(Medidor('riesgo_puntuacion_filas_por_segundo', "Filas por segundo de la última puntuación"))
+SQL_SEGUNDOS = REGISTRO.registrar(Histograma('riesgo_sql_segundos', "Latencia de las consultas SQL", ['consulta']))
+SQL_ERRORES = REGISTRO.registrar(Contador('riesgo_sql_errores_total', "Consultas SQL con error", ['consulta']))
+FIGURA_SEGUNDOS = REGISTRO.registrar(Histograma('riesgo_figura_segundos', "Duración del render de figuras matplotlib",
+                                                ['pagina']))
+
+
+def medir_cache(cache, nombre=None):
+    """Como `cache` (p. ej. `st.cache_data`), contando hits y misses y el tiempo de cada recálculo.
+
+    El cuerpo de la función solo corre en un fallo; la llamada externa
+    siempre corre. Un hit es una llamada que no registró un fallo nuevo.
+    """
+    def decorar(funcion):
+        etiqueta = nombre or funcion.__name__
+        local = threading.local()
+
+        @functools.wraps(funcion)
+        def calcular(*args, **kwargs):
+            local.fallo = True
+            CACHE.inc(funcion=etiqueta, resultado='miss')
+            with CACHE_SEGUNDOS.cronometrar(funcion=etiqueta):
+                return funcion(*args, **kwargs)
+
+        cacheada = cache(calcular)
+
+        @functools.wraps(funcion)
+        def llamar(*args, **kwargs):
+            local.fallo = False
+            resultado = cacheada(*args, **kwargs)
+            if not local.fallo:
+                CACHE.inc(funcion=etiqueta, resultado='hit')
+            return resultado
+
+        llamar.clear = cacheada.clear
+        return llamar
+    return decorar
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    registro = REGISTRO
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        cuerpo = self.registro.exponer().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', TIPO_CONTENIDO)
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        # Sin una línea de log por cada scrape
+        pass
+
+
+def iniciar_servidor(puerto=PUERTO_METRICAS, host='127.0.0.1', registro=REGISTRO):
+    """Sirve `/metrics` en un hilo daemon; devuelve el servidor (`servidor.server_address` trae el puerto real)."""
+    manejador = type('Manejador', (_Manejador,), {'registro': registro})
+    servidor = ThreadingHTTPServer((host, puerto), manejador)
+    threading.Thread(target=servidor.serve_forever, name='metricas', daemon=True).start()
+    return servidor
+
+
+def parsear(texto):
+    """{(nombre, ((etiqueta, valor), ...)): valor} a partir del formato de exposición."""
+    valores = {}
+    for linea in texto.splitlines():
+        if not linea or linea.startswith('#'):
+            continue
+        serie, valor = linea.rsplit(' ', 1)
+        if '{' in serie:
+            nombre, resto = serie.split('{', 1)
+            etiquetas = []
+            for par in _dividir_etiquetas(resto[:-1]):
+                clave, val = par.split('=', 1)
+                etiquetas.append((clave, val[1:-1].replace(r'\"', '"').replace(r'\n', '\n').replace('\\\\', '\\')))
+        else:
+            nombre, etiquetas = serie, []
+        valores[(nombre, tuple(sorted(etiquetas)))] = float(valor)
+    return valores
+
+
+def _dividir_etiquetas(texto):
+    # Separa por comas que no estén dentro de comillas
+    partes, actual, en_comillas, escapado = [], '', False, False
+    for caracter in texto:
+        if caracter == ',' and not en_comillas:
+            partes.append(actual)
+            actual = ''
+            continue
+        if caracter == '"' and not escapado:
+            en_comillas = not en_comillas
+        escapado = caracter == '\\' and not escapado
+        actual += caracter
+    if actual:
+        partes.append(actual)
+    return partes
+
+
+class ClienteMetricas:
+    """Cliente local del endpoint `/metrics`."""
+
+    def __init__(self, url=f'http://127.0.0.1:{PUERTO_METRICAS}/metrics', timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def texto(self):
+        with urllib.request.urlopen(self.url, timeout=self.timeout) as respuesta:
+            return respuesta.read().decode('utf-8')
+
+    def leer(self):
+        return parsear(self.texto())
+
+    def valor(self, nombre, **etiquetas):
+        """Valor de una serie; 0 si todavía no se ha observado."""
+        clave = (nombre, tuple(sorted((k, str(v)) for k, v in etiquetas.items())))
+        return self.leer().get(clave, 0.0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lee el endpoint de métricas de una instancia del dashboard.")
+    parser.add_argument('--url', default=ClienteMetricas().url)
+    parser.add_argument('--filtro', default='', help="Prefijo de las métricas a mostrar")
+    args = parser.parse_args(argv)
+
+    for (nombre, etiquetas), valor in sorted(ClienteMetricas(args.url).leer().items()):
+        if nombre.startswith(args.filtro):
+            print(f"{nombre}{_etiquetas([k for k, _ in etiquetas], [v for _, v in etiquetas])} {_formato_valor(valor)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+import hashlib
+import os
+import time
+
+import numpy as np
+
+from riesgo.caracteristicas import calcular
+from riesgo.explicacion import razones
+from riesgo.metricas import FILAS_POR_SEGUNDO, FILAS_PUNTUADAS, PUNTUACION_SEGUNDOS
+from riesgo.paquete import MANIFIESTO, cargar_paquete, con_precision, diferencia
+
+RUTA_MODELOS = 'modelos_riesgo_v1.pkl'
+
+# Variables del modelo (`columnas_modelo` del artefacto)
+COLS_NUMERICAS = ['dias_mora', 'saldo_capital', 'pago_mes_anterior', 'meses_desde_ultimo_pago',
+                  'contacto_mes_actual', 'duracion_llamadas_ultimos_6meses']
+COLS_CATEGORICAS = ['genero', 'rango_edad_probable']
+
+# Filtros de negocio aplicados en el notebook de entrenamiento
+MAX_DIAS_MORA = 3650
+MIN_SALDO_CAPITAL = 1000
+
+
+def cargar_artefactos(ruta=RUTA_MODELOS, precision='float64'):
+    """Carga el paquete sin pickle (`modelos_riesgo_v1/`) si existe; si no, el pickle de joblib.
+
+    El pickle solo debe usarse con artefactos de confianza: deserializarlo ejecuta código.
+    `precision` ('float64', 'float32' o 'int8') aplica a la inferencia del autoencoder.
+    """
+    directorio = os.path.splitext(ruta)[0]
+    if os.path.isdir(directorio):
+        return cargar_paquete(directorio, precision=precision)
+
+    import joblib
+    artefactos = joblib.load(ruta)
+    if precision != 'float64':
+        artefactos = {**artefactos, "autoencoder": con_precision(artefactos["autoencoder"], precision)}
+    return artefactos
+
+
+def version_modelos(ruta=RUTA_MODELOS):
+    """Huella de los artefactos que cargaría `cargar_artefactos(ruta)`: el manifiesto del paquete o el pickle."""
+    directorio = os.path.splitext(ruta)[0]
+    archivo = os.path.join(directorio, MANIFIESTO) if os.path.isdir(directorio) else ruta
+    h = hashlib.sha256()
+    with open(archivo, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloque)
+    return h.hexdigest()[:16]
+
+
+def preparar_entrada(df):
+    """Aplica los filtros y el tratamiento de nulos del entrenamiento."""
+    df_pred = df[(df['dias_mora'] < MAX_DIAS_MORA) & (df['saldo_capital'] > MIN_SALDO_CAPITAL)].copy()
+
+    if 'meses_desde_ultimo_pago' in df_pred.columns:
+        # Misma definición que usan el EDA y el almacén de características
+        df_pred['meses_desde_ultimo_pago'] = calcular(df_pred, ['recencia_pago'])['recencia_pago']
+
+    return df_pred
+
+
+def transformar(preprocessor, df, one_hot_comprimido=False):
+    """Matriz transformada; con `one_hot_comprimido` y el preprocesador del paquete, una `MatrizOneHot`."""
+    if one_hot_comprimido and hasattr(preprocessor, 'transform_one_hot'):
+        return preprocessor.transform_one_hot(df)
+    return preprocessor.transform(df)
+
+
+def puntuar_cartera(df, artefactos, con_razones=True, one_hot_comprimido=False):
+    """Devuelve la cartera filtrada con probabilidad de pago, score y alerta de anomalía.
+
+    Con `con_razones` agrega también los principales códigos de razón de cada
+    modelo (ver `riesgo.explicacion`); si el clasificador no es un árbol único
+    solo las del autoencoder. `one_hot_comprimido` evita armar las
+    columnas one-hot (ver `riesgo.paquete.MatrizOneHot`): el árbol da lo mismo,
+    pero el MSE puede diferir en el último bit y cambiar una alerta empatada con el umbral.
+    """
+    inicio = time.perf_counter()
+    model_cols = artefactos["columnas_modelo"]
+    df_pred = preparar_entrada(df)
+
+    missing_cols = [c for c in model_cols if c not in df_pred.columns]
+    if missing_cols:
+        raise ValueError(f"Faltan columnas para el modelo: {missing_cols}")
+
+    X_processed = transformar(artefactos["preprocessor"], df_pred[model_cols], one_hot_comprimido)
+
+    # Probabilidad de pago (Clase 1)
+    probs = artefactos["arbol"].predict_proba(X_processed)[:, 1]
+
+    # Score de anomalía (error de reconstrucción)
+    reconstruccion = artefactos["autoencoder"].predict(X_processed)
+    # En la precisión del autoencoder: con float32 no se vuelve a float64 para el MSE
+    mse = np.mean(np.power(diferencia(X_processed, reconstruccion), 2), axis=1)
+
+    df_pred['probabilidad_pago_arbol'] = probs
+    df_pred['score_anomalia_autoencoder'] = mse
+    df_pred['alerta_anomalia'] = mse > artefactos["umbral_autoencoder"]
+
+    if con_razones:
+        for col, valores in razones(X_processed, reconstruccion, artefactos).items():
+            df_pred[col] = valores
+
+    segundos = time.perf_counter() - inicio
+    PUNTUACION_SEGUNDOS.observar(segundos)
+    FILAS_PUNTUADAS.inc(len(df_pred))
+    if segundos > 0:
+        FILAS_POR_SEGUNDO.fijar(len(df_pred) / segundos)
+    return df_pred
@@ -0,0 +1,457 @@
+"""Paquete versionado de modelos: manifiesto JSON + arreglos .npy, sin pickle.
+
+    modelos_riesgo_v1/
+        manifiesto.json            columnas_modelo, umbral, esquema, hashes y componentes
+        preprocessor/*.npy         min_ y scale_ del MinMaxScaler
+        arbol/*.npy                nodos del árbol (hijos, variable, umbral, valor)
+        autoencoder/*.npy          pesos y sesgos del MLP
+
+Los arreglos se abren con `np.load(mmap_mode='r', allow_pickle=False)` y cada
+componente se carga solo la primera vez que se usa. La inferencia es numpy puro,
+equivalente a `transform`, `predict_proba` y `predict` de scikit-learn; el
+autoencoder puede correr además en float32 o con pesos int8 (ver `riesgo.precision`).
+
+    python -m riesgo.paquete modelos_riesgo_v1.pkl modelos_riesgo_v1
+"""
+import argparse
+import hashlib
+import json
+import os
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+FORMATO = 'riesgo-paquete'
+VERSION_FORMATO = 1
+MANIFIESTO = 'manifiesto.json'
+RUTA_PAQUETE = 'modelos_riesgo_v1'
+PRECISIONES = ('float64', 'float32', 'int8')
+# Filas máximas de la tabla de combinaciones one-hot de la primera capa del autoencoder
+MAX_FILAS_EMBEDDING = 65_536
+
+
+def _sha256(ruta):
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def hash_esquema(esquema):
+    return hashlib.sha256(json.dumps(esquema, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+# --- Componentes (inferencia numpy) ---
+
+class MatrizOneHot:
+    """Matriz transformada con el bloque one-hot comprimido.
+
+    Cada categórica tiene a lo sumo un uno por fila, así que en vez de sus
+    columnas se guarda el índice de la columna activa (-1 si la categoría no se
+    vio en entrenamiento). La memoria crece con las filas y las variables, no
+    con el número de categorías; `toarray` y `tocsr` dan la matriz completa.
+    """
+
+    def __init__(self, numericas, activas, grupos):
+        self.numericas = numericas
+        self.activas = activas
+        # Categórica (columna de `activas`) a la que pertenece cada columna one-hot
+        self.grupos = grupos
+
+    @property
+    def shape(self):
+        return (len(self.numericas), self.numericas.shape[1] + len(self.grupos))
+
+    def __len__(self):
+        return len(self.numericas)
+
+    def _unos(self):
+        filas, grupo = np.nonzero(self.activas >= 0)
+        return filas, self.activas[filas, grupo]
+
+    def toarray(self):
+        densa = np.zeros(self.shape)
+        densa[:, :self.numericas.shape[1]] = self.numericas
+        densa[self._unos()] = 1.0
+        return densa
+
+    def tocsr(self):
+        from scipy import sparse
+        filas_num, cols_num = np.nonzero(self.numericas)
+        filas_cat, cols_cat = self._unos()
+        return sparse.csr_matrix(
+            (np.concatenate([self.numericas[filas_num, cols_num], np.ones(len(filas_cat))]),
+             (np.concatenate([filas_num, filas_cat]), np.concatenate([cols_num, cols_cat]))),
+            shape=self.shape,
+        )
+
+    def valores(self, filas, variables, dtype=np.float64):
+        """Elemento (filas[i], variables[i]) sin armar la matriz: las one-hot se comparan contra la columna activa."""
+        p = self.numericas.shape[1]
+        numerica = variables < p
+        valor = np.asarray(self.numericas[filas, np.where(numerica, variables, 0)], dtype=dtype)
+        if len(self.grupos):
+            grupo = self.grupos[np.where(numerica, 0, variables - p)]
+            valor = np.where(numerica, valor, (self.activas[filas, grupo] == variables).astype(dtype))
+        return valor
+
+    def diferencia(self, reconstruccion):
+        """`X - reconstruccion` en el tipo de la reconstrucción."""
+        diferencia = -reconstruccion
+        diferencia[:, :self.numericas.shape[1]] += self.numericas
+        diferencia[self._unos()] += 1
+        return diferencia
+
+
+def diferencia(X, reconstruccion):
+    """`X - reconstruccion` para `X` densa o `MatrizOneHot`, en el tipo de la reconstrucción."""
+    if isinstance(X, MatrizOneHot):
+        return X.diferencia(reconstruccion)
+    return np.asarray(X).astype(reconstruccion.dtype, copy=False) - reconstruccion
+
+
+class Preprocesador:
+    """MinMaxScaler sobre las numéricas + OneHotEncoder(handle_unknown='ignore') sobre las categóricas."""
+
+    def __init__(self, numericas, categoricas, min_, scale_):
+        self.numericas = numericas
+        self.categoricas = categoricas
+        self.min_ = min_
+        self.scale_ = scale_
+
+        inicio = np.cumsum([len(numericas)] + [len(c) for c in categoricas.values()])[:-1]
+        self._inicio_categoricas = inicio
+        self._grupos = np.repeat(np.arange(len(categoricas)), [len(c) for c in categoricas.values()])
+
+    def transform_one_hot(self, df):
+        """Transformación con el bloque one-hot comprimido (`MatrizOneHot`)."""
+        numericas = df[self.numericas].to_numpy(dtype=np.float64) * self.scale_ + self.min_
+        activas = np.full((len(df), len(self.categoricas)), -1, dtype=np.intp)
+        for g, (col, categorias) in enumerate(self.categoricas.items()):
+            # Categorías no vistas quedan en -1 (handle_unknown='ignore')
+            codigos = pd.Categorical(df[col], categories=categorias).codes
+            activas[:, g] = np.where(codigos >= 0, codigos + self._inicio_categoricas[g], -1)
+        return MatrizOneHot(numericas, activas, self._grupos)
+
+    def transform(self, df):
+        return self.transform_one_hot(df).toarray()
+
+
+class Arbol:
+    """Árbol de decisión compilado en arreglos, recorrido nivel por nivel para todas las filas."""
+
+    def __init__(self, children_left, children_right, feature, threshold, value, max_depth):
+        self.children_left = children_left
+        self.children_right = children_right
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+        self.max_depth = max_depth
+
+    def apply(self, X):
+        """Hoja de cada fila; `X` densa o `MatrizOneHot` (las divisiones one-hot se evalúan sobre la columna activa)."""
+        # scikit-learn compara en float32
+        comprimida = isinstance(X, MatrizOneHot)
+        if not comprimida:
+            X = np.asarray(X, dtype=np.float32)
+        filas = np.arange(len(X))
+        nodo = np.zeros(len(X), dtype=np.intp)
+        for _ in range(self.max_depth):
+            izquierdo = self.children_left[nodo]
+            hoja = izquierdo == -1
+            if hoja.all():
+                break
+            variable = np.where(hoja, 0, self.feature[nodo])
+            valor = X.valores(filas, variable, np.float32) if comprimida else X[filas, variable]
+            va_izquierda = valor <= self.threshold[nodo]
+            nodo = np.where(hoja, nodo, np.where(va_izquierda, izquierdo, self.children_right[nodo]))
+        return nodo
+
+    def predict_proba(self, X):
+        valor = np.asarray(self.value[self.apply(X), 0, :], dtype=np.float64)
+        return valor / valor.sum(axis=1, keepdims=True)
+
+
+def cuantizar_int8(W):
+    """Pesos int8 simétricos con una escala por neurona de salida (`W ≈ q * escala`)."""
+    W = np.asarray(W, dtype=np.float64)
+    escala = np.abs(W).max(axis=0) / 127
+    escala = np.where(escala > 0, escala, 1.0)
+    q = np.clip(np.round(W / escala), -127, 127).astype(np.int8)
+    return q, escala
+
+
+class Autoencoder:
+    """MLPRegressor con activación ReLU en capas ocultas y salida identidad.
+
+    `precision` elige la aritmética de la inferencia: 'float64' (la de
+    scikit-learn), 'float32', o 'int8' (pesos cuantizados por neurona y
+    activaciones en float32). El mismo objeto se usa para `predict` y `codificar`.
+    """
+
+    def __init__(self, coefs, intercepts, precision='float64'):
+        if precision not in PRECISIONES:
+            raise ValueError(f"Precisión no soportada: {precision} (opciones: {PRECISIONES})")
+        self.coefs_ = coefs
+        self.intercepts_ = intercepts
+        self.precision = precision
+        self.dtype = np.float64 if precision == 'float64' else np.float32
+        self._capas = None
+        self._tablas = {}
+
+    def capas(self):
+        """Pesos y sesgos en la precisión de inferencia (se convierten una sola vez)."""
+        if self._capas is None:
+            capas = []
+            for W, b in zip(self.coefs_, self.intercepts_):
+                if self.precision == 'int8':
+                    q, escala = cuantizar_int8(W)
+                    W = q.astype(np.float32) * escala.astype(np.float32)
+                capas.append((np.asarray(W, dtype=self.dtype), np.asarray(b, dtype=self.dtype)))
+            self._capas = capas
+        return self._capas
+
+    def _tabla_embedding(self, p, grupos):
+        """Sesgo + filas de W de cada combinación de categorías activas, o None si la tabla sería muy grande."""
+        clave = (p, grupos.tobytes())
+        if clave not in self._tablas:
+            W, b = self.capas()[0]
+            tamanos = np.bincount(grupos)
+            tabla = None
+            if np.prod(tamanos + 1) <= MAX_FILAS_EMBEDDING:
+                tabla = b[None, :]
+                inicio = p
+                for k in tamanos:
+                    # La fila 0 es "ninguna categoría activa" (categoría no vista)
+                    filas = np.vstack([np.zeros((1, W.shape[1]), dtype=W.dtype), W[inicio:inicio + k]])
+                    tabla = (tabla[:, None, :] + filas[None, :, :]).reshape(-1, W.shape[1])
+                    inicio += k
+            self._tablas[clave] = tabla
+        return self._tablas[clave]
+
+    def _primera_capa(self, X):
+        # Con el one-hot comprimido la primera capa es numéricas @ W más una sola fila de la tabla
+        # de combinaciones de categorías (un gather en vez del producto sobre las columnas one-hot)
+        W, b = self.capas()[0]
+        p = X.numericas.shape[1]
+        tabla = self._tabla_embedding(p, X.grupos)
+        if tabla is None:
+            return np.asarray(X.toarray(), dtype=self.dtype) @ W + b
+
+        indice = np.zeros(len(X), dtype=np.intp)
+        inicio = p
+        for g, k in enumerate(np.bincount(X.grupos)):
+            activas = X.activas[:, g]
+            indice = indice * (k + 1) + np.where(activas >= 0, activas - inicio + 1, 0)
+            inicio += k
+        activacion = np.asarray(X.numericas, dtype=self.dtype) @ W[:p]
+        activacion += np.take(tabla, indice, axis=0)
+        return activacion
+
+    def _propagar(self, X, n_capas):
+        ultima = len(self.coefs_) - 1
+        comprimida = isinstance(X, MatrizOneHot)
+        activacion = None if comprimida else np.asarray(X, dtype=self.dtype)
+        for i, (W, b) in enumerate(self.capas()[:n_capas]):
+            activacion = self._primera_capa(X) if i == 0 and comprimida else activacion @ W + b
+            if i < ultima:
+                np.maximum(activacion, 0, out=activacion)
+        return activacion
+
+    def predict(self, X):
+        return self._propagar(X, len(self.coefs_))
+
+    def codificar(self, X):
+        """Activaciones del cuello de botella (la capa oculta más angosta)."""
+        anchos = [W.shape[1] for W in self.coefs_[:-1]]
+        return self._propagar(X, int(np.argmin(anchos)) + 1)
+
+
+def con_precision(autoencoder, precision):
+    """Autoencoder del paquete en otra precisión; acepta también el MLPRegressor del pickle."""
+    if getattr(autoencoder, 'activation', 'relu') != 'relu':
+        raise ValueError("Solo se soporta un autoencoder con activación relu")
+    return Autoencoder(autoencoder.coefs_, autoencoder.intercepts_, precision)
+
+
+# --- Exportación desde los artefactos de scikit-learn ---
+
+def _guardar(directorio, componente, nombre, arreglo):
+    relativa = f"{componente}/{nombre}.npy"
+    ruta = os.path.join(directorio, relativa)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    np.save(ruta, np.ascontiguousarray(arreglo), allow_pickle=False)
+    return {'archivo': relativa, 'sha256': _sha256(ruta)}
+
+
+def exportar_paquete(artefactos, directorio, nombre=None):
+    """Convierte los artefactos de `modelos_riesgo_v1.pkl` en un paquete sin pickle."""
+    from sklearn.neural_network import MLPRegressor
+    from sklearn.preprocessing import MinMaxScaler, OneHotEncoder
+    from sklearn.tree import DecisionTreeClassifier
+
+    preprocessor = artefactos["preprocessor"]
+    arbol = artefactos["arbol"]
+    autoencoder = artefactos["autoencoder"]
+
+    transformadores = {nombre_t: (t, cols) for nombre_t, t, cols in preprocessor.transformers_ if nombre_t != 'remainder'}
+    scaler, numericas = transformadores.get('num', (None, None))
+    encoder, categoricas = transformadores.get('cat', (None, None))
+    if (not isinstance(scaler, MinMaxScaler) or scaler.clip or not isinstance(encoder, OneHotEncoder)
+            or encoder.drop is not None or encoder.handle_unknown != 'ignore' or len(transformadores) != 2):
+        raise ValueError("El paquete solo soporta el preprocesador MinMaxScaler ('num') + OneHotEncoder ('cat')")
+    if not isinstance(arbol, DecisionTreeClassifier):
+        raise ValueError(f"El paquete solo soporta DecisionTreeClassifier, no {type(arbol).__name__}")
+    if not isinstance(autoencoder, MLPRegressor) or autoencoder.activation != 'relu':
+        raise ValueError("El paquete solo soporta un MLPRegressor con activación relu")
+
+    esquema = {
+        'numericas': list(numericas),
+        'categoricas': {col: [str(v) for v in cats] for col, cats in zip(categoricas, encoder.categories_)},
+    }
+    tree = arbol.tree_
+
+    manifiesto = {
+        'formato': FORMATO,
+        'version_formato': VERSION_FORMATO,
+        'nombre': nombre or os.path.basename(os.path.normpath(directorio)),
+        'columnas_modelo': list(artefactos["columnas_modelo"]),
+        'umbral_autoencoder': float(artefactos["umbral_autoencoder"]),
+        'esquema': esquema,
+        'hash_esquema': hash_esquema(esquema),
+        'componentes': {
+            'preprocessor': {
+                'arreglos': {
+                    'min_': _guardar(directorio, 'preprocessor', 'min_', scaler.min_),
+                    'scale_': _guardar(directorio, 'preprocessor', 'scale_', scaler.scale_),
+                },
+            },
+            'arbol': {
+                'max_depth': int(tree.max_depth),
+                'params': {k: v for k, v in arbol.get_params().items() if isinstance(v, (int, float, str, type(None)))},
+                'arreglos': {
+                    campo: _guardar(directorio, 'arbol', campo, getattr(tree, campo))
+                    for campo in ['children_left', 'children_right', 'feature', 'threshold', 'value']
+                },
+            },
+            'autoencoder': {
+                'hidden_layer_sizes': list(autoencoder.hidden_layer_sizes),
+                'arreglos': {
+                    **{f'coef_{i}': _guardar(directorio, 'autoencoder', f'coef_{i}', W) for i, W in enumerate(autoencoder.coefs_)},
+                    **{f'intercept_{i}': _guardar(directorio, 'autoencoder', f'intercept_{i}', b) for i, b in enumerate(autoencoder.intercepts_)},
+                },
+            },
+        },
+    }
+
+    with open(os.path.join(directorio, MANIFIESTO), 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, indent=2, ensure_ascii=False)
+    return manifiesto
+
+
+# --- Carga perezosa ---
+
+class PaqueteModelos(Mapping):
+    """Artefactos del paquete con la misma interfaz de diccionario que el pickle.
+
+    `paquete["arbol"]`, `paquete["autoencoder"]` y `paquete["preprocessor"]` se
+    construyen al primer acceso; `columnas_modelo` y `umbral_autoencoder` vienen
+    del manifiesto.
+    """
+
+    CLAVES = ("arbol", "autoencoder", "preprocessor", "umbral_autoencoder", "columnas_modelo")
+
+    def __init__(self, directorio, verificar=True, precision='float64'):
+        self.directorio = directorio
+        self.verificar = verificar
+        self.precision = precision
+        with open(os.path.join(directorio, MANIFIESTO), encoding='utf-8') as f:
+            self.manifiesto = json.load(f)
+
+        if self.manifiesto.get('formato') != FORMATO or self.manifiesto.get('version_formato') != VERSION_FORMATO:
+            raise ValueError(f"'{directorio}' no es un paquete {FORMATO} v{VERSION_FORMATO}")
+        if hash_esquema(self.manifiesto['esquema']) != self.manifiesto['hash_esquema']:
+            raise ValueError("El esquema del manifiesto no coincide con su hash")
+
+        self._componentes = {}
+
+    @property
+    def nombre(self):
+        return self.manifiesto['nombre']
+
+    def _arreglo(self, componente, nombre):
+        entrada = self.manifiesto['componentes'][componente]['arreglos'][nombre]
+        ruta = os.path.join(self.directorio, entrada['archivo'])
+        if self.verificar and _sha256(ruta) != entrada['sha256']:
+            raise ValueError(f"Hash inválido para {entrada['archivo']}")
+        return np.load(ruta, mmap_mode='r', allow_pickle=False)
+
+    def _construir(self, clave):
+        meta = self.manifiesto['componentes'][clave]
+        if clave == 'preprocessor':
+            esquema = self.manifiesto['esquema']
+            return Preprocesador(esquema['numericas'], esquema['categoricas'],
+                                 self._arreglo(clave, 'min_'), self._arreglo(clave, 'scale_'))
+        if clave == 'arbol':
+            return Arbol(*(self._arreglo(clave, c) for c in ['children_left', 'children_right', 'feature', 'threshold', 'value']),
+                         max_depth=meta['max_depth'])
+        if clave == 'autoencoder':
+            n_capas = len(meta['hidden_layer_sizes']) + 1
+            return Autoencoder([self._arreglo(clave, f'coef_{i}') for i in range(n_capas)],
+                               [self._arreglo(clave, f'intercept_{i}') for i in range(n_capas)],
+                               precision=self.precision)
+        raise KeyError(clave)
+
+    def __getitem__(self, clave):
+        if clave == 'columnas_modelo':
+            return self.manifiesto['columnas_modelo']
+        if clave == 'umbral_autoencoder':
+            return np.float64(self.manifiesto['umbral_autoencoder'])
+        if clave not in self._componentes:
+            self._componentes[clave] = self._construir(clave)
+        return self._componentes[clave]
+
+    def __iter__(self):
+        return iter(self.CLAVES)
+
+    def __len__(self):
+        return len(self.CLAVES)
+
+    def validar(self, df):
+        """Lista de problemas del DataFrame frente al esquema del paquete (vacía si es compatible)."""
+        esquema = self.manifiesto['esquema']
+        problemas = []
+        for col in esquema['numericas']:
+            if col not in df.columns:
+                problemas.append(f"Falta la columna numérica '{col}'")
+            elif not pd.api.types.is_numeric_dtype(df[col]):
+                problemas.append(f"La columna '{col}' no es numérica ({df[col].dtype})")
+        for col, categorias in esquema['categoricas'].items():
+            if col not in df.columns:
+                problemas.append(f"Falta la columna categórica '{col}'")
+                continue
+            nuevas = set(df[col].dropna().unique()) - set(categorias)
+            if nuevas:
+                problemas.append(f"'{col}' tiene categorías no vistas en entrenamiento: {sorted(map(str, nuevas))}")
+        return problemas
+
+
+def cargar_paquete(directorio=RUTA_PAQUETE, verificar=True, precision='float64'):
+    return PaqueteModelos(directorio, verificar=verificar, precision=precision)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convierte un pickle de modelos en un paquete sin pickle.")
+    parser.add_argument('pickle')
+    parser.add_argument('directorio')
+    args = parser.parse_args(argv)
+
+    import joblib
+    manifiesto = exportar_paquete(joblib.load(args.pickle), args.directorio)
+    print(f"Paquete '{manifiesto['nombre']}' escrito en {args.directorio} (esquema {manifiesto['hash_esquema'][:12]})")
+
+
+if __name__ == '__main__':
+    main()
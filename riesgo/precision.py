@@ -0,0 +1,93 @@
+"""Verificación de la inferencia del autoencoder en precisión reducida.
+
+Compara `float32` y pesos `int8` contra la referencia `float64` sobre la misma
+matriz transformada: cuántas `alerta_anomalia` cambian, el error relativo del
+score y del código del cuello de botella, y el tiempo de inferencia. Con el
+preprocesador del paquete cada precisión se mide también con el one-hot
+comprimido (`MatrizOneHot`). El árbol no cambia: ya compara en float32.
+
+    python -m riesgo.precision --repetir 20
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from riesgo.modelos import preparar_entrada
+from riesgo.paquete import PRECISIONES, con_precision, diferencia
+
+
+def _mse(X, reconstruccion):
+    return np.mean(np.power(diferencia(X, reconstruccion), 2), axis=1)
+
+
+def _cronometrar(funcion, repeticiones):
+    mejor = np.inf
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return resultado, mejor
+
+
+def verificar_precision(df, artefactos, precisiones=PRECISIONES, repeticiones=3):
+    """Una fila por precisión (y entrada densa o one-hot comprimida) con las alertas que cambian frente a float64."""
+    df_pred = preparar_entrada(df)
+    pre = artefactos["preprocessor"]
+    X = pre.transform(df_pred[artefactos["columnas_modelo"]])
+    entradas = {'densa': X}
+    if hasattr(pre, 'transform_one_hot'):
+        entradas['one_hot'] = pre.transform_one_hot(df_pred[artefactos["columnas_modelo"]])
+    umbral = artefactos["umbral_autoencoder"]
+
+    referencia = con_precision(artefactos["autoencoder"], 'float64')
+    referencia.capas()
+    mse_ref, segundos_ref = _cronometrar(lambda: _mse(X, referencia.predict(X)), repeticiones)
+    alerta_ref = mse_ref > umbral
+    codigo_ref = referencia.codificar(X)
+
+    filas = []
+    for precision in precisiones:
+        autoencoder = con_precision(artefactos["autoencoder"], precision)
+        autoencoder.capas()
+        for entrada, Xe in entradas.items():
+            mse, segundos = _cronometrar(lambda: _mse(Xe, autoencoder.predict(Xe)), repeticiones)
+            alerta = mse > umbral
+            codigo = autoencoder.codificar(Xe)
+            filas.append({
+                'precision': precision,
+                'entrada': entrada,
+                'filas': len(X),
+                'alertas': int(alerta.sum()),
+                'alertas_cambiadas': int((alerta != alerta_ref).sum()),
+                'nuevas_alertas': int((alerta & ~alerta_ref).sum()),
+                'alertas_perdidas': int((~alerta & alerta_ref).sum()),
+                'error_rel_max_score': float(np.max(np.abs(mse - mse_ref) / np.maximum(mse_ref, np.finfo(np.float32).tiny))),
+                'error_abs_max_codigo': float(np.max(np.abs(codigo - codigo_ref))) if len(X) else 0.0,
+                'segundos': segundos,
+                'aceleracion': segundos_ref / segundos if segundos > 0 else np.nan,
+            })
+    return pd.DataFrame(filas).set_index(['precision', 'entrada'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara la inferencia del autoencoder en float32/int8 contra float64.")
+    parser.add_argument('--datos', default=None, help="Archivo de cartera (por defecto PruebaDS.xlsx)")
+    parser.add_argument('--modelos', default=None, help="Paquete o pickle de modelos")
+    parser.add_argument('--repetir', type=int, default=1,
+                        help="Replica la cartera n veces para medir el tiempo sobre más filas")
+    args = parser.parse_args(argv)
+
+    from riesgo.limpieza import RUTA_DATOS, leer_cartera, limpiar_cartera
+    from riesgo.modelos import RUTA_MODELOS, cargar_artefactos
+
+    df = limpiar_cartera(leer_cartera(args.datos or RUTA_DATOS))
+    if args.repetir > 1:
+        df = pd.concat([df] * args.repetir, ignore_index=True)
+    reporte = verificar_precision(df, cargar_artefactos(args.modelos or RUTA_MODELOS))
+    print(reporte.to_string())
+
+
+if __name__ == '__main__':
+    main()
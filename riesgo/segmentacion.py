@@ -0,0 +1,138 @@
+"""Matriz de segmentación por recuperación esperada.
+
+Cada deudor puntuado cae en una celda (tramo de saldo por cuantiles, más el
+corte de saldo alto, × tramo de probabilidad × alerta de anomalía). Por celda se acumulan, con un solo
+`bincount` por métrica, el tamaño, el saldo, el capital esperado
+(`probabilidad × saldo`) y su varianza suponiendo pagos Bernoulli
+independientes, de donde sale el intervalo de confianza normal. Con la
+columna `pago` se reporta además la tasa observada con intervalo de Wilson.
+
+    python -m riesgo.segmentacion --salida matriz_segmentacion.csv
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from riesgo.exportacion import UMBRAL_PROBABILIDAD, UMBRAL_SALDO_ALTO
+
+N_TRAMOS_SALDO = 4
+CORTES_PROBABILIDAD = [0.25, UMBRAL_PROBABILIDAD, 0.75]
+Z_95 = 1.959963984540054
+
+# Estrategia de la matriz 2x2 de gestión: (saldo alto, probabilidad alta) -> nombre
+ESTRATEGIAS = {
+    (True, True): 'Golden Geese',
+    (False, True): 'Gestión Digital',
+    (True, False): 'Investigación',
+    (False, False): 'Baja Prioridad',
+}
+
+
+def _etiquetas_tramos(bordes, formato):
+    return [f"{formato(bordes[i])} - {formato(bordes[i + 1])}" for i in range(len(bordes) - 1)]
+
+
+def matriz_segmentacion(df_pred, n_tramos_saldo=N_TRAMOS_SALDO, cortes_probabilidad=CORTES_PROBABILIDAD, z=Z_95):
+    """Una fila por celda no vacía con tamaño, capital esperado e intervalos de confianza."""
+    saldo = df_pred['saldo_capital'].to_numpy(dtype=np.float64)
+    prob = df_pred['probabilidad_pago_arbol'].to_numpy(dtype=np.float64)
+    anomalia = df_pred['alerta_anomalia'].to_numpy(dtype=bool)
+
+    bordes_saldo = np.quantile(saldo, np.linspace(0, 1, n_tramos_saldo + 1))
+    # El corte de saldo alto es un borde más: ningún tramo lo cruza y cada celda cae entera de un lado,
+    # igual que los segmentos de la exportación (`saldo_capital > UMBRAL_SALDO_ALTO` fila por fila)
+    if bordes_saldo[0] < UMBRAL_SALDO_ALTO < bordes_saldo[-1]:
+        bordes_saldo = np.append(bordes_saldo, UMBRAL_SALDO_ALTO)
+    bordes_saldo = np.unique(bordes_saldo)
+    bordes_prob = np.concatenate([[0.0], cortes_probabilidad, [1.0]])
+    n_saldo, n_prob = len(bordes_saldo) - 1, len(bordes_prob) - 1
+
+    # Tramos cerrados a la derecha; el mínimo cae en el primero
+    tramo_saldo = np.clip(np.searchsorted(bordes_saldo, saldo, side='left') - 1, 0, n_saldo - 1)
+    tramo_prob = np.clip(np.searchsorted(bordes_prob, prob, side='left') - 1, 0, n_prob - 1)
+    celda = (tramo_saldo * n_prob + tramo_prob) * 2 + anomalia
+    n_celdas = n_saldo * n_prob * 2
+
+    def suma(pesos=None):
+        return np.bincount(celda, weights=pesos, minlength=n_celdas)
+
+    deudores = suma()
+    esperado = suma(prob * saldo)
+    varianza = suma(prob * (1 - prob) * saldo ** 2)
+    margen = z * np.sqrt(varianza)
+
+    # La estrategia de cada celda se decide por el borde inferior de sus tramos
+    codigos = np.arange(n_celdas)
+    i_saldo, i_prob, i_anom = codigos // 2 // n_prob, codigos // 2 % n_prob, codigos % 2
+    saldo_alto = bordes_saldo[i_saldo] >= UMBRAL_SALDO_ALTO
+    prob_alta = bordes_prob[i_prob] >= UMBRAL_PROBABILIDAD
+
+    matriz = pd.DataFrame({
+        'tramo_saldo': np.array(_etiquetas_tramos(bordes_saldo, lambda v: f"${v:,.0f}"), dtype=object)[i_saldo],
+        'tramo_probabilidad': np.array(_etiquetas_tramos(bordes_prob, lambda v: f"{v:.0%}"), dtype=object)[i_prob],
+        'alerta_anomalia': i_anom.astype(bool),
+        'estrategia': [ESTRATEGIAS[(a, p)] for a, p in zip(saldo_alto, prob_alta)],
+        'deudores': deudores.astype(np.int64),
+        'saldo_total': suma(saldo),
+        'probabilidad_media': np.divide(suma(prob), deudores, out=np.zeros(n_celdas), where=deudores > 0),
+        'recuperacion_esperada': esperado,
+        'recuperacion_desviacion': np.sqrt(varianza),
+        'recuperacion_ic_inf': np.maximum(esperado - margen, 0),
+        'recuperacion_ic_sup': esperado + margen,
+    })
+
+    if 'pago' in df_pred.columns:
+        pagos = suma(df_pred['pago'].to_numpy(dtype=np.float64))
+        tasa, inf, sup = _wilson(pagos, deudores, z)
+        matriz['tasa_pago_observada'] = tasa
+        matriz['tasa_pago_ic_inf'] = inf
+        matriz['tasa_pago_ic_sup'] = sup
+        matriz['capital_recuperado_observado'] = suma(df_pred['pago'].to_numpy(dtype=np.float64) * saldo)
+
+    return matriz[matriz['deudores'] > 0].reset_index(drop=True)
+
+
+def _wilson(exitos, n, z):
+    """Proporción e intervalo de Wilson, vectorizado (celdas vacías en NaN)."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p = exitos / n
+        denominador = 1 + z ** 2 / n
+        centro = (p + z ** 2 / (2 * n)) / denominador
+        margen = z * np.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / denominador
+    return p, centro - margen, centro + margen
+
+
+def resumen_estrategias(matriz, z=Z_95):
+    """Agrega la matriz en las cuatro estrategias de gestión (las varianzas de las celdas se suman)."""
+    m = matriz.assign(
+        anomalos=matriz['deudores'] * matriz['alerta_anomalia'],
+        varianza=matriz['recuperacion_desviacion'] ** 2,
+    )
+    resumen = m.groupby('estrategia', sort=False)[
+        ['deudores', 'saldo_total', 'anomalos', 'recuperacion_esperada', 'varianza']
+    ].sum()
+    margen = z * np.sqrt(resumen.pop('varianza'))
+    resumen['recuperacion_ic_inf'] = np.maximum(resumen['recuperacion_esperada'] - margen, 0)
+    resumen['recuperacion_ic_sup'] = resumen['recuperacion_esperada'] + margen
+    return resumen.reindex([e for e in ESTRATEGIAS.values() if e in resumen.index])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Puntúa la cartera y escribe la matriz de segmentación.")
+    parser.add_argument('--datos', default=None, help="Archivo de cartera (por defecto PruebaDS.xlsx)")
+    parser.add_argument('--salida', default='matriz_segmentacion.csv')
+    parser.add_argument('--tramos-saldo', type=int, default=N_TRAMOS_SALDO)
+    args = parser.parse_args(argv)
+
+    from riesgo.limpieza import RUTA_DATOS, leer_cartera, limpiar_cartera
+    from riesgo.modelos import cargar_artefactos, puntuar_cartera
+    df_pred = puntuar_cartera(limpiar_cartera(leer_cartera(args.datos or RUTA_DATOS)), cargar_artefactos(), con_razones=False)
+
+    matriz = matriz_segmentacion(df_pred, args.tramos_saldo)
+    matriz.to_csv(args.salida, index=False)
+    print(resumen_estrategias(matriz).to_string())
+
+
+if __name__ == '__main__':
+    main()
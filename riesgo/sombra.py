@@ -0,0 +1,158 @@
+"""Puntuación en sombra: varias versiones de modelos sobre la misma cartera en una pasada.
+
+La cartera se lee y se filtra una sola vez; las versiones con el mismo
+preprocesador (mismas columnas, escalas y categorías) comparten la matriz
+transformada, así que cada versión adicional solo cuesta sus predicciones.
+Los scores quedan lado a lado (`probabilidad_pago_arbol__<version>`) y
+`comparar_versiones` resume, contra la versión campeona, la concordancia de
+rangos, el solapamiento del top-K y el F1 sobre `pago`.
+
+    python -m riesgo.sombra modelos_riesgo_v1 candidato.pkl --salida sombra.csv
+"""
+import argparse
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from riesgo.explicacion import columnas_transformadas, escala_numericas
+from riesgo.exportacion import UMBRAL_PROBABILIDAD
+from riesgo.modelos import preparar_entrada
+
+TOP_K = [100, 1000]
+
+
+def _huella_preprocesador(artefactos):
+    pre = artefactos["preprocessor"]
+    min_, scale_ = escala_numericas(pre)
+    h = hashlib.sha256()
+    h.update(repr((list(artefactos["columnas_modelo"]), columnas_transformadas(pre))).encode('utf-8'))
+    h.update(np.ascontiguousarray(min_, dtype=np.float64).tobytes())
+    h.update(np.ascontiguousarray(scale_, dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+def columna(score, version):
+    return f"{score}__{version}"
+
+
+def puntuar_versiones(df, versiones):
+    """Cartera filtrada con los scores de cada versión (`{nombre: artefactos}`) en columnas separadas."""
+    df_pred = preparar_entrada(df)
+    matrices = {}
+    scores = {}
+    for nombre, artefactos in versiones.items():
+        faltantes = [c for c in artefactos["columnas_modelo"] if c not in df_pred.columns]
+        if faltantes:
+            raise ValueError(f"Faltan columnas para la versión '{nombre}': {faltantes}")
+
+        huella = _huella_preprocesador(artefactos)
+        if huella not in matrices:
+            matrices[huella] = artefactos["preprocessor"].transform(df_pred[artefactos["columnas_modelo"]])
+        X = matrices[huella]
+
+        mse = np.mean(np.power(X - artefactos["autoencoder"].predict(X), 2), axis=1)
+        scores[columna('probabilidad_pago_arbol', nombre)] = artefactos["arbol"].predict_proba(X)[:, 1]
+        scores[columna('score_anomalia_autoencoder', nombre)] = mse
+        scores[columna('alerta_anomalia', nombre)] = mse > artefactos["umbral_autoencoder"]
+
+    return pd.concat([df_pred, pd.DataFrame(scores, index=df_pred.index)], axis=1)
+
+
+def _rangos(x):
+    return pd.Series(x).rank(method='average').to_numpy()
+
+
+def _top(scores, k):
+    # Los empates (hojas del árbol con la misma probabilidad) se rompen por posición
+    return set(np.argsort(-scores, kind='stable')[:k])
+
+
+def _f1(y, pred):
+    tp = np.sum(pred & (y == 1))
+    fp = np.sum(pred & (y == 0))
+    fn = np.sum(~pred & (y == 1))
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return precision, recall, f1
+
+
+def comparar_versiones(df_scores, versiones, campeona=None, top_k=TOP_K, umbral=UMBRAL_PROBABILIDAD):
+    """Una fila por versión con su concordancia contra la campeona y sus métricas sobre `pago`."""
+    versiones = list(versiones)
+    campeona = campeona or versiones[0]
+    prob_campeona = df_scores[columna('probabilidad_pago_arbol', campeona)].to_numpy()
+    rangos_campeona = _rangos(prob_campeona)
+    alerta_campeona = df_scores[columna('alerta_anomalia', campeona)].to_numpy()
+    y = df_scores['pago'].to_numpy() if 'pago' in df_scores.columns else None
+
+    filas = []
+    for version in versiones:
+        prob = df_scores[columna('probabilidad_pago_arbol', version)].to_numpy()
+        alerta = df_scores[columna('alerta_anomalia', version)].to_numpy()
+        fila = {
+            'version': version,
+            'campeona': version == campeona,
+            'spearman_vs_campeona': np.corrcoef(_rangos(prob), rangos_campeona)[0, 1],
+            'acuerdo_alerta': np.mean(alerta == alerta_campeona),
+        }
+        for k in top_k:
+            k = min(k, len(prob))
+            fila[f'top_{k}_solapamiento'] = len(_top(prob, k) & _top(prob_campeona, k)) / k if k else np.nan
+        if y is not None:
+            fila['precision'], fila['recall'], fila['f1'] = _f1(y, prob > umbral)
+            fila['f1_alerta_anomalia'] = _f1(y, alerta)[2]
+        filas.append(fila)
+
+    return pd.DataFrame(filas).set_index('version')
+
+
+def cargar_version(ruta):
+    """Artefactos de exactamente `ruta`: un directorio es un paquete, un archivo es un pickle de joblib.
+
+    A diferencia de `cargar_artefactos`, un pickle no se cambia por el paquete
+    vecino con el mismo nombre: al comparar versiones cada ruta es la que se puntúa.
+    """
+    if os.path.isdir(ruta):
+        from riesgo.paquete import cargar_paquete
+        return cargar_paquete(ruta)
+    import joblib
+    return joblib.load(ruta)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Puntúa la cartera con varias versiones de modelos y las compara.")
+    parser.add_argument('versiones', nargs='+', help="Rutas a paquetes o pickles; la primera es la campeona")
+    parser.add_argument('--datos', default=None,
+                        help="Cartera cruda (por defecto PruebaDS.xlsx) o cartera limpia en Parquet, que se puntúa por bloques")
+    parser.add_argument('--salida', default=None, help="CSV con los scores de todas las versiones")
+    args = parser.parse_args(argv)
+
+    from riesgo.limpieza import RUTA_DATOS, leer_cartera, limpiar_cartera
+
+    versiones = {}
+    for ruta in args.versiones:
+        nombre = os.path.splitext(os.path.basename(os.path.normpath(ruta)))[0]
+        if nombre in versiones:
+            nombre = f"{nombre}_{len(versiones)}"
+        versiones[nombre] = cargar_version(ruta)
+
+    if args.datos and args.datos.endswith('.parquet'):
+        # Cartera grande ya limpia (ver riesgo.fuera_de_memoria): por bloques, guardando solo llaves y scores
+        from riesgo.fuera_de_memoria import leer_bloques
+        bloques = []
+        for bloque in leer_bloques(args.datos):
+            puntuado = puntuar_versiones(bloque, versiones)
+            bloques.append(puntuado[['identificacion', 'pago'] + [c for c in puntuado.columns if '__' in c]])
+        df_scores = pd.concat(bloques, ignore_index=True)
+    else:
+        df_scores = puntuar_versiones(limpiar_cartera(leer_cartera(args.datos or RUTA_DATOS)), versiones)
+    if args.salida:
+        df_scores.to_csv(args.salida, index=False)
+    print(comparar_versiones(df_scores, versiones).to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+import numpy as np
+
+
+class ExploradorUmbral:
+    """Métricas de clasificación para cualquier umbral `score > umbral` en O(log n).
+
+    Ordena los scores una vez y guarda conteos y saldos acumulados; cada consulta
+    es un `searchsorted` sobre el arreglo ordenado. Acepta un umbral o un arreglo de umbrales.
+    """
+
+    def __init__(self, scores, y_true, saldo=None):
+        scores = np.asarray(scores, dtype=np.float64)
+        orden = np.argsort(scores, kind='stable')
+        y = np.asarray(y_true)[orden].astype(np.int64)
+        saldo = np.zeros(len(scores)) if saldo is None else np.asarray(saldo, dtype=np.float64)[orden]
+
+        self.scores = scores[orden]
+        self.n = len(scores)
+        self.positivos = int(y.sum())
+
+        # Acumulados con un cero inicial: acum[k] = suma de las k filas con menor score
+        self._pos_acum = np.concatenate([[0], np.cumsum(y)])
+        self._saldo_acum = np.concatenate([[0.0], np.cumsum(saldo)])
+        self._saldo_pos_acum = np.concatenate([[0.0], np.cumsum(saldo * y)])
+
+    def metricas(self, umbral):
+        # Filas con score <= umbral quedan como predicción 0
+        k = np.searchsorted(self.scores, umbral, side='right')
+
+        tp = self.positivos - self._pos_acum[k]
+        fp = (self.n - k) - tp
+        fn = self.positivos - tp
+        tn = k - fn
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            precision = np.where(tp + fp > 0, tp / (tp + fp), 0.0)
+            recall = np.where(self.positivos > 0, tp / max(self.positivos, 1), 0.0)
+            f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+
+        return {
+            'tp': tp, 'fp': fp, 'fn': fn, 'tn': tn,
+            'precision': precision, 'recall': recall, 'f1': f1,
+            # Saldo de los clientes marcados como pagadores y de los que efectivamente pagaron
+            'capital_predicho': self._saldo_acum[-1] - self._saldo_acum[k],
+            'capital_recuperado': self._saldo_pos_acum[-1] - self._saldo_pos_acum[k],
+        }
+
+    def matriz_confusion(self, umbral):
+        m = self.metricas(umbral)
+        return np.array([[m['tn'], m['fp']], [m['fn'], m['tp']]])
@@ -0,0 +1,50 @@
+import os
+
+import pandas as pd
+
+from riesgo.almacen import asegurar_tabla, guardar_tabla, leer_tabla, version_tabla
+
+
+def _cartera(bancos, meses=('2025-01',)):
+    filas = [{'mes': mes, 'banco': banco, 'identificacion': f'{banco}-{mes}-{i}', 'saldo_capital': 1000.0 * (i + 1)}
+             for banco in bancos for mes in meses for i in range(3)]
+    return pd.DataFrame(filas)
+
+
+def _particiones(directorio, tabla):
+    ruta = os.path.join(directorio, tabla)
+    return sorted(
+        os.path.relpath(raiz, ruta) for raiz, _, archivos in os.walk(ruta) if any(a.endswith('.parquet') for a in archivos)
+    )
+
+
+def test_reescritura_con_menos_particiones_borra_las_anteriores(tmp_path):
+    directorio = str(tmp_path)
+    assert asegurar_tabla('limpia', 'v1', _cartera(['a', 'b'], ['2025-01', '2025-02']), directorio)
+    assert asegurar_tabla('limpia', 'v2', _cartera(['b'], ['2025-02']), directorio)
+
+    leida = leer_tabla('limpia', directorio=directorio)
+    assert set(leida['banco']) == {'b'}
+    assert set(leida['mes']) == {'2025-02'}
+    assert len(leida) == 3
+    assert _particiones(directorio, 'limpia') == [os.path.join('mes=2025-02', 'banco=b')]
+    assert version_tabla('limpia', directorio) == 'v2'
+    # Sin restos del cambio de directorio
+    assert sorted(os.listdir(directorio)) == ['limpia']
+
+
+def test_misma_version_no_reescribe(tmp_path):
+    directorio = str(tmp_path)
+    asegurar_tabla('limpia', 'v1', _cartera(['a']), directorio)
+    assert not asegurar_tabla('limpia', 'v1', lambda: _cartera(['b']), directorio)
+    assert set(leer_tabla('limpia', directorio=directorio)['banco']) == {'a'}
+
+
+def test_incremental_conserva_las_demas_particiones(tmp_path):
+    directorio = str(tmp_path)
+    guardar_tabla(_cartera(['a', 'b']), 'limpia', directorio)
+    guardar_tabla(_cartera(['b']).assign(saldo_capital=1.0), 'limpia', directorio, incremental=True)
+
+    leida = leer_tabla('limpia', directorio=directorio)
+    assert leida.groupby('banco')['saldo_capital'].sum().to_dict() == {'a': 6000.0, 'b': 3.0}
+    assert version_tabla('limpia', directorio) is None
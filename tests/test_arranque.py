@@ -0,0 +1,14 @@
+from riesgo.arranque import MODULOS_PESADOS, PRESUPUESTO_SEGUNDOS, medir_arranque, verificar_arranque
+
+
+def test_arranque_en_frio_dentro_del_presupuesto():
+    segundos, modulos = medir_arranque()
+    assert segundos <= PRESUPUESTO_SEGUNDOS, f"El arranque importa en {segundos:.2f}s (presupuesto {PRESUPUESTO_SEGUNDOS:.2f}s)"
+    assert not set(MODULOS_PESADOS) & set(modulos)
+
+
+def test_detecta_dependencias_pesadas_en_el_arranque(tmp_path):
+    app = tmp_path / 'app.py'
+    app.write_text("import json\nimport sklearn\n\ndef main():\n    import seaborn\n", encoding='utf-8')
+    _, problemas = verificar_arranque(ruta=str(app), repeticiones=1)
+    assert any('sklearn' in p and 'seaborn' not in p for p in problemas)
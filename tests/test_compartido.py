@@ -0,0 +1,147 @@
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+import pandas as pd
+import pytest
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from tornado.websocket import websocket_connect
+
+from riesgo.compartido import CarteraCompartida, congelar, escrituras, esta_congelado, huella, vista
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SESIONES = 16
+
+# App de prueba: la cartera sale de un cache_resource (el mismo objeto para todas las sesiones), se lee
+# como en las páginas y se intentan todas las escrituras prohibidas
+APP = """
+import json
+
+import numpy as np
+import streamlit as st
+
+from riesgo.compartido import _rerun, congelar, escrituras_aceptadas, huella
+from tests.test_compartido import cartera_sintetica
+
+@st.cache_resource
+def cartera():
+    return congelar(cartera_sintetica())
+
+df = cartera()
+rng = np.random.default_rng()
+for _ in range(5):
+    _rerun(df, rng)
+st.text(json.dumps({'objeto': id(df), 'huella': huella(df), 'aceptadas': escrituras_aceptadas(df)}))
+"""
+
+
+def cartera_sintetica(n=5_000):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'identificacion': [f'{i:08d}' for i in range(n)],
+        'banco': rng.choice(['bbva', 'davivienda', 'bogota'], n),
+        'departamento': rng.choice(['ANTIOQUIA', 'BOGOTA DC', None], n),
+        'saldo_capital': rng.gamma(2.0, 1e6, n),
+        'pago': rng.integers(0, 2, n),
+        'fecha': pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 365, n), unit='D'),
+    })
+
+
+def test_congelar_rechaza_todas_las_escrituras():
+    df = congelar(cartera_sintetica())
+    antes = huella(df)
+    assert isinstance(df, CarteraCompartida) and esta_congelado(df)
+    for escribir in escrituras(df).values():
+        with pytest.raises(ValueError):
+            escribir()
+    assert huella(df) == antes
+    assert list(df.columns) == list(cartera_sintetica().columns)
+
+
+def test_derivados_y_vista_son_dataframes_normales():
+    df = congelar(cartera_sintetica())
+    assert type(df[df['banco'] == 'bbva']) is pd.DataFrame and type(df.head()) is pd.DataFrame
+
+    v = vista(df)
+    v['saldo_millones'] = df['saldo_capital'] / 1e6
+    assert 'saldo_millones' not in df.columns
+    assert np.shares_memory(v['saldo_capital'].to_numpy(), df['saldo_capital'].to_numpy())
+    assert df.memory_usage(deep=True).sum() == cartera_sintetica().memory_usage(deep=True).sum()
+
+
+# --- Sesiones reales: un servidor de Streamlit y un cliente websocket por sesión ---
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+async def _sesion(puerto):
+    """Abre una sesión como el navegador, ejecuta la app y devuelve los textos que mostró."""
+    conexion = await websocket_connect(f'ws://127.0.0.1:{puerto}/_stcore/stream', subprotocols=['streamlit'])
+    pedido = BackMsg()
+    pedido.rerun_script.query_string = ''
+    await conexion.write_message(pedido.SerializeToString(), binary=True)
+    textos = []
+    try:
+        while True:
+            datos = await conexion.read_message()
+            assert datos is not None, "el servidor cerró la sesión"
+            mensaje = ForwardMsg()
+            mensaje.ParseFromString(datos)
+            if mensaje.WhichOneof('type') == 'script_finished':
+                return textos
+            if mensaje.WhichOneof('type') == 'delta' and mensaje.delta.WhichOneof('type') == 'new_element':
+                elemento = mensaje.delta.new_element
+                assert elemento.WhichOneof('type') != 'exception', elemento.exception.message
+                if elemento.WhichOneof('type') == 'text':
+                    textos.append(elemento.text.body)
+    finally:
+        conexion.close()
+
+
+async def _sesiones(puerto, n):
+    return await asyncio.wait_for(asyncio.gather(*[_sesion(puerto) for _ in range(n)]), timeout=120)
+
+
+@pytest.fixture
+def servidor(tmp_path):
+    app = tmp_path / 'app.py'
+    app.write_text(APP, encoding='utf-8')
+    puerto = _puerto_libre()
+    entorno = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [RAIZ, os.environ.get('PYTHONPATH')]))}
+    proceso = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', str(app), '--server.headless=true', f'--server.port={puerto}',
+         '--server.address=127.0.0.1', '--browser.gatherUsageStats=false'],
+        cwd=tmp_path, env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        for _ in range(150):
+            try:
+                urllib.request.urlopen(f'http://127.0.0.1:{puerto}/_stcore/health', timeout=1)
+                break
+            except OSError:
+                time.sleep(0.2)
+        else:
+            pytest.fail("el servidor de Streamlit no arrancó")
+        yield puerto
+    finally:
+        proceso.terminate()
+        proceso.wait(timeout=30)
+
+
+def test_sesiones_concurrentes_comparten_la_cartera_sin_cambiarla(servidor):
+    resultados = [json.loads(textos[-1]) for textos in asyncio.run(_sesiones(servidor, SESIONES))]
+
+    assert len(resultados) == SESIONES
+    assert len({r['objeto'] for r in resultados}) == 1
+    assert {r['huella'] for r in resultados} == {huella(cartera_sintetica())}
+    assert all(r['aceptadas'] == [] for r in resultados)
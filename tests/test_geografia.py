@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from riesgo.geografia import AgregadosDepartamento, guardar_agregados
+
+
+def _puntuada(meses, bancos=('a', 'b')):
+    filas = []
+    for mes in meses:
+        for banco in bancos:
+            for i, departamento in enumerate(['ANTIOQUIA', 'BOGOTA DC', None]):
+                filas.append({
+                    'mes': mes, 'banco': banco, 'departamento': departamento, 'rango_edad_probable': '26-35',
+                    'pago': i % 2, 'saldo_capital': 1000.0 * (i + 1), 'probabilidad_pago_arbol': 0.25 * (i + 1),
+                    'alerta_anomalia': int(i == 2),
+                })
+    return pd.DataFrame(filas)
+
+
+def test_reconstruir_con_menos_meses_no_deja_celdas_viejas(tmp_path):
+    directorio = str(tmp_path)
+    guardar_agregados(_puntuada(['2025-01', '2025-02']), directorio)
+    nueva = _puntuada(['2025-02'], bancos=('b',))
+    guardar_agregados(nueva, directorio)
+
+    agregados = AgregadosDepartamento.desde_almacen(directorio)
+    esperado = AgregadosDepartamento.desde_cartera(nueva)
+    assert agregados.meses == ['2025-02']
+    assert agregados.bancos == ['b']
+    pd.testing.assert_frame_equal(agregados.resumen(), esperado.resumen())
+    pd.testing.assert_frame_equal(agregados.coropleta(), esperado.coropleta())
+    assert agregados.resumen()['deudores'].sum() == len(nueva)
+    assert np.isclose(agregados.resumen()['saldo_total'].sum(), nueva['saldo_capital'].sum())